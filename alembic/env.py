@@ -3,7 +3,7 @@
 from logging.config import fileConfig
 
 from sqlalchemy import engine_from_config, create_engine
-from sqlalchemy import pool
+from sqlalchemy import pool, text
 from sqlalchemy_utils import database_exists, create_database
 
 from alembic import context
@@ -17,8 +17,10 @@ from celine.webapp.settings import settings
 config = context.config
 
 # Interpret the config file for Python logging.
-# This line sets up loggers basically.
-if config.config_file_name is not None:
+# This line sets up loggers basically. Not when the app runs the migrations at
+# startup (`run_migrations`): it would replace the app's logging configuration and
+# disable every logger already created.
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
     fileConfig(config.config_file_name)
 
 # Set the database URL from settings (remove +asyncpg for sync alembic)
@@ -30,6 +32,10 @@ if not database_exists(sync_url):
     create_database(sync_url)
     print(f"Created database: {sync_url}")
 
+# Any fixed key: replicas that start together take turns upgrading, and those after
+# the first find the schema at head already.
+MIGRATION_LOCK_KEY = 0x63656C696E65
+
 # add your model's MetaData object here
 # for 'autogenerate' support
 target_metadata = Base.metadata
@@ -61,6 +67,10 @@ def run_migrations_online() -> None:
         context.configure(connection=connection, target_metadata=target_metadata)
 
         with context.begin_transaction():
+            if connection.dialect.name == "postgresql":
+                connection.execute(
+                    text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY}
+                )
             context.run_migrations()
 
 
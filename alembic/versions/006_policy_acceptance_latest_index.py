@@ -0,0 +1,44 @@
+"""Latest-acceptance index on policy_acceptance
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "006"
+down_revision: Union[str, None] = "005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Serves "latest acceptance for this user" as a LIMIT 1 read in index order — one
+    # index entry and its row, not every row of the user — and covers every lookup
+    # the single-column index served, which is therefore dropped.
+    op.create_index(
+        "ix_policy_acceptance_user_id_accepted_at",
+        "policy_acceptance",
+        ["user_id", sa.text("accepted_at DESC")],
+        unique=False,
+    )
+    op.drop_index(op.f("ix_policy_acceptance_user_id"), table_name="policy_acceptance")
+
+
+def downgrade() -> None:
+    op.create_index(
+        op.f("ix_policy_acceptance_user_id"),
+        "policy_acceptance",
+        ["user_id"],
+        unique=False,
+    )
+    op.drop_index(
+        "ix_policy_acceptance_user_id_accepted_at", table_name="policy_acceptance"
+    )
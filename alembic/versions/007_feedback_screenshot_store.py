@@ -0,0 +1,153 @@
+"""Feedback screenshots out of the feedback row
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+import hashlib
+import uuid
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "007"
+down_revision: Union[str, None] = "006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must match `celine.webapp.db.screenshots.CHUNK_SIZE`; copied so this revision
+# keeps doing what it did if that ever changes.
+CHUNK_SIZE = 256 * 1024
+
+feedback_entries = sa.table(
+    "feedback_entries",
+    sa.column("id", sa.Uuid()),
+    sa.column("screenshot_bytes", sa.LargeBinary()),
+    sa.column("screenshot_id", sa.Uuid()),
+)
+feedback_screenshots = sa.table(
+    "feedback_screenshots",
+    sa.column("id", sa.Uuid()),
+    sa.column("sha256", sa.String()),
+    sa.column("size", sa.Integer()),
+    sa.column("chunk_count", sa.Integer()),
+)
+feedback_screenshot_chunks = sa.table(
+    "feedback_screenshot_chunks",
+    sa.column("screenshot_id", sa.Uuid()),
+    sa.column("seq", sa.Integer()),
+    sa.column("data", sa.LargeBinary()),
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "feedback_screenshots",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("sha256", sa.String(length=64), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column("chunk_count", sa.Integer(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("sha256"),
+    )
+    op.create_table(
+        "feedback_screenshot_chunks",
+        sa.Column("screenshot_id", sa.Uuid(), nullable=False),
+        sa.Column("seq", sa.Integer(), nullable=False),
+        sa.Column("data", sa.LargeBinary(), nullable=False),
+        sa.PrimaryKeyConstraint("screenshot_id", "seq"),
+    )
+    op.add_column(
+        "feedback_entries",
+        sa.Column(
+            "screenshot_id",
+            sa.Uuid(),
+            sa.ForeignKey("feedback_screenshots.id"),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        op.f("ix_feedback_entries_screenshot_id"),
+        "feedback_entries",
+        ["screenshot_id"],
+        unique=False,
+    )
+
+    # Move the existing images one row at a time, so the migration never holds more
+    # than one of them.
+    bind = op.get_bind()
+    ids = bind.execute(
+        sa.select(feedback_entries.c.id).where(
+            feedback_entries.c.screenshot_bytes.is_not(None)
+        )
+    ).scalars().all()
+    stored: dict[str, uuid.UUID] = {}
+    for entry_id in ids:
+        data = bind.execute(
+            sa.select(feedback_entries.c.screenshot_bytes).where(
+                feedback_entries.c.id == entry_id
+            )
+        ).scalar_one()
+        sha256 = hashlib.sha256(data).hexdigest()
+        screenshot_id = stored.get(sha256)
+        if screenshot_id is None:
+            screenshot_id = stored[sha256] = uuid.uuid4()
+            chunks = [data[i : i + CHUNK_SIZE] for i in range(0, len(data), CHUNK_SIZE)] or [b""]
+            bind.execute(
+                feedback_screenshots.insert().values(
+                    id=screenshot_id, sha256=sha256, size=len(data), chunk_count=len(chunks)
+                )
+            )
+            bind.execute(
+                feedback_screenshot_chunks.insert(),
+                [
+                    {"screenshot_id": screenshot_id, "seq": seq, "data": chunk}
+                    for seq, chunk in enumerate(chunks)
+                ],
+            )
+        bind.execute(
+            feedback_entries.update()
+            .where(feedback_entries.c.id == entry_id)
+            .values(screenshot_id=screenshot_id)
+        )
+
+    op.drop_column("feedback_entries", "screenshot_bytes")
+
+
+def downgrade() -> None:
+    op.add_column(
+        "feedback_entries",
+        sa.Column("screenshot_bytes", sa.LargeBinary(), nullable=True),
+    )
+
+    bind = op.get_bind()
+    screenshot_ids = bind.execute(sa.select(feedback_screenshots.c.id)).scalars().all()
+    for screenshot_id in screenshot_ids:
+        chunks = bind.execute(
+            sa.select(feedback_screenshot_chunks.c.data)
+            .where(feedback_screenshot_chunks.c.screenshot_id == screenshot_id)
+            .order_by(feedback_screenshot_chunks.c.seq)
+        ).scalars()
+        bind.execute(
+            feedback_entries.update()
+            .where(feedback_entries.c.screenshot_id == screenshot_id)
+            .values(screenshot_bytes=b"".join(chunks))
+        )
+
+    op.drop_index(
+        op.f("ix_feedback_entries_screenshot_id"), table_name="feedback_entries"
+    )
+    op.drop_column("feedback_entries", "screenshot_id")
+    op.drop_table("feedback_screenshot_chunks")
+    op.drop_table("feedback_screenshots")
@@ -0,0 +1,33 @@
+"""Export-order index on feedback_entries
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "008"
+down_revision: Union[str, None] = "007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The feedback export reads in (created_at, id) order, from a watermark when it is
+    # incremental; this serves both without sorting the table.
+    op.create_index(
+        "ix_feedback_entries_created_at_id",
+        "feedback_entries",
+        ["created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_feedback_entries_created_at_id", table_name="feedback_entries")
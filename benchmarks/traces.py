@@ -0,0 +1,81 @@
+"""Critical path of traced requests, from a file the ``file`` span exporter wrote.
+
+    TRACING_EXPORTER=file TRACING_FILE=traces.jsonl task run   # then exercise the app
+    uv run python -m benchmarks.traces traces.jsonl
+    uv run python -m benchmarks.traces traces.jsonl --route "GET /api/overview" --slowest 3
+
+For each request, the critical path is the chain of spans its response actually
+waited on: starting from the end of the server span, the child that finished last,
+then — before that child started — the one that finished last before it, and so on
+down each level. For a fan-out like ``/api/overview`` it names the fetch that held the
+response up; the others finished in its shadow.
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections import defaultdict
+from typing import Any
+
+from celine.webapp.tracing import read_spans
+
+Span = dict[str, Any]
+
+
+def _start(span: Span) -> int:
+    return int(span["startTimeUnixNano"])
+
+
+def _end(span: Span) -> int:
+    return int(span["endTimeUnixNano"])
+
+
+def duration_ms(span: Span) -> float:
+    return (_end(span) - _start(span)) / 1e6
+
+
+def critical_path(spans: list[Span], root: Span) -> list[tuple[int, Span]]:
+    """``(depth, span)`` for each span on ``root``'s critical path, root first."""
+    children: dict[str, list[Span]] = defaultdict(list)
+    for span in spans:
+        if span["traceId"] == root["traceId"] and span.get("parentSpanId"):
+            children[span["parentSpanId"]].append(span)
+
+    def walk(span: Span, depth: int) -> list[tuple[int, Span]]:
+        path = [(depth, span)]
+        cursor = _end(span)
+        on_path: list[Span] = []
+        for child in sorted(children[span["spanId"]], key=_end, reverse=True):
+            if _end(child) <= cursor:
+                on_path.append(child)
+                cursor = _start(child)
+        for child in reversed(on_path):
+            path.extend(walk(child, depth + 1))
+        return path
+
+    return walk(root, 0)
+
+
+def roots(spans: list[Span]) -> list[Span]:
+    """The server spans: one per request this process handled."""
+    return [span for span in spans if span["kind"] == "SPAN_KIND_SERVER"]
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("path", help="file written by TRACING_EXPORTER=file")
+    parser.add_argument("--route", help='only requests named like "GET /api/overview"')
+    parser.add_argument("--slowest", type=int, default=5, help="requests to show")
+    args = parser.parse_args(argv)
+
+    spans = read_spans(args.path)
+    requests = [r for r in roots(spans) if args.route is None or r["name"] == args.route]
+    for root in sorted(requests, key=duration_ms, reverse=True)[: args.slowest]:
+        print(f"\ntrace {root['traceId']}")
+        for depth, span in critical_path(spans, root):
+            offset = (_start(span) - _start(root)) / 1e6
+            print(f"{'  ' * depth}{span['name']}  {duration_ms(span):.1f} ms  (+{offset:.1f})")
+
+
+if __name__ == "__main__":
+    main()
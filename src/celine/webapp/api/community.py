@@ -4,10 +4,9 @@ import logging
 
 from fastapi import APIRouter, Request
 
-from celine.webapp.api.deps import UserDep, _extract_token
+from celine.webapp.api.deps import UserDep, get_auth_context
 from celine.webapp.api.schemas import CommunityMetaResponse
 from celine.webapp.settings import settings
-from celine.sdk.rec_registry import RecRegistryUserClient
 
 logger = logging.getLogger(__name__)
 
@@ -24,8 +23,10 @@ async def community_meta(user: UserDep, request: Request) -> CommunityMetaRespon
 
     detail = None
     try:
-        raw_token = _extract_token(request)
+        raw_token = get_auth_context(request).token
         if raw_token and settings.rec_registry_url:
+            from celine.sdk.rec_registry import RecRegistryUserClient
+
             registry = RecRegistryUserClient(
                 base_url=settings.rec_registry_url,
                 default_token=raw_token,
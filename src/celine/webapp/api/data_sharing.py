@@ -11,9 +11,14 @@ service only resolves which credential is theirs.
 
 from __future__ import annotations
 
+import asyncio
+import json
 import logging
+from contextlib import aclosing
+from typing import AsyncIterator
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 
 from celine.webapp.api.deps import UserDep
 from celine.webapp.api.schemas import (
@@ -61,7 +66,8 @@ async def get_data_sharing(user: UserDep) -> DataSharingStatusResponse:
     """Every offer, and whether this member has agreed to it.
 
     Offers come from the published vocabulary rather than a local copy, so what
-    is shown here and what the dataspace enforces cannot drift.
+    is shown here and what the dataspace enforces cannot drift. They are read
+    alongside the member's decisions rather than before them.
 
     A member with no dataspace identity gets `has_identity: false` and an empty
     list — a normal state for somebody enabled before the integration existed,
@@ -74,11 +80,17 @@ async def get_data_sharing(user: UserDep) -> DataSharingStatusResponse:
         return DataSharingStatusResponse(has_identity=False, offers=[])
 
     try:
-        offers = await service.list_offers()
-        decisions = await service.list_decisions(credential)
+        offers, decisions = await asyncio.gather(
+            service.list_offers(), service.list_decisions(credential)
+        )
     except service.DataSharingUnavailable as exc:
         raise HTTPException(status_code=503, detail=str(exc)) from exc
 
+    return _status(offers, decisions)
+
+
+def _status(offers: list[dict], decisions: list[dict]) -> DataSharingStatusResponse:
+    """Each offer with the member's decision on it, if any."""
     granted = {
         d.get("offer_id"): d
         for d in decisions
@@ -111,6 +123,10 @@ async def set_data_sharing(
 
     Withdrawal is the reason this route exists: the onboarding wizard can only
     grant, so without it a consent could be given and never taken back.
+
+    Answers with the same status as the GET, built from what the connector
+    returned and the cached offers rather than by reading everything again: the
+    credential is resolved once, and a toggle costs the resolve and the change.
     """
     _require_feature()
 
@@ -122,31 +138,82 @@ async def set_data_sharing(
         )
 
     try:
-        await service.set_decision(credential, offer_id, enabled=body.enabled)
+        result = await service.set_decision(credential, offer_id, enabled=body.enabled)
     except ValueError as exc:
         # A contract-based offer: disclosed, not toggled.
         raise HTTPException(status_code=409, detail=str(exc)) from exc
     except service.DataSharingUnavailable as exc:
         raise HTTPException(status_code=503, detail=str(exc)) from exc
 
-    return await get_data_sharing(user)
+    try:
+        decisions = service.shares_from(result)
+        if decisions is None:
+            # Only the changed record came back: the others still have to be read.
+            offers, decisions = await asyncio.gather(
+                service.list_offers(), service.list_decisions(credential)
+            )
+        else:
+            offers = await service.list_offers()
+    except service.DataSharingUnavailable as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+
+    return _status(offers, decisions)
 
 
-@router.get("/history", response_model=DataSharingHistoryResponse)
-async def get_data_sharing_history(user: UserDep) -> DataSharingHistoryResponse:
+NDJSON = "application/x-ndjson"
+
+
+@router.get(
+    "/history",
+    response_model=DataSharingHistoryResponse,
+    responses={200: {"content": {NDJSON: {}}}},
+)
+async def get_data_sharing_history(
+    user: UserDep,
+    request: Request,
+    limit: int = Query(service.HISTORY_PAGE_SIZE, ge=1, le=500),
+    cursor: str | None = Query(None, description="`next_cursor` of the previous page"),
+):
     """What has happened with this member's data, from their own record.
 
     Served by provenance under the member's credential, so it is their history
     rather than one this service assembles. Absent provenance returns an empty
     list: the decisions stand without it, and failing here would make the whole
     page unusable for a detail.
+
+    A page at a time by default. With `Accept: application/x-ndjson` the whole
+    history from ``cursor`` on is streamed instead, one event per line; a member
+    with no dataspace identity then gets an empty body.
     """
     _require_feature()
 
     credential = await _credential(user)
+    streaming = NDJSON in request.headers.get("accept", "")
     if credential is None:
+        if streaming:
+            return Response(media_type=NDJSON)
         return DataSharingHistoryResponse(has_identity=False, events=[])
 
+    try:
+        if streaming:
+            events = service.stream_history(credential, cursor=cursor)
+            # Pulled here so an unknown cursor is a 400 rather than a broken stream.
+            first = await anext(events, None)
+            return StreamingResponse(_ndjson(first, events), media_type=NDJSON)
+        page = await service.list_history(credential, cursor=cursor, limit=limit)
+    except service.InvalidCursor as exc:
+        raise HTTPException(status_code=400, detail="Unknown history cursor") from exc
+
     return DataSharingHistoryResponse(
-        has_identity=True, events=await service.list_history(credential)
+        has_identity=True, events=page.events, next_cursor=page.next_cursor
     )
+
+
+async def _ndjson(first: dict | None, rest: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    # Closed as soon as the client goes away, releasing the provenance connection.
+    async with aclosing(rest):
+        if first is None:
+            return
+        yield json.dumps(first).encode() + b"\n"
+        async for event in rest:
+            yield json.dumps(event).encode() + b"\n"
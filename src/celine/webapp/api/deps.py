@@ -1,22 +1,61 @@
 # celine/webapp/api/deps.py
-"""Authentication and service dependencies."""
+"""Authentication and service dependencies.
 
-from typing import Annotated
+The SDK client modules are imported on first use rather than here. Between them they
+load four generated OpenAPI packages and account for a third of the app's import time,
+which every cold start, CLI run and test collection would otherwise pay.
+"""
+
+from dataclasses import dataclass
+from datetime import tzinfo
+from typing import TYPE_CHECKING, Annotated, Any
+import hashlib
 import logging
-from fastapi import Depends, HTTPException, Request
+import time
+from fastapi import Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.ext.asyncio import AsyncSession
 import jwt as pyjwt
 
+from celine.webapp.cache import TTLCache
+from celine.webapp.logsampling import RateLimitedLogger
+from celine.webapp.upstreams import InstrumentedClient
 from celine.webapp.settings import settings
+from celine.webapp.timestamps import zone
 from celine.webapp.db import get_db
 from celine.sdk.auth import JwtUser
 from celine.sdk.auth.static import StaticTokenProvider
-from celine.sdk.dt import DTClient
-from celine.sdk.flexibility import FlexibilityClient
-from celine.sdk.nudging.client import NudgingClient
-from celine.sdk.rec_registry import RecRegistryUserClient
+
+if TYPE_CHECKING:
+    from celine.sdk.dt import DTClient
+    from celine.sdk.flexibility import FlexibilityClient
+    from celine.sdk.nudging.client import NudgingClient
+    from celine.sdk.rec_registry import RecRegistryUserClient
 
 logger = logging.getLogger(__name__)
+auth_failures = RateLimitedLogger(logger, interval=60.0)
+
+# A verified token is remembered until it expires, and for at most this long: the
+# upper bound is how long a token signed by a key Keycloak has since withdrawn can
+# still be accepted.
+VERIFIED_TOKEN_TTL = 300.0
+
+# Keyed by a SHA-256 of the token rather than the token itself.
+_verified_tokens: TTLCache[str, JwtUser] = TTLCache(
+    "verified_tokens", maxsize=10_000, ttl=VERIFIED_TOKEN_TTL
+)
+
+
+@dataclass
+class AuthContext:
+    """What one request has established about its caller, computed once.
+
+    Stored on ``request.state.auth``. ``user`` is filled in by `get_user_from_request`
+    and stays ``None`` until then.
+    """
+
+    token: str | None
+    user: JwtUser | None = None
 
 
 def _extract_token(request: Request) -> str | None:
@@ -29,7 +68,8 @@ def _extract_token(request: Request) -> str | None:
     if authorization and authorization.lower().startswith("bearer "):
         return authorization[7:].strip()
 
-    logger.warning(
+    auth_failures.warning(
+        "missing",
         "Missing auth headers on %s %s; available=%s",
         request.method,
         request.url.path,
@@ -44,37 +84,83 @@ def _extract_token(request: Request) -> str | None:
     return None
 
 
-def get_user_from_request(request: Request) -> JwtUser:
+def get_auth_context(request: Request) -> AuthContext:
+    """The request's auth context, extracting the token on first use."""
+    context = getattr(request.state, "auth", None)
+    if context is None:
+        context = AuthContext(token=_extract_token(request))
+        request.state.auth = context
+    return context
+
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _verified_lifetime(user: JwtUser, now: float | None = None) -> float:
+    """How long a verified token may be served from cache: never past its `exp`."""
+    if user.exp is None:
+        return 0.0
+    remaining = user.exp - (time.time() if now is None else now)
+    return max(0.0, min(VERIFIED_TOKEN_TTL, remaining))
+
+
+async def get_user_from_request(request: Request) -> JwtUser:
     """
     Extract and validate user from JWT in request header using celine-sdk.
 
-    The SDK handles JWT parsing, signature verification, and expiry checks.
+    The SDK handles JWT parsing, signature verification, and expiry checks. A token
+    that verified is then served from cache until it expires, so the several parallel
+    requests a screen makes with one token are verified once.
     """
-    token = _extract_token(request)
+    context = get_auth_context(request)
+    if context.user is not None:
+        return context.user
+    token = context.token
     if not token:
         raise HTTPException(status_code=401, detail="Missing authentication token")
 
-    try:
-        user = JwtUser.from_token(token, oidc=settings.oidc)
-        return user
+    key = _token_key(token)
+    user = _verified_tokens.get(key)
+    if user is None:
+        user = await _verify(token, request)
+        _verified_tokens.set(key, user, ttl=_verified_lifetime(user))
+
+    context.user = user
+    return user
+
 
+async def _verify(token: str, request: Request) -> JwtUser:
+    try:
+        # In a thread: with the JWKS warm this is CPU only, but a key the SDK has not
+        # seen yet is fetched synchronously.
+        return await run_in_threadpool(JwtUser.from_token, token, oidc=settings.oidc)
     except pyjwt.ExpiredSignatureError:
+        _log_rejection("expired", request, "expired")
         raise HTTPException(status_code=401, detail="Token has expired")
     except pyjwt.InvalidTokenError as e:
+        _log_rejection("invalid", request, type(e).__name__)
         raise HTTPException(status_code=401, detail=f"Invalid token: {str(e)}")
     except Exception as e:
+        _log_rejection("failed", request, type(e).__name__)
         raise HTTPException(status_code=401, detail=f"Authentication failed: {str(e)}")
 
 
+def _log_rejection(kind: str, request: Request, reason: str) -> None:
+    auth_failures.warning(
+        kind, "Rejected token on %s %s: %s", request.method, request.url.path, reason
+    )
+
+
 def get_raw_token(request: Request) -> str:
-    """Extract the raw JWT string from the request header."""
-    token = _extract_token(request)
+    """The raw JWT string from the request's auth context."""
+    token = get_auth_context(request).token
     if not token:
         raise HTTPException(status_code=401, detail="Missing authentication token")
     return token
 
 
-def get_dt_client(request: Request) -> DTClient:
+def get_dt_client(request: Request) -> "DTClient":
     """Create a DTClient that forwards the caller's JWT to the DT API.
 
     The StaticTokenProvider wraps the user's existing JWT — no refresh,
@@ -86,6 +172,8 @@ def get_dt_client(request: Request) -> DTClient:
             detail="Digital Twin API not configured",
         )
 
+    from celine.sdk.dt import DTClient
+
     raw_token = get_raw_token(request)
     token_provider = StaticTokenProvider(raw_token)
 
@@ -95,22 +183,26 @@ def get_dt_client(request: Request) -> DTClient:
     )
 
 
-def get_nudging_client(request: Request) -> NudgingClient:
+def get_nudging_client(request: Request) -> "NudgingClient":
     if not settings.nudging_api_url:
         raise HTTPException(
             status_code=503,
             detail="Nudging API not configured",
         )
 
+    from celine.sdk.nudging.client import NudgingClient
+
     raw_token = get_raw_token(request)
 
     return NudgingClient(base_url=settings.nudging_api_url, default_token=raw_token)
 
 
-def get_registry_client(request: Request) -> RecRegistryUserClient:
+def get_registry_client(request: Request) -> "RecRegistryUserClient":
     """Create a RecRegistryUserClient forwarding the caller's JWT."""
     if not settings.rec_registry_url:
         raise HTTPException(status_code=503, detail="REC Registry not configured")
+    from celine.sdk.rec_registry import RecRegistryUserClient
+
     raw_token = get_raw_token(request)
     return RecRegistryUserClient(
         base_url=settings.rec_registry_url,
@@ -129,11 +221,13 @@ def get_client_ip(request: Request) -> str:
     return request.client.host if request.client else "unknown"
 
 
-def get_flexibility_client(request: Request) -> FlexibilityClient:
+def get_flexibility_client(request: Request) -> "FlexibilityClient":
     """Create a FlexibilityClient forwarding the caller's JWT."""
     if not settings.flexibility_api_url:
         from fastapi import HTTPException
         raise HTTPException(status_code=503, detail="Flexibility API not configured")
+    from celine.sdk.flexibility import FlexibilityClient
+
     raw_token = get_raw_token(request)
     return FlexibilityClient(
         base_url=settings.flexibility_api_url,
@@ -141,10 +235,64 @@ def get_flexibility_client(request: Request) -> FlexibilityClient:
     )
 
 
+def get_requested_zone(
+    request: Request,
+    tz: str | None = Query(
+        None,
+        description="IANA time zone to count days in, e.g. Europe/Rome. "
+        "Defaults to the X-Timezone header, then the community's zone.",
+    ),
+) -> tzinfo | None:
+    """The zone the client asked for, from ``tz`` or the ``X-Timezone`` header."""
+    name = tz or request.headers.get("x-timezone")
+    if not name:
+        return None
+    try:
+        return zone(name)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Unknown time zone: {name}")
+
+
+def local_zone(requested: tzinfo | None, community_id: str | None) -> tzinfo:
+    """The zone a member's days are counted in: the one asked for, else the community's."""
+    if requested is not None:
+        return requested
+    return zone(settings.community_timezones.get(community_id or "", settings.default_timezone))
+
+
 # Type aliases for dependency injection
 UserDep = Annotated[JwtUser, Depends(get_user_from_request)]
 DbDep = Annotated[AsyncSession, Depends(get_db)]
-DTDep = Annotated[DTClient, Depends(get_dt_client)]
-FlexibilityDep = Annotated[FlexibilityClient, Depends(get_flexibility_client)]
-NudgingDep = Annotated[NudgingClient, Depends(get_nudging_client)]
-RegistryDep = Annotated[RecRegistryUserClient, Depends(get_registry_client)]
+ZoneDep = Annotated[tzinfo | None, Depends(get_requested_zone)]
+
+
+def _instrumented(upstream: str, factory: Any, children: tuple[str, ...] = ()) -> Any:
+    """A dependency handing routes the client from ``factory``, timed per call.
+
+    Wrapping here rather than inside the factories keeps the factories the override
+    point: a test that replaces one still gets its fake timed like the real client.
+    """
+
+    def dependency(client: Any = Depends(factory)) -> Any:
+        return InstrumentedClient(client, upstream, children)
+
+    return dependency
+
+
+# FastAPI evaluates these when routes are declared, so at runtime the client types
+# are `Any` — naming them would import the SDK modules this file defers.
+if TYPE_CHECKING:
+    DTDep = Annotated[DTClient, Depends(get_dt_client)]
+    FlexibilityDep = Annotated[FlexibilityClient, Depends(get_flexibility_client)]
+    NudgingDep = Annotated[NudgingClient, Depends(get_nudging_client)]
+    RegistryDep = Annotated[RecRegistryUserClient, Depends(get_registry_client)]
+else:
+    DTDep = Annotated[
+        Any,
+        Depends(_instrumented("digital_twin", get_dt_client, ("participants", "communities"))),
+    ]
+    FlexibilityDep = Annotated[
+        Any, Depends(_instrumented("flexibility", get_flexibility_client))
+    ]
+    NudgingDep = Annotated[Any, Depends(_instrumented("nudging", get_nudging_client))]
+    RegistryDep = Annotated[Any, Depends(_instrumented("rec_registry", get_registry_client))]
@@ -2,38 +2,105 @@
 
 import base64
 import binascii
+import tempfile
+import uuid
+from datetime import datetime, timezone
+from typing import Any
+
 from fastapi import APIRouter, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
 
 from celine.webapp.api.deps import DbDep, UserDep, get_client_ip
 from celine.webapp.api.schemas import FeedbackCreateRequest, FeedbackCreateResponse
 from celine.webapp.db import FeedbackEntry
+from celine.webapp.db import screenshots
+from celine.webapp.db.screenshots import ScreenshotWriter, store_screenshot
+from celine.webapp.multipart import HEADERS_MAX, MultipartReader, Part, boundary
+from celine.webapp.services.feedback_queue import feedback_queue
+from celine.webapp.settings import settings
 
 
 router = APIRouter(prefix="/api/feedback", tags=["feedback"])
 
+# The ``feedback`` part of an upload: the JSON body without its screenshot.
+FEEDBACK_PART_MAX = 64 * 1024
 
-@router.post("", response_model=FeedbackCreateResponse, status_code=201)
-async def create_feedback(
-    request: Request,
-    body: FeedbackCreateRequest,
-    user: UserDep,
-    db: DbDep,
-) -> FeedbackCreateResponse:
-    """Persist end-user feedback with page diagnostics."""
+# What an uploaded screenshot may be, and the bytes each type starts with: the
+# declared type is checked against the first bytes, not taken on trust.
+SCREENSHOT_SIGNATURES: dict[str, tuple[tuple[int, bytes], ...]] = {
+    "image/png": ((0, b"\x89PNG\r\n\x1a\n"),),
+    "image/jpeg": ((0, b"\xff\xd8\xff"),),
+    "image/webp": ((0, b"RIFF"), (8, b"WEBP")),
+}
+_SIGNATURE_LENGTH = 12
 
-    screenshot_bytes: bytes | None = None
-    screenshot_mime_type: str | None = None
+# An uploaded screenshot is held in memory up to this size, on disk beyond it.
+SPOOL_MEMORY_MAX = 1024 * 1024
 
-    if body.screenshot:
-        try:
-            screenshot_bytes = base64.b64decode(body.screenshot.data_base64, validate=True)
-        except (binascii.Error, ValueError) as exc:
-            raise HTTPException(status_code=400, detail="Invalid screenshot payload") from exc
 
-        screenshot_mime_type = body.screenshot.mime_type
+class _ScreenshotUpload:
+    """A screenshot part, checked as its bytes arrive and spooled until the body ends.
+
+    Nothing touches the database while the client is still sending: a slow upload
+    would otherwise hold a pooled connection, and an open transaction, for as long
+    as it took. The spool stays in memory up to `SPOOL_MEMORY_MAX` and goes to a
+    temporary file beyond that.
+    """
 
-    entry = FeedbackEntry(
-        user_id=user.sub,
+    def __init__(self, content_type: str | None) -> None:
+        self.mime_type = (content_type or "").partition(";")[0].strip().lower()
+        if self.mime_type not in SCREENSHOT_SIGNATURES:
+            raise HTTPException(status_code=415, detail="Unsupported screenshot type")
+        self.size = 0
+        self._spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_MAX)
+        self._head: bytes | None = b""
+
+    def write(self, data: bytes) -> None:
+        self.size += len(data)
+        if self.size > settings.feedback_screenshot_max_bytes:
+            raise HTTPException(status_code=413, detail="Screenshot too large")
+        if self._head is not None:
+            self._head += data
+            if len(self._head) < _SIGNATURE_LENGTH:
+                return
+            data, self._head = self._head, None
+            self._check(data)
+        self._spool.write(data)
+
+    async def store(self, db) -> uuid.UUID:
+        """Write the spooled image to the screenshot store; the caller commits."""
+        if self._head is not None:
+            head, self._head = self._head, None
+            if not head:
+                raise HTTPException(status_code=400, detail="Empty screenshot")
+            self._check(head)
+            self._spool.write(head)
+        self._spool.seek(0)
+        writer = ScreenshotWriter(db)
+        while data := self._spool.read(screenshots.CHUNK_SIZE):
+            await writer.write(data)
+        return await writer.finish()
+
+    def close(self) -> None:
+        self._spool.close()
+
+    def _check(self, head: bytes) -> None:
+        for offset, signature in SCREENSHOT_SIGNATURES[self.mime_type]:
+            if head[offset : offset + len(signature)] != signature:
+                raise HTTPException(status_code=415, detail="Unsupported screenshot type")
+
+
+def _feedback_values(
+    request: Request,
+    user_id: str,
+    body: FeedbackCreateRequest,
+    screenshot_id: uuid.UUID | None,
+    screenshot_mime_type: str | None,
+) -> dict[str, Any]:
+    return dict(
+        id=uuid.uuid4(),
+        user_id=user_id,
         rating=body.rating,
         comment=body.comment.strip() or None,
         page_url=body.context.page_url,
@@ -51,13 +118,164 @@ async def create_feedback(
         client_ip=get_client_ip(request),
         extra_context=body.context.extra or None,
         screenshot_mime_type=screenshot_mime_type,
-        screenshot_bytes=screenshot_bytes,
+        screenshot_id=screenshot_id,
     )
-    db.add(entry)
+
+
+async def _save(db, values: dict[str, Any]) -> FeedbackCreateResponse:
+    """Hand the row to the write queue, or write it here if the queue will not take it.
+
+    The request's transaction is committed first: a screenshot the row references
+    must be there before the row, which the queue writes on its own connection, and a
+    row written here is stamped by the database in a transaction of its own. The
+    stored ``created_at`` is the time of that write; the response carries the time
+    the request was accepted, a moment before.
+    """
+    accepted_at = datetime.now(timezone.utc)
     await db.commit()
-    await db.refresh(entry)
+    if not feedback_queue.submit(values):
+        db.add(FeedbackEntry(**values))
+        await db.commit()
+
+    return FeedbackCreateResponse(id=str(values["id"]), created_at=accepted_at)
+
+
+@router.post("", response_model=FeedbackCreateResponse, status_code=201)
+async def create_feedback(
+    request: Request,
+    body: FeedbackCreateRequest,
+    user: UserDep,
+    db: DbDep,
+) -> FeedbackCreateResponse:
+    """Persist end-user feedback with page diagnostics.
+
+    The row is written in the background by `feedback_queue`, in a batch with other
+    submissions; its id is fixed here and answered at once.
+    """
+
+    screenshot_id = None
+    screenshot_mime_type: str | None = None
+
+    if body.screenshot:
+        try:
+            screenshot_bytes = base64.b64decode(body.screenshot.data_base64, validate=True)
+        except (binascii.Error, ValueError) as exc:
+            raise HTTPException(status_code=400, detail="Invalid screenshot payload") from exc
+
+        screenshot_id = await store_screenshot(db, screenshot_bytes)
+        screenshot_mime_type = body.screenshot.mime_type
+
+    return await _save(
+        db, _feedback_values(request, user.sub, body, screenshot_id, screenshot_mime_type)
+    )
+
+
+@router.post(
+    "/upload",
+    response_model=FeedbackCreateResponse,
+    status_code=201,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "required": ["feedback"],
+                        "properties": {
+                            "feedback": {
+                                "type": "string",
+                                "description": "FeedbackCreateRequest as JSON, without screenshot",
+                            },
+                            "screenshot": {"type": "string", "format": "binary"},
+                        },
+                    }
+                }
+            },
+        }
+    },
+)
+async def upload_feedback(
+    request: Request,
+    user: UserDep,
+    db: DbDep,
+) -> FeedbackCreateResponse:
+    """Persist feedback sent as ``multipart/form-data``, streaming its screenshot.
+
+    The same feedback as `create_feedback`: a ``feedback`` part holding the JSON body
+    without ``screenshot``, and optionally a ``screenshot`` file part with the image
+    itself, PNG, JPEG or WebP. The image's type and size are checked as it arrives,
+    so an upload that is too large or not the image it claims to be is refused
+    without being read whole; it is spooled meanwhile, and goes to the screenshot
+    store only once the body has ended. The body as a whole is cut off past the
+    largest it could legitimately be, whether or not ``Content-Length`` declared it.
+    """
+
+    delimiter = boundary(request.headers.get("content-type", ""))
+    if delimiter is None:
+        raise HTTPException(status_code=415, detail="Expected multipart/form-data")
+    declared = request.headers.get("content-length", "")
+    body_max = settings.feedback_screenshot_max_bytes + FEEDBACK_PART_MAX + 4 * HEADERS_MAX
+    if declared.isdigit() and int(declared) > body_max:
+        raise HTTPException(status_code=413, detail="Feedback upload too large")
+
+    reader = MultipartReader(delimiter)
+    feedback: bytearray | None = None
+    screenshot: _ScreenshotUpload | None = None
+    current: str | None = None
+    received = 0
+    try:
+        try:
+            async for chunk in request.stream():
+                received += len(chunk)
+                if received > body_max:
+                    raise HTTPException(status_code=413, detail="Feedback upload too large")
+                for item in reader.feed(chunk):
+                    if isinstance(item, Part):
+                        current = item.name
+                        if current == "feedback":
+                            if feedback is not None:
+                                raise HTTPException(
+                                    status_code=400, detail="Duplicate feedback part"
+                                )
+                            feedback = bytearray()
+                        elif current == "screenshot":
+                            if screenshot is not None:
+                                raise HTTPException(
+                                    status_code=400, detail="Duplicate screenshot part"
+                                )
+                            screenshot = _ScreenshotUpload(item.content_type)
+                    elif current == "feedback":
+                        feedback += item
+                        if len(feedback) > FEEDBACK_PART_MAX:
+                            raise HTTPException(status_code=413, detail="Feedback part too large")
+                    elif current == "screenshot":
+                        screenshot.write(item)
+            reader.close()
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail="Malformed multipart body") from exc
+
+        if feedback is None:
+            raise HTTPException(status_code=400, detail="Missing feedback part")
+        try:
+            body = FeedbackCreateRequest.model_validate_json(bytes(feedback))
+        except ValidationError as exc:
+            raise RequestValidationError(exc.errors(include_url=False)) from exc
+        if body.screenshot is not None:
+            raise HTTPException(status_code=400, detail="Send the screenshot as its own part")
+
+        screenshot_id = await screenshot.store(db) if screenshot is not None else None
+    finally:
+        if screenshot is not None:
+            screenshot.close()
 
-    return FeedbackCreateResponse(
-        id=str(entry.id),
-        created_at=entry.created_at,
+    return await _save(
+        db,
+        _feedback_values(
+            request,
+            user.sub,
+            body,
+            screenshot_id,
+            screenshot.mime_type if screenshot is not None else None,
+        ),
     )
@@ -2,12 +2,12 @@
 """Forecast route — GET /api/forecast."""
 import asyncio
 import logging
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, time, timedelta, timezone
 from typing import Any
 
 from fastapi import APIRouter, Query
 
-from celine.webapp.api.deps import DTDep, UserDep
+from celine.webapp.api.deps import DTDep, UserDep, ZoneDep, local_zone
 from celine.webapp.api.schemas import ForecastHourItem, ForecastResponse
 
 logger = logging.getLogger(__name__)
@@ -69,12 +69,14 @@ def _sort_dedup(items: list[ForecastHourItem]) -> list[ForecastHourItem]:
 async def forecast(
     user: UserDep,
     dt: DTDep,
+    requested_zone: ZoneDep,
     days: int = Query(1, ge=1, le=2),
 ) -> ForecastResponse:
     """Return per-device and REC-level energy forecasts.
 
     ``days`` controls how many days of forecast to return (1 = today only,
-    2 = today + tomorrow).  The window always starts at today 05:00 UTC.
+    2 = today + tomorrow).  The window always starts at today 05:00 in the
+    member's zone.
     """
 
     participant = await dt.participants.profile(user.sub)
@@ -92,10 +94,13 @@ async def forecast(
     except Exception as exc:
         logger.warning("Failed to fetch assets for %s: %s", user.sub, exc)
 
-    # Time window: today 05:00 → (today + days) 00:00
-    tz = timezone.utc
-    today_05 = datetime.now(tz).replace(hour=5, minute=0, second=0, microsecond=0)
-    tomorrow_midnight = (today_05 + timedelta(days=days)).replace(hour=0, minute=0, second=0, microsecond=0)
+    # Time window: today 05:00 → (today + days) 00:00, local wall clock, sent as UTC
+    tz = local_zone(requested_zone, community_id)
+    today = datetime.now(tz).date()
+    today_05 = datetime.combine(today, time(5), tzinfo=tz).astimezone(timezone.utc)
+    tomorrow_midnight = datetime.combine(
+        today + timedelta(days=days), time.min, tzinfo=tz
+    ).astimezone(timezone.utc)
 
     async def fetch_meter_forecast():
         try:
@@ -17,8 +17,12 @@ from celine.webapp.api.schemas import (
     RankingInfo,
 )
 from celine.webapp.db.models import UserBadge, SuggestionInteraction
+from celine.webapp.logsampling import RateLimitedLogger, SampledLogger
 
 logger = logging.getLogger(__name__)
+# Per-request diagnostics; fetch counts and latencies are on /metrics.
+sampled = SampledLogger(logger, every=100)
+limited = RateLimitedLogger(logger, interval=60.0)
 
 router = APIRouter(prefix="/api", tags=["gamification"])
 
@@ -155,7 +159,7 @@ async def gamification(user: UserDep, db: DbDep, dt: DTDep) -> GamificationRespo
                 if asset.sensor_id:
                     device_id = asset.sensor_id
                     break
-        logger.info("gamification: user=%s device_id=%r assets_count=%d", user.sub, device_id, len(assets.items) if assets and assets.items else 0)
+        sampled.info("gamification: user=%s device_id=%r assets_count=%d", user.sub, device_id, len(assets.items) if assets and assets.items else 0)
     except Exception as exc:
         logger.warning("Asset lookup failed for %s: %s", user.sub, exc)
 
@@ -177,14 +181,15 @@ async def gamification(user: UserDep, db: DbDep, dt: DTDep) -> GamificationRespo
                 fetcher_id="rec_participant_points",
                 payload={"device_id": device_id},
             )
-            logger.info(
+            sampled.info(
                 "gamification: rec_participant_points user=%s device=%s count=%d",
                 user.sub, device_id, pts_res.count if pts_res else 0,
             )
             if pts_res and pts_res.count > 0:
                 for item in pts_res.items:
                     d = item.to_dict()
-                    logger.debug("gamification: raw row keys=%s values=%s", list(d.keys()), {k: d[k] for k in list(d.keys())[:5]})
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("gamification: raw row keys=%s values=%s", list(d.keys()), {k: d[k] for k in list(d.keys())[:5]})
                     day = str(d.get("ts_date", ""))
                     pts = int(d.get("daily_points") or 0)
                     total_points += pts
@@ -192,13 +197,13 @@ async def gamification(user: UserDep, db: DbDep, dt: DTDep) -> GamificationRespo
         except Exception as exc:
             logger.warning("rec_participant_points fetch failed: %s", exc)
     else:
-        logger.warning("No device_id found for user %s — daily points unavailable", user.sub)
+        limited.warning("no_device", "No device_id found for user %s — daily points unavailable", user.sub)
     daily_points.sort(key=lambda x: x.date)
 
     if season is not None:
         total_points = season.total_points
 
-    logger.info("gamification: user=%s total_points=%d daily_entries=%d", user.sub, total_points, len(daily_points))
+    sampled.info("gamification: user=%s total_points=%d daily_entries=%d", user.sub, total_points, len(daily_points))
 
     # Ranking comes exclusively from the season leaderboard (anonymous rank, own row
     # only). The daily rec_gamification_summary fetcher is no longer called here —
@@ -1,8 +1,19 @@
 from fastapi import APIRouter
+from fastapi.responses import Response
 from pydantic import BaseModel
 
+from celine.webapp.cache import TTLCache
+from celine.webapp.metrics import CONTENT_TYPE_LATEST, render_latest
+from celine.webapp.readiness import readiness
+
 router = APIRouter(tags=["health"])
 
+# Rendered at most once a second, however often it is scraped: the endpoint shares the
+# worker with member traffic, so a misconfigured or hostile scraper costs one render
+# per second rather than one per request.
+METRICS_MIN_INTERVAL = 1.0
+_rendered: TTLCache[str, str] = TTLCache("metrics_exposition", maxsize=1, ttl=METRICS_MIN_INTERVAL)
+
 
 class HealthResponse(BaseModel):
     status: str = "ok"
@@ -11,3 +22,22 @@ class HealthResponse(BaseModel):
 @router.get("/health", response_model=HealthResponse, include_in_schema=False)
 async def health() -> HealthResponse:
     return HealthResponse()
+
+
+@router.get("/ready", response_model=HealthResponse, include_in_schema=False)
+async def ready(response: Response) -> HealthResponse:
+    """503 until this worker has finished starting up."""
+    if readiness.ready:
+        return HealthResponse()
+    response.status_code = 503
+    return HealthResponse(status="failed" if readiness.error else "starting")
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """This worker's metrics, in the Prometheus text format."""
+    body = _rendered.get("body")
+    if body is None:
+        body = render_latest()
+        _rendered.set("body", body)
+    return Response(body, media_type=CONTENT_TYPE_LATEST)
@@ -15,13 +15,6 @@ from celine.webapp.api.schemas import (
 )
 from celine.webapp.db.user_settings import update_user_settings
 
-from celine.sdk.openapi.nudging.models import (
-    SubscribeRequest,
-    WebPushSubscriptionIn,
-    WebPushKeysIn,
-    UnsubscribeRequest,
-)
-
 router = APIRouter(prefix="/api/notifications", tags=["notifications"])
 
 
@@ -125,6 +118,12 @@ async def webpush_subscribe(
     payload: PushSubscriptionPayload,
 ) -> SuccessResponse:
     """Enable notifications for user."""
+    from celine.sdk.openapi.nudging.models import (
+        SubscribeRequest,
+        WebPushKeysIn,
+        WebPushSubscriptionIn,
+    )
+
     await nudging_client.subscribe(
         body=SubscribeRequest(
             subscription=WebPushSubscriptionIn(
@@ -153,6 +152,8 @@ async def webpush_unsubscribe(
     nudging_client: NudgingDep,
     payload: PushSubscriptionUnsubscribePayload,
 ) -> SuccessResponse:
+    from celine.sdk.openapi.nudging.models import UnsubscribeRequest
+
     await nudging_client.unsubscribe(
         body=UnsubscribeRequest(endpoint=payload.endpoint),
     )
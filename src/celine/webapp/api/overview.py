@@ -1,17 +1,14 @@
 # celine/webapp/api/overview.py
 """Overview and dashboard routes."""
 import logging
-from datetime import date, datetime, time, timedelta, timezone
+from datetime import date, datetime, time, timedelta, timezone, tzinfo
 from typing import Any
 
-from celine.sdk.dt.community import DTApiError
-from celine.sdk.openapi.dt import errors as dt_errors
-from celine.sdk.openapi.dt.types import Unset, UNSET
-
 from fastapi import APIRouter, HTTPException, Query
 
-from celine.webapp.api.deps import DbDep, DTDep, UserDep
+from celine.webapp.api.deps import DbDep, DTDep, UserDep, ZoneDep, local_zone
 from celine.webapp.api.schemas import OverviewResponse
+from celine.webapp.timestamps import day_keys
 
 
 logger = logging.getLogger(__name__)
@@ -48,13 +45,19 @@ def _resolve_overview_window(
     days: int,
     start_date: date | None,
     end_date: date | None,
+    tz: tzinfo = timezone.utc,
 ) -> tuple[datetime, datetime, datetime, int, str]:
     """Resolve overview query and display windows.
 
+    Dates are days in ``tz``: a range runs from local midnight to local midnight, and
+    "today" is the member's today. The instants returned are UTC, as the Digital Twin
+    is queried in UTC; the trend builders take the same ``tz`` to turn them back into
+    days.
+
     The query end can be exclusive midnight for historical custom ranges, while
     the display end is the last date that should appear in daily trend charts.
     """
-    now = datetime.now(timezone.utc)
+    now = datetime.now(tz)
 
     if start_date is not None or end_date is not None:
         if start_date is None or end_date is None:
@@ -80,31 +83,44 @@ def _resolve_overview_window(
                 detail=f"Date range cannot exceed {MAX_OVERVIEW_RANGE_DAYS} days",
             )
 
-        query_start = datetime.combine(start_date, time.min, tzinfo=timezone.utc)
-        end_exclusive = datetime.combine(
-            end_date + timedelta(days=1),
-            time.min,
-            tzinfo=timezone.utc,
-        )
+        query_start = datetime.combine(start_date, time.min, tzinfo=tz)
+        end_exclusive = datetime.combine(end_date + timedelta(days=1), time.min, tzinfo=tz)
         query_end = min(end_exclusive, now) if end_date == now.date() else end_exclusive
-        trend_end = datetime.combine(end_date, time.max, tzinfo=timezone.utc)
+        trend_end = datetime.combine(end_date, time.max, tzinfo=tz)
         if end_date == now.date():
             trend_end = now
 
         return (
-            query_start,
-            query_end,
-            trend_end,
+            query_start.astimezone(timezone.utc),
+            query_end.astimezone(timezone.utc),
+            trend_end.astimezone(timezone.utc),
             range_days,
             f"{start_date.isoformat()} to {end_date.isoformat()}",
         )
 
     range_days = days
     start = now.date() - timedelta(days=range_days - 1)
-    query_start = datetime.combine(start, time.min, tzinfo=timezone.utc)
+    query_start = datetime.combine(start, time.min, tzinfo=tz).astimezone(timezone.utc)
+    now = now.astimezone(timezone.utc)
     return query_start, now, now, range_days, f"Last {range_days} days"
 
 
+def _daily_window(start: datetime, end: datetime, tz: tzinfo) -> tuple[datetime, datetime]:
+    """The span of UTC days covering the dates in ``tz`` from ``start`` to ``end``.
+
+    `rec_self_consumption_daily` rows are already one per UTC day, stamped at its
+    midnight, so they are asked for by date — from the first date's midnight to the
+    midnight after the last — rather than by the local instants of the window, which
+    would cut the first or last row off in zones away from UTC.
+    """
+    first = start.astimezone(tz).date()
+    last = end.astimezone(tz).date()
+    return (
+        datetime.combine(first, time.min, tzinfo=timezone.utc),
+        datetime.combine(last + timedelta(days=1), time.min, tzinfo=timezone.utc),
+    )
+
+
 def _rec_self_consumption_fetcher_id(range_days: int) -> str:
     if range_days > DAILY_REC_FETCHER_THRESHOLD_DAYS:
         return "rec_self_consumption_daily"
@@ -116,6 +132,7 @@ async def overview(
     user: UserDep,
     db: DbDep,
     dt: DTDep,
+    requested_zone: ZoneDep,
     days: int = Query(
         7,
         ge=1,
@@ -138,6 +155,10 @@ async def overview(
     - REC-level self-consumption from community domain (rec_self_consumption value fetcher)
     """
 
+    from celine.sdk.dt.community import DTApiError
+    from celine.sdk.openapi.dt import errors as dt_errors
+    from celine.sdk.openapi.dt.types import Unset
+
     # Resolve participant's community.
     participant_id = user.sub
     community_id: str | None = None
@@ -164,6 +185,7 @@ async def overview(
 
     community_id = participant.membership.community.key
     member_id = participant.membership.member.key
+    tz = local_zone(requested_zone, community_id)
 
     devices: list[dict] = []
     try:
@@ -219,6 +241,7 @@ async def overview(
         days,
         start_date,
         end_date,
+        tz,
     )
 
     # -------------------------------------------------------------------------
@@ -308,7 +331,7 @@ async def overview(
     # Build user daily trend from meters_data (import/export) + virtual consumption (shared energy)
     if meters_items_raw or virtual_items_raw:
         user_trend = _build_user_daily_trend_merged(
-            meters_items_raw, virtual_items_raw, trend_start, trend_end,
+            meters_items_raw, virtual_items_raw, trend_start, trend_end, tz,
         )
 
     # -------------------------------------------------------------------------
@@ -317,12 +340,16 @@ async def overview(
     if community_id:
         try:
             rec_fetcher_id = _rec_self_consumption_fetcher_id(range_days)
+            rec_start, rec_end, rows_tz = trend_start, query_end, tz
+            if rec_fetcher_id == "rec_self_consumption_daily":
+                rec_start, rec_end = _daily_window(trend_start, trend_end, tz)
+                rows_tz = timezone.utc
             rec_response = await dt.communities.fetch_values(
                 community_id=community_id,
                 fetcher_id=rec_fetcher_id,
                 payload={
-                    "start": trend_start.isoformat(),
-                    "end": query_end.isoformat(),
+                    "start": rec_start.isoformat(),
+                    "end": rec_end.isoformat(),
                 },
             )
 
@@ -352,7 +379,7 @@ async def overview(
 
                 # Build trend from the same data (group by day)
                 trend = _build_daily_trend(
-                    [item.to_dict() for item in items], trend_start, trend_end
+                    [item.to_dict() for item in items], trend_start, trend_end, tz, rows_tz
                 )
 
         except Exception as exc:
@@ -364,7 +391,7 @@ async def overview(
 
     # Fallback trend if DT didn't provide data
     if not trend:
-        base = trend_end.date()
+        base = trend_end.astimezone(tz).date()
         for d in range(range_days):
             day = (base - timedelta(days=(range_days - 1 - d))).isoformat()
             trend.append(
@@ -387,50 +414,41 @@ async def overview(
     )
 
 
-def _parse_date_key(ts_str: Any) -> str | None:
-    """Extract YYYY-MM-DD date key from a timestamp string or datetime."""
-    if not ts_str:
-        return None
-    try:
-        if isinstance(ts_str, str):
-            ts = datetime.fromisoformat(ts_str.replace(" ", "T").split("+")[0])
-        else:
-            ts = ts_str
-        return ts.date().isoformat()
-    except (ValueError, AttributeError):
-        return None
-
-
 def _build_user_daily_trend_merged(
     meter_items: list[dict],
     virtual_items: list[dict],
     start: datetime,
     end: datetime,
+    tz: tzinfo = timezone.utc,
 ) -> list[dict]:
-    """Build daily user trend from meters_data (import/export) and virtual consumption (shared energy)."""
+    """Build daily user trend from meters_data (import/export) and virtual consumption (shared energy).
+
+    Rows are binned on their day in ``tz``.
+    """
     from collections import defaultdict
 
-    num_days = max(1, (end.date() - start.date()).days + 1)
+    base = end.astimezone(tz).date()
+    num_days = max(1, (base - start.astimezone(tz).date()).days + 1)
 
     meter_daily: dict[str, dict[str, float]] = defaultdict(
         lambda: {"consumption_kwh": 0.0, "production_kwh": 0.0}
     )
-    for item in meter_items:
-        date_key = _parse_date_key(item.get("ts"))
+    meter_keys = day_keys([item.get("ts") for item in meter_items], tz)
+    for item, date_key in zip(meter_items, meter_keys):
         if not date_key:
             continue
-        meter_daily[date_key]["consumption_kwh"] += _safe_float(item.get("consumption_kwh"))
-        meter_daily[date_key]["production_kwh"] += _safe_float(item.get("production_kwh"))
+        md = meter_daily[date_key]
+        md["consumption_kwh"] += _safe_float(item.get("consumption_kwh"))
+        md["production_kwh"] += _safe_float(item.get("production_kwh"))
 
     virtual_daily: dict[str, float] = defaultdict(float)
-    for item in virtual_items:
-        date_key = _parse_date_key(item.get("ts"))
+    virtual_keys = day_keys([item.get("ts") for item in virtual_items], tz)
+    for item, date_key in zip(virtual_items, virtual_keys):
         if not date_key:
             continue
         virtual_daily[date_key] += _safe_float(item.get("virtual_consumption_kwh"))
 
     trend = []
-    base = end.date()
     for d in range(num_days):
         day = (base - timedelta(days=(num_days - 1 - d))).isoformat()
         has_meter = day in meter_daily
@@ -457,14 +475,19 @@ def _build_daily_trend(
     items: list[dict],
     start: datetime,
     end: datetime,
+    tz: tzinfo = timezone.utc,
+    rows_tz: tzinfo | None = None,
 ) -> list[dict]:
     """Build daily trend from hourly REC data.
 
-    Groups hourly rec_virtual_consumption records by day and sums values.
+    Groups hourly rec_virtual_consumption records by their day in ``tz`` and sums values.
+    Rows that are already daily are binned on their own date instead: ``rows_tz`` is
+    the zone their days are in, UTC for `rec_self_consumption_daily`.
     """
     from collections import defaultdict
 
-    num_days = max(1, (end.date() - start.date()).days + 1)
+    base = end.astimezone(tz).date()
+    num_days = max(1, (base - start.astimezone(tz).date()).days + 1)
 
     daily_data: dict[str, dict[str, float]] = defaultdict(
         lambda: {
@@ -474,35 +497,17 @@ def _build_daily_trend(
         }
     )
 
-    for item in items:
-        ts_str = item.get("ts")
-        if not ts_str:
-            continue
-
-        # Parse timestamp and extract date
-        try:
-            if isinstance(ts_str, str):
-                # Handle various timestamp formats
-                ts = datetime.fromisoformat(ts_str.replace(" ", "T").split("+")[0])
-            else:
-                ts = ts_str
-            date_key = ts.date().isoformat()
-        except (ValueError, AttributeError):
+    keys = day_keys([item.get("ts") for item in items], rows_tz or tz)
+    for item, date_key in zip(items, keys):
+        if not date_key:
             continue
-
-        daily_data[date_key]["consumption_kwh"] += _safe_float(
-            item.get("total_consumption_kwh")
-        )
-        daily_data[date_key]["production_kwh"] += _safe_float(
-            item.get("total_production_kwh")
-        )
-        daily_data[date_key]["self_consumption_kwh"] += _safe_float(
-            item.get("self_consumption_kwh")
-        )
+        dd = daily_data[date_key]
+        dd["consumption_kwh"] += _safe_float(item.get("total_consumption_kwh"))
+        dd["production_kwh"] += _safe_float(item.get("total_production_kwh"))
+        dd["self_consumption_kwh"] += _safe_float(item.get("self_consumption_kwh"))
 
     # Build sorted trend list for the requested period
     trend = []
-    base = end.date()
     for d in range(num_days):
         day = (base - timedelta(days=(num_days - 1 - d))).isoformat()
         if day in daily_data:
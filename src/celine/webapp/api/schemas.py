@@ -422,7 +422,12 @@ class DataSharingStatusResponse(BaseModel):
 
 
 class DataSharingHistoryResponse(BaseModel):
-    """The member's own record of what happened with their data."""
+    """One page of the member's own record of what happened with their data.
+
+    `next_cursor` is passed back as `cursor` for the page after this one; null on
+    the last page.
+    """
 
     has_identity: bool
     events: list[dict] = Field(default_factory=list)
+    next_cursor: Optional[str] = None
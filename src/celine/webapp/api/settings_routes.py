@@ -1,18 +1,30 @@
 """User settings API routes."""
 
 import logging
+from typing import Any
 
-from fastapi import APIRouter, HTTPException, Request, status
+from fastapi import APIRouter, HTTPException, Request, Response, status
 from pydantic import ValidationError
 
 from celine.webapp.api.deps import UserDep, DbDep, NudgingDep
 from celine.webapp.api.schemas import SettingsModel
+from celine.webapp.cache import TTLCache
 from celine.webapp.db.user_settings import load_user_settings, update_user_settings
+from celine.webapp.services.nudging_outbox import outbox
 
 router = APIRouter(prefix="/api", tags=["settings"])
 logger = logging.getLogger(__name__)
 SUPPORTED_NOTIFICATION_LANGS = {"it", "en", "es"}
 
+# Preferences this replica last pushed to the nudging tool successfully, per member.
+# Only used to decide what a PUT needs to send. Never filled from a read: a GET
+# that finds the upstream holding something else (another replica or device wrote
+# since) drops the entry, as does a failed push, and a member with no entry has
+# every field pushed. Kept short for writes elsewhere that no GET here has seen.
+_pushed_preferences: TTLCache[str, dict[str, Any]] = TTLCache(
+    "nudging_preferences", maxsize=4096, ttl=60
+)
+
 
 def _validation_detail(exc: ValidationError) -> str:
     """The first validation message, as a plain string.
@@ -47,6 +59,32 @@ def _preferred_lang(request: Request) -> str | None:
     return None
 
 
+def _preference_changes(
+    desired: dict[str, Any], known: dict[str, Any] | None
+) -> dict[str, Any]:
+    """The fields of ``desired`` the nudging tool does not already hold.
+
+    With nothing known, everything is a change. ``None`` means "leave as is" to the
+    upstream, so it is never a change. Kinds are compared as a set: the catalogue
+    order is presentation, not preference.
+    """
+    if known is None:
+        return {key: value for key, value in desired.items() if value is not None}
+
+    changes: dict[str, Any] = {}
+    for key, value in desired.items():
+        if value is None:
+            continue
+        current = known.get(key)
+        if key == "enabled_notification_kinds" and current is not None:
+            if sorted(value) == sorted(current):
+                continue
+        elif current == value:
+            continue
+        changes[key] = value
+    return changes
+
+
 @router.get("/settings", response_model=SettingsModel)
 async def get_settings(
     request: Request,
@@ -65,6 +103,21 @@ async def get_settings(
             notification_limit = 3
         email_enabled = bool(getattr(prefs, "channel_email", False))
         email = str(getattr(prefs, "email", "") or "")
+        pushed = _pushed_preferences.get(user.sub)
+        if pushed is not None:
+            held = {
+                "max_per_day": getattr(prefs, "max_per_day", None),
+                "channel_email": email_enabled,
+                "email": email,
+                "enabled_notification_kinds": getattr(
+                    prefs, "enabled_notification_kinds", None
+                ),
+                "lang": getattr(prefs, "lang", None),
+            }
+            # Only what the upstream reports can be seen to differ.
+            reported = {key: value for key, value in pushed.items() if held[key] is not None}
+            if _preference_changes(reported, held):
+                _pushed_preferences.pop(user.sub)
     except Exception as exc:
         logger.error("Could not load nudging preferences for %s: %s", user.sub, exc)
         raise HTTPException(
@@ -99,12 +152,20 @@ async def get_settings(
 @router.put("/settings", response_model=SettingsModel)
 async def update_settings(
     request: Request,
+    response: Response,
     user: UserDep,
     db: DbDep,
     nudging_client: NudgingDep,
     lang: str | None = None,
 ) -> SettingsModel:
-    """Update user settings."""
+    """Update user settings.
+
+    The local row is written in one upsert. Only the notification preferences that
+    differ from what this replica last pushed are pushed upstream, and nothing is
+    pushed when none do; with no push on record, every preference is. A push that
+    fails is handed to the outbox and answered 202: the local half has committed, and
+    the rest will follow.
+    """
 
     data = await request.json()
     try:
@@ -129,38 +190,41 @@ async def update_settings(
         webpush_enabled=model.notifications.webpush_enabled,
     )
 
+    desired = {
+        "max_per_day": model.notifications.limit,
+        "channel_email": model.notifications.email_enabled,
+        "email": model.notifications.email,
+        "enabled_notification_kinds": [
+            item.kind for item in model.notifications.kinds if item.enabled
+        ],
+        "lang": _normalize_lang(lang) or _preferred_lang(request),
+    }
+    pushed = _pushed_preferences.get(user.sub)
+    changes = _preference_changes(desired, pushed)
+    if not changes:
+        return model
+
+    # `max_per_day` is the one field the upstream requires on every write.
+    payload = {**changes, "max_per_day": model.notifications.limit}
     try:
-        await nudging_client.update_preferences(
-            max_per_day=model.notifications.limit,
-            channel_email=model.notifications.email_enabled,
-            email=model.notifications.email,
-            lang=_normalize_lang(lang) or _preferred_lang(request),
-            enabled_notification_kinds=[
-                item.kind for item in model.notifications.kinds if item.enabled
-            ],
-        )
+        await nudging_client.update_preferences(**payload)
     except Exception as exc:
-        logger.warning(
-            "Could not update nudging notification kinds for %s, retrying without kinds: %s",
-            user.sub,
-            exc,
-        )
-        try:
-            await nudging_client.update_preferences(
-                max_per_day=model.notifications.limit,
-                channel_email=model.notifications.email_enabled,
-                email=model.notifications.email,
-                lang=_normalize_lang(lang) or _preferred_lang(request),
-            )
-        except Exception as fallback_exc:
+        _pushed_preferences.pop(user.sub)
+        if not outbox.submit(user.sub, nudging_client, payload):
             logger.error(
-                "Could not update nudging preferences for %s: %s",
-                user.sub,
-                fallback_exc,
+                "Could not update nudging preferences for %s: %s", user.sub, exc
             )
             raise HTTPException(
                 status_code=status.HTTP_502_BAD_GATEWAY,
                 detail="Could not update notification preferences",
-            ) from fallback_exc
+            ) from exc
+        logger.warning(
+            "Could not update nudging preferences for %s, queued for retry: %s",
+            user.sub,
+            exc,
+        )
+        response.status_code = status.HTTP_202_ACCEPTED
+        return model
 
+    _pushed_preferences.set(user.sub, {**(pushed or {}), **payload})
     return model
@@ -8,7 +8,6 @@ import httpx
 from fastapi import APIRouter, HTTPException
 from sqlalchemy import select, func
 
-from celine.sdk.auth.oidc import OidcClientCredentialsProvider
 from celine.webapp.api.deps import DbDep, FlexibilityDep, UserDep
 from celine.webapp.api.schemas import (
     BadgeItem,
@@ -21,6 +20,8 @@ from celine.webapp.api.schemas import (
 )
 from celine.webapp.db.models import SuggestionInteraction, UserBadge
 from celine.webapp.settings import settings
+from celine.webapp.tracing import inject
+from celine.webapp.upstreams import observe_upstream
 
 logger = logging.getLogger(__name__)
 
@@ -124,6 +125,8 @@ async def _schedule_flexibility_reminder(
             detail="OIDC client credentials not configured for nudging reminders",
         )
 
+    from celine.sdk.auth.oidc import OidcClientCredentialsProvider
+
     provider = OidcClientCredentialsProvider(
         base_url=settings.oidc.base_url,
         client_id=client_id,
@@ -144,18 +147,20 @@ async def _schedule_flexibility_reminder(
         "lang": (lang or "en").split("-")[0],
     }
 
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.post(
-            f"{settings.nudging_api_url.rstrip('/')}/admin/scheduled-events",
-            headers={"Authorization": f"Bearer {access_token.access_token}"},
-            json={
-                "event_type": "flexibility_reminder",
-                "user_id": user_id,
-                "external_key": f"flexibility-reminder:{user_id}:{suggestion_id}",
-                "trigger_at": trigger_at.astimezone(timezone.utc).isoformat(),
-                "facts": facts,
-            },
-        )
+    with observe_upstream("nudging", "scheduled_events") as call:
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            response = await client.post(
+                f"{settings.nudging_api_url.rstrip('/')}/admin/scheduled-events",
+                headers=inject({"Authorization": f"Bearer {access_token.access_token}"}),
+                json={
+                    "event_type": "flexibility_reminder",
+                    "user_id": user_id,
+                    "external_key": f"flexibility-reminder:{user_id}:{suggestion_id}",
+                    "trigger_at": trigger_at.astimezone(timezone.utc).isoformat(),
+                    "facts": facts,
+                },
+            )
+        call.status = response.status_code
     if response.status_code not in {200, 201}:
         raise HTTPException(
             status_code=502,
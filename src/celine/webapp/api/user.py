@@ -12,19 +12,22 @@ from celine.webapp.api.schemas import (
     OnboardingSeenRequest,
     SuccessResponse,
 )
-from celine.webapp.db import (
-    PolicyAcceptance,
-    Settings,
-)
-from celine.webapp.db.user_settings import (
-    list_onboarding_seen_pages,
-    mark_onboarding_page_seen,
-)
+from celine.webapp.cache import TTLCache
+from celine.webapp.db import PolicyAcceptance
+from celine.webapp.db.profile import invalidate_user_profile, load_user_profile
+from celine.webapp.db.user_settings import mark_onboarding_page_seen
 from celine.webapp.settings import settings as app_settings
 
 
 router = APIRouter(prefix="/api", tags=["user"])
 
+# Members known to have accepted the current policy version. Only that answer is
+# cached: acceptances are never withdrawn, so it cannot go stale on another replica,
+# whereas "not yet accepted" can stop being true anywhere at any moment.
+_accepted_current_policy: TTLCache[str, str] = TTLCache(
+    "policy_gate", maxsize=10_000, ttl=3600
+)
+
 
 @router.get("/ping", include_in_schema=False)
 async def ping(user: UserDep) -> dict:
@@ -32,56 +35,58 @@ async def ping(user: UserDep) -> dict:
 
 
 async def get_accepted_policy_version(user_id: str, db: AsyncSession) -> str | None:
-    """Get the accepted policy version for a user."""
+    """Get the policy version the user accepted most recently.
+
+    Served by the ``(user_id, accepted_at DESC)`` index as a ``LIMIT 1``. Reading every
+    row and calling ``scalar_one_or_none`` raised as soon as a member had accepted twice.
+    """
     result = await db.execute(
-        select(PolicyAcceptance)
+        select(PolicyAcceptance.policy_version)
         .filter(PolicyAcceptance.user_id == user_id)
         .order_by(PolicyAcceptance.accepted_at.desc())
+        .limit(1)
     )
-    acceptance = result.scalar_one_or_none()
-    return acceptance.policy_version if acceptance else None
+    return result.scalar_one_or_none()
+
+
+def _remember_acceptance(user_id: str, accepted: str | None) -> None:
+    if accepted == app_settings.policy_version:
+        _accepted_current_policy.set(user_id, accepted)
 
 
 async def terms_required_for(user_id: str, db: AsyncSession) -> tuple[bool, str | None]:
     """
     Check if terms acceptance is required.
     Returns (required: bool, accepted_version: str | None)
+
+    Once a member is known to have accepted the current version, this costs no query.
     """
-    accepted = await get_accepted_policy_version(user_id, db)
+    accepted = _accepted_current_policy.get(user_id)
+    if accepted is None:
+        accepted = await get_accepted_policy_version(user_id, db)
+        _remember_acceptance(user_id, accepted)
     required = accepted != app_settings.policy_version
     return required, accepted
 
 
-async def get_user_settings(user_id: str, db: AsyncSession) -> Settings:
-    """Get or create user settings."""
-    result = await db.execute(select(Settings).filter(Settings.user_id == user_id))
-    settings_obj = result.scalar_one_or_none()
-
-    if not settings_obj:
-        settings_obj = Settings(
-            user_id=user_id,
-            simple_mode=False,
-            font_scale=1.0,
-            email_notifications=False,
-        )
-        db.add(settings_obj)
-        await db.commit()
-        await db.refresh(settings_obj)
-
-    return settings_obj
-
-
 @router.get("/me", response_model=MeResponse)
 async def me(
     request: Request,
     user: UserDep,
     db: DbDep,
 ) -> MeResponse:
-    """Get current user information."""
+    """Get current user information.
+
+    Everything read from the database comes from one cached bootstrap query; see
+    `db/profile.py`. Once the member is known to have accepted the current policy,
+    that query no longer looks the acceptance up.
+    """
 
-    required, accepted_version = await terms_required_for(user.sub, db)
-    settings = await get_user_settings(user.sub, db)
-    onboarding_seen_pages = await list_onboarding_seen_pages(user.sub, db)
+    known = _accepted_current_policy.get(user.sub)
+    profile = await load_user_profile(user.sub, db, accepted_policy_version=known)
+    accepted_version = known or profile.accepted_policy_version
+    required = accepted_version != app_settings.policy_version
+    _remember_acceptance(user.sub, accepted_version)
 
     notification_permission = request.headers.get(
         "X-REC-Notification-Permission", "default"
@@ -96,12 +101,12 @@ async def me(
         terms_required=required,
         policy_version=app_settings.policy_version,
         accepted_policy_version=accepted_version,
-        simple_mode=settings.simple_mode,
-        font_scale=settings.font_scale,
+        simple_mode=profile.simple_mode,
+        font_scale=profile.font_scale,
         notification_permission=notification_permission,
-        webpush_configured=settings.webpush_enabled,
-        onboarding_seen=settings.onboarding_seen_at is not None,
-        onboarding_seen_pages=onboarding_seen_pages,
+        webpush_configured=profile.webpush_enabled,
+        onboarding_seen=profile.onboarding_seen_at is not None,
+        onboarding_seen_pages=list(profile.onboarding_seen_pages),
         data_sharing_enabled=app_settings.data_sharing_ready,
     )
 
@@ -129,16 +134,8 @@ async def accept_terms(
     if not body.accept:
         raise HTTPException(status_code=400, detail="accept must be true")
 
-    # Check if already accepted
-    result = await db.execute(
-        select(PolicyAcceptance).filter(
-            PolicyAcceptance.user_id == user.sub,
-            PolicyAcceptance.policy_version == app_settings.policy_version,
-        )
-    )
-    existing = result.scalar_one_or_none()
-
-    if not existing:
+    required, _ = await terms_required_for(user.sub, db)
+    if required:
         acceptance = PolicyAcceptance(
             user_id=user.sub,
             policy_version=app_settings.policy_version,
@@ -147,5 +144,7 @@ async def accept_terms(
         )
         db.add(acceptance)
         await db.commit()
+        _remember_acceptance(user.sub, app_settings.policy_version)
+        invalidate_user_profile(user.sub)
 
     return SuccessResponse()
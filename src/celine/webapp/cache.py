@@ -0,0 +1,138 @@
+"""Small in-process caches.
+
+This service runs several replicas behind one ingress, so nothing cached here is
+authoritative: every entry is a per-replica shortcut with a short lifetime, and
+every cache is bounded so a burst of distinct users cannot grow a worker without
+limit. Anything that must be consistent across replicas belongs in the database
+or upstream, not here.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+from celine.webapp.metrics import Counter
+from celine.webapp.tracing import tracer
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+_registry: dict[str, "TTLCache"] = {}
+
+cache_lookups = Counter(
+    "cache_lookups_total",
+    "Cache lookups by cache and result (hit or miss); the hit ratio is hit / total.",
+    ("cache", "result"),
+)
+
+coalesced_calls = Counter(
+    "coalesced_calls_total",
+    "Calls that joined one already in flight for the same key instead of making their own.",
+    ("flight",),
+)
+
+
+def clear_all() -> None:
+    """Empty every cache in the process. For tests, which share one process."""
+    for cache in _registry.values():
+        cache.clear()
+
+
+class TTLCache(Generic[K, V]):
+    """A bounded LRU map whose entries expire after ``ttl`` seconds.
+
+    Not thread-safe, and not meant to be: it is only touched from the event loop.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        _registry[name] = self
+
+    def get(self, key: K) -> V | None:
+        span = tracer.start_span(f"cache {self.name}", nested_only=True)
+        value = self._lookup(key)
+        hit = value is not None
+        cache_lookups.inc(cache=self.name, result="hit" if hit else "miss")
+        if span is not None:
+            span.set_attribute("celine.cache.name", self.name)
+            span.set_attribute("celine.cache.hit", hit)
+            tracer.end_span(span)
+        return value
+
+    def _lookup(self, key: K) -> V | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        """Store ``value``. ``ttl`` overrides the cache default for this entry."""
+        lifetime = self.ttl if ttl is None else ttl
+        if lifetime <= 0:
+            self._data.pop(key, None)
+            return
+        self._data[key] = (time.monotonic() + lifetime, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: K) -> V | None:
+        entry = self._data.pop(key, None)
+        return entry[1] if entry is not None else None
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SingleFlight(Generic[K, V]):
+    """Concurrent calls for the same key share one in-flight call.
+
+    Nothing is kept once the call finishes: a caller arriving while it is in flight
+    gets its answer (or its exception), one arriving after makes a new call. So it
+    can coalesce what must never be cached.
+
+    The call runs as its own task. A caller that is cancelled stops waiting for it
+    without cancelling it for the others.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._flights: dict[K, asyncio.Task[V]] = {}
+
+    def start(self, key: K, call: Callable[[], Awaitable[V]]) -> asyncio.Task[V]:
+        """The call in flight for ``key``, starting ``call()`` if there is none."""
+        task = self._flights.get(key)
+        if task is not None:
+            coalesced_calls.inc(flight=self.name)
+            return task
+        task = asyncio.ensure_future(call())
+        self._flights[key] = task
+        task.add_done_callback(lambda done: self._landed(key, done))
+        return task
+
+    async def run(self, key: K, call: Callable[[], Awaitable[V]]) -> V:
+        return await asyncio.shield(self.start(key, call))
+
+    def _landed(self, key: K, task: asyncio.Task[V]) -> None:
+        if self._flights.get(key) is task:
+            del self._flights[key]
+        if not task.cancelled():
+            # Retrieved here so one nobody waited for is not reported as lost.
+            task.exception()
+
+    def __len__(self) -> int:
+        return len(self._flights)
@@ -2,16 +2,43 @@
 
 import asyncio
 import json
+import os
+import tempfile
+import textwrap
+import time
+import uuid
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from zipfile import ZIP_DEFLATED, ZipFile
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile, ZipInfo
 
 import typer
-from sqlalchemy import select
+from sqlalchemy import and_, func, or_, select
 
 from celine.webapp.db import FeedbackEntry, get_db_context
+from celine.webapp.db.screenshots import read_screenshot
+from celine.webapp.thumbnails import available as thumbnails_available
+from celine.webapp.thumbnails import make_thumbnail
 
 app = typer.Typer(help="CELINE webapp operational utilities.")
 
+# Rows fetched per round trip. The export holds one batch at a time, whatever the
+# size of the table.
+EXPORT_BATCH_SIZE = 200
+
+# How far behind the database's clock an export with a watermark stops. A row's
+# ``created_at`` is stamped by the transaction that writes it, which may commit a
+# little later than another that stamped after it; rows that recent are left for
+# the next run rather than passed by the watermark before they are visible.
+WATERMARK_LAG = timedelta(minutes=1)
+
+# Image types that are compressed already: deflating them again costs CPU and saves
+# next to nothing, so they go into the archive stored.
+_COMPRESSED_TYPES = frozenset({"image/png", "image/jpeg", "image/webp"})
+
 
 def _normalize_extension(mime_type: str | None) -> str:
     return {
@@ -21,86 +48,283 @@ def _normalize_extension(mime_type: str | None) -> str:
     }.get(mime_type or "", ".bin")
 
 
-async def _export_feedback(output: Path) -> int:
-    output = output.expanduser().resolve()
-    output.parent.mkdir(parents=True, exist_ok=True)
+def _utc(value: datetime) -> datetime:
+    """``value`` in UTC; naive values are taken to be UTC already."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
 
-    async with get_db_context() as db:
-        result = await db.execute(
-            select(FeedbackEntry).order_by(FeedbackEntry.created_at.asc())
-        )
-        rows = list(result.scalars())
 
-    with ZipFile(output, "w", compression=ZIP_DEFLATED) as archive:
-        manifest: list[dict[str, object]] = []
+def _read_watermark(path: Path) -> tuple[datetime, uuid.UUID] | None:
+    """The last row a previous export wrote, or None if there was none."""
+    if not path.exists():
+        return None
+    mark = json.loads(path.read_text())
+    return _utc(datetime.fromisoformat(mark["created_at"])), uuid.UUID(mark["id"])
 
-        for row in rows:
-            folder = f"{row.created_at.strftime('%Y%m%dT%H%M%SZ')}_{row.id}"
-            archive.writestr(
-                f"{folder}/comment.txt",
-                (row.comment or "").strip() + "\n",
-            )
 
-            metadata = {
-                "id": str(row.id),
-                "user_id": row.user_id,
-                "rating": row.rating,
-                "comment": row.comment,
-                "page_url": row.page_url,
-                "page_title": row.page_title,
-                "page_path": row.page_path,
-                "locale": row.locale,
-                "timezone": row.timezone,
-                "user_agent": row.user_agent,
-                "viewport_width": row.viewport_width,
-                "viewport_height": row.viewport_height,
-                "screen_width": row.screen_width,
-                "screen_height": row.screen_height,
-                "color_scheme": row.color_scheme,
-                "client_timestamp": row.client_timestamp.isoformat() if row.client_timestamp else None,
-                "client_ip": row.client_ip,
-                "created_at": row.created_at.isoformat(),
-                "extra_context": row.extra_context or {},
-                "has_screenshot": bool(row.screenshot_bytes),
-                "screenshot_mime_type": row.screenshot_mime_type,
-            }
-            archive.writestr(
-                f"{folder}/metadata.json",
-                json.dumps(metadata, indent=2, ensure_ascii=True),
-            )
+def _write_watermark(path: Path, created_at: datetime, entry_id: uuid.UUID) -> None:
+    """Record the last row written. Replaced whole, so a crash leaves the old mark."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(path.name + ".partial")
+    partial.write_text(
+        json.dumps({"created_at": _utc(created_at).isoformat(), "id": str(entry_id)}) + "\n"
+    )
+    os.replace(partial, path)
 
-            screenshot_name = None
-            if row.screenshot_bytes:
-                screenshot_name = f"screenshot{_normalize_extension(row.screenshot_mime_type)}"
-                archive.writestr(f"{folder}/{screenshot_name}", row.screenshot_bytes)
-
-            manifest.append(
-                {
-                    "id": str(row.id),
-                    "folder": folder,
-                    "rating": row.rating,
-                    "created_at": row.created_at.isoformat(),
-                    "page_url": row.page_url,
-                    "screenshot": screenshot_name,
-                }
-            )
 
-        archive.writestr(
-            "manifest.json",
-            json.dumps({"count": len(manifest), "items": manifest}, indent=2, ensure_ascii=True),
+def _feedback_query(
+    since: datetime | None,
+    until: datetime | None,
+    after: tuple[datetime, uuid.UUID] | None,
+):
+    """Feedback in export order, from ``since`` (inclusive) to ``until`` (exclusive).
+
+    ``after`` is a watermark: only rows that sort after it. Ordering on ``id`` as well
+    as ``created_at`` makes the order total, so two rows stamped in the same instant
+    are never split by a watermark.
+    """
+    stmt = select(FeedbackEntry).order_by(
+        FeedbackEntry.created_at.asc(), FeedbackEntry.id.asc()
+    )
+    if since is not None:
+        stmt = stmt.where(FeedbackEntry.created_at >= _utc(since))
+    if until is not None:
+        stmt = stmt.where(FeedbackEntry.created_at < _utc(until))
+    if after is not None:
+        created_at, entry_id = after
+        stmt = stmt.where(
+            or_(
+                FeedbackEntry.created_at > created_at,
+                and_(FeedbackEntry.created_at == created_at, FeedbackEntry.id > entry_id),
+            )
         )
+    return stmt.execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+
+def _metadata(row: FeedbackEntry) -> dict[str, object]:
+    return {
+        "id": str(row.id),
+        "user_id": row.user_id,
+        "rating": row.rating,
+        "comment": row.comment,
+        "page_url": row.page_url,
+        "page_title": row.page_title,
+        "page_path": row.page_path,
+        "locale": row.locale,
+        "timezone": row.timezone,
+        "user_agent": row.user_agent,
+        "viewport_width": row.viewport_width,
+        "viewport_height": row.viewport_height,
+        "screen_width": row.screen_width,
+        "screen_height": row.screen_height,
+        "color_scheme": row.color_scheme,
+        "client_timestamp": row.client_timestamp.isoformat() if row.client_timestamp else None,
+        "client_ip": row.client_ip,
+        "created_at": row.created_at.isoformat(),
+        "extra_context": row.extra_context or {},
+        "has_screenshot": row.screenshot_id is not None,
+        "screenshot_mime_type": row.screenshot_mime_type,
+    }
+
+
+def _write_manifest(archive: ZipFile, count: int, items) -> None:
+    """Write ``manifest.json`` from ``items``, an iterable of one JSON item per line.
+
+    The items are spooled rather than kept in a list, so the manifest costs no memory
+    per row; the output is what ``json.dumps(..., indent=2)`` gives for the whole.
+    """
+    with archive.open("manifest.json", "w") as handle:
+        handle.write(f'{{\n  "count": {count},\n  "items": ['.encode())
+        separator = "\n"
+        for line in items:
+            item = json.dumps(json.loads(line), indent=2, ensure_ascii=True)
+            handle.write((separator + textwrap.indent(item, "    ")).encode())
+            separator = ",\n"
+        handle.write(("\n  ]\n}" if count else "]\n}").encode())
+
+
+@dataclass
+class _Entry:
+    """One feedback row, ready to be written: everything but the screenshot bytes,
+    which are read as they are written unless a thumbnail needed them first."""
+
+    folder: str
+    comment: str
+    metadata: str
+    item: dict[str, object]
+    screenshot_id: uuid.UUID | None = None
+    mime_type: str | None = None
+    data: bytes | None = None
+    thumbnail: "asyncio.Future[bytes | None] | None" = None
+
 
-    typer.echo(f"Exported {len(rows)} feedback item(s) to {output}")
-    return len(rows)
+def _zip_info(name: str, mime_type: str | None) -> ZipInfo:
+    """An archive member for ``name``, stored as-is if its type is already compressed."""
+    info = ZipInfo(name, date_time=time.localtime()[:6])
+    info.compress_type = ZIP_STORED if mime_type in _COMPRESSED_TYPES else ZIP_DEFLATED
+    return info
+
+
+def _thumbnail_pool(workers: int) -> Executor:
+    return ProcessPoolExecutor(max_workers=workers)
+
+
+def _prepare(row: FeedbackEntry, screenshots: bool) -> _Entry:
+    folder = f"{row.created_at.strftime('%Y%m%dT%H%M%SZ')}_{row.id}"
+    entry = _Entry(
+        folder=folder,
+        comment=(row.comment or "").strip() + "\n",
+        metadata=json.dumps(_metadata(row), indent=2, ensure_ascii=True),
+        item={
+            "id": str(row.id),
+            "folder": folder,
+            "rating": row.rating,
+            "created_at": row.created_at.isoformat(),
+            "page_url": row.page_url,
+            "screenshot": None,
+        },
+    )
+    if screenshots and row.screenshot_id is not None:
+        entry.screenshot_id = row.screenshot_id
+        entry.mime_type = row.screenshot_mime_type
+        entry.item["screenshot"] = f"screenshot{_normalize_extension(row.screenshot_mime_type)}"
+    return entry
+
+
+async def _write_entry(archive: ZipFile, blobs, entry: _Entry, manifest) -> None:
+    archive.writestr(f"{entry.folder}/comment.txt", entry.comment)
+    archive.writestr(f"{entry.folder}/metadata.json", entry.metadata)
+
+    if entry.screenshot_id is not None:
+        info = _zip_info(f"{entry.folder}/{entry.item['screenshot']}", entry.mime_type)
+        if entry.data is not None:
+            archive.writestr(info, entry.data)
+        else:
+            with archive.open(info, "w") as handle:
+                async for chunk in read_screenshot(blobs, entry.screenshot_id):
+                    handle.write(chunk)
+
+    if entry.thumbnail is not None:
+        entry.item["thumbnail"] = None
+        thumbnail = await entry.thumbnail
+        if thumbnail is not None:
+            name = entry.item["thumbnail"] = "thumbnail.jpg"
+            archive.writestr(_zip_info(f"{entry.folder}/{name}", "image/jpeg"), thumbnail)
+
+    manifest.write(json.dumps(entry.item, ensure_ascii=True) + "\n")
+
+
+async def _export_feedback(
+    output: Path,
+    screenshots: bool = True,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    watermark: Path | None = None,
+    thumbnails: bool = False,
+    workers: int | None = None,
+) -> int:
+    """Export feedback to ``output``, one row at a time.
+
+    Rows come from a server-side cursor in batches of `EXPORT_BATCH_SIZE` and each is
+    written to the archive as it is read; screenshots are copied chunk by chunk from a
+    second session, since the first is busy with the cursor. The archive is written
+    beside ``output`` and moved into place once complete. With ``watermark``, the
+    export starts after the row recorded there and records its own last row on
+    success, so running the same command again exports only what is new; it also
+    stops `WATERMARK_LAG` short of now, so that no row still committing is skipped.
+
+    With ``thumbnails``, each screenshot is also shrunk to a JPEG preview in a pool of
+    ``workers`` processes. Rows are then read ahead of the one being written, up to
+    two per worker, so the pool stays busy while the archive is written; entries are
+    still written in row order, and the archive is the same whatever the pool size.
+    """
+    output = output.expanduser().resolve()
+    output.parent.mkdir(parents=True, exist_ok=True)
+    partial = output.with_name(output.name + ".partial")
+    after = _read_watermark(watermark) if watermark is not None else None
+    workers = workers or os.cpu_count() or 1
+    loop = asyncio.get_running_loop()
+
+    count = 0
+    last: FeedbackEntry | None = None
+    try:
+        async with get_db_context() as db, get_db_context() as blobs:
+            with (
+                ZipFile(partial, "w", compression=ZIP_DEFLATED) as archive,
+                tempfile.TemporaryFile("w+", encoding="utf-8") as manifest,
+                _thumbnail_pool(workers) if thumbnails else nullcontext() as pool,
+            ):
+                if watermark is not None:
+                    horizon = _utc(await db.scalar(select(func.now()))) - WATERMARK_LAG
+                    until = horizon if until is None else min(_utc(until), horizon)
+                ahead: deque[_Entry] = deque()
+                rows = await db.stream_scalars(_feedback_query(since, until, after))
+                async for row in rows:
+                    entry = _prepare(row, screenshots)
+                    if pool is not None and entry.screenshot_id is not None:
+                        entry.data = b"".join(
+                            [chunk async for chunk in read_screenshot(blobs, entry.screenshot_id)]
+                        )
+                        entry.thumbnail = loop.run_in_executor(pool, make_thumbnail, entry.data)
+                    ahead.append(entry)
+                    if len(ahead) > 2 * workers or pool is None:
+                        await _write_entry(archive, blobs, ahead.popleft(), manifest)
+                    count += 1
+                    last = row
+                    db.expunge(row)
+                while ahead:
+                    await _write_entry(archive, blobs, ahead.popleft(), manifest)
+
+                manifest.seek(0)
+                _write_manifest(archive, count, manifest)
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+
+    os.replace(partial, output)
+    if watermark is not None and last is not None:
+        _write_watermark(watermark, last.created_at, last.id)
+
+    typer.echo(f"Exported {count} feedback item(s) to {output}")
+    return count
 
 
 @app.command("export-feedback")
 def export_feedback(
     output: Path = typer.Argument(..., help="Target .zip file path."),
+    screenshots: bool = typer.Option(
+        True, "--screenshots/--no-screenshots", help="Include screenshot images."
+    ),
+    since: datetime | None = typer.Option(
+        None, help="Only feedback created at or after this time, in UTC."
+    ),
+    until: datetime | None = typer.Option(
+        None, help="Only feedback created before this time, in UTC."
+    ),
+    watermark: Path | None = typer.Option(
+        None,
+        help="File recording the last exported item; exports start after it and update it.",
+    ),
+    thumbnails: bool = typer.Option(
+        False, "--thumbnails", help="Add a downscaled JPEG of each screenshot (needs Pillow)."
+    ),
+    workers: int | None = typer.Option(
+        None, min=1, help="Processes making thumbnails. Defaults to the CPU count."
+    ),
 ) -> None:
-    """Export all stored feedback into a zip archive."""
+    """Export stored feedback into a zip archive."""
 
-    asyncio.run(_export_feedback(output))
+    if thumbnails and not screenshots:
+        raise typer.BadParameter("--thumbnails needs --screenshots", param_hint="--thumbnails")
+    if thumbnails and not thumbnails_available():
+        raise typer.BadParameter(
+            "Pillow is not installed; install the 'thumbnails' extra",
+            param_hint="--thumbnails",
+        )
+    asyncio.run(
+        _export_feedback(output, screenshots, since, until, watermark, thumbnails, workers)
+    )
 
 
 if __name__ == "__main__":
@@ -3,31 +3,37 @@
 from celine.webapp.db.models import (
     Base,
     FeedbackEntry,
+    FeedbackScreenshot,
+    FeedbackScreenshotChunk,
     PolicyAcceptance,
     Settings,
     UserOnboardingView,
 )
 from celine.webapp.db.session import (
     async_engine,
-    sync_engine,
     AsyncSessionLocal,
     get_db,
     get_db_context,
     init_db,
+    prepare_database,
+    run_migrations,
 )
 
 __all__ = [
     # Models
     "Base",
     "FeedbackEntry",
+    "FeedbackScreenshot",
+    "FeedbackScreenshotChunk",
     "PolicyAcceptance",
     "Settings",
     "UserOnboardingView",
     # Session
     "async_engine",
-    "sync_engine",
     "AsyncSessionLocal",
     "get_db",
     "get_db_context",
     "init_db",
+    "prepare_database",
+    "run_migrations",
 ]
@@ -0,0 +1,20 @@
+"""Statements that differ by the database bound to a session.
+
+PostgreSQL in deployment, SQLite in the test suite.
+"""
+
+from __future__ import annotations
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def upsert_insert(db: AsyncSession, model):
+    """An ``INSERT`` that supports ``ON CONFLICT`` on whichever database is bound.
+
+    Both databases speak the same upsert and both support ``RETURNING``, so callers
+    build one statement either way.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        return sqlite.insert(model)
+    return postgresql.insert(model)
@@ -0,0 +1,114 @@
+"""Pool and query metrics for the async engine.
+
+Two questions these answer: is a replica's pool big enough (checkout wait, connections
+in use), and which routes spend their time in the database (query time per route).
+
+Query time is attributed to a route through a context variable that the request
+middleware sets for each request. SQLAlchemy runs the driver calls in a greenlet that
+shares the calling task's context, so the cursor events below see the request that
+issued the query. Outside a request — the CLI, migrations — nothing is recorded.
+
+The same events record each statement as a span when the request is being traced.
+"""
+
+from __future__ import annotations
+
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from celine.webapp.metrics import Counter, Histogram
+from celine.webapp.tracing import tracer
+
+CHECKOUT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 10.0)
+
+pool_checkout_seconds = Histogram(
+    "db_pool_checkout_seconds",
+    "Time to check a connection out of the pool, including waiting for one.",
+    buckets=CHECKOUT_BUCKETS,
+)
+pool_checkout_timeouts = Counter(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts that gave up after DATABASE_POOL_TIMEOUT seconds.",
+)
+route_query_seconds = Histogram(
+    "db_route_query_seconds",
+    "Total time one request spent executing SQL, by route.",
+    ("method", "route"),
+)
+route_queries = Counter(
+    "db_route_queries_total",
+    "SQL statements executed, by route.",
+    ("method", "route"),
+)
+
+
+@dataclass
+class QueryTimer:
+    """Query time and count accumulated by one request."""
+
+    seconds: float = 0.0
+    statements: int = 0
+
+
+current_query_timer: ContextVar[QueryTimer | None] = ContextVar(
+    "current_query_timer", default=None
+)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """The default async pool, timing every checkout."""
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            pool_checkout_timeouts.inc()
+            raise
+        finally:
+            pool_checkout_seconds.observe(time.perf_counter() - started)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is None:
+        return
+    if current_query_timer.get() is not None:
+        context._celine_query_started_at = time.perf_counter()
+    if tracer.enabled:
+        words = statement.split(None, 1)
+        context._celine_span = tracer.start_span(
+            words[0].upper() if words else "SQL",
+            kind="CLIENT",
+            attributes={"db.system": conn.dialect.name, "db.query.text": statement},
+            nested_only=True,
+        )
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    span = getattr(exception_context.execution_context, "_celine_span", None)
+    if span is not None:
+        exception_context.execution_context._celine_span = None
+        span.record_error(str(exception_context.original_exception))
+        tracer.end_span(span)
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    span = getattr(context, "_celine_span", None)
+    if span is not None:
+        context._celine_span = None
+        tracer.end_span(span)
+
+    timer = current_query_timer.get()
+    started = getattr(context, "_celine_query_started_at", None)
+    if timer is None or started is None:
+        return
+    timer.seconds += time.perf_counter() - started
+    timer.statements += 1
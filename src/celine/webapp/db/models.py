@@ -3,7 +3,7 @@
 import uuid
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import String, Float, Boolean, DateTime, Integer, Uuid, Text, LargeBinary, JSON, UniqueConstraint
+from sqlalchemy import String, Float, Boolean, DateTime, ForeignKey, Index, Integer, Uuid, Text, LargeBinary, JSON, UniqueConstraint
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 from sqlalchemy.sql import func
 
@@ -20,7 +20,7 @@ class PolicyAcceptance(Base):
     __tablename__ = "policy_acceptance"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    user_id: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
+    user_id: Mapped[str] = mapped_column(String(255), nullable=False)
     policy_version: Mapped[str] = mapped_column(String(50), nullable=False)
     accepted_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False
@@ -28,6 +28,14 @@ class PolicyAcceptance(Base):
     accepted_from_ip: Mapped[Optional[str]] = mapped_column(String(50))
 
 
+# A member's latest acceptance is what the terms gate reads.
+Index(
+    "ix_policy_acceptance_user_id_accepted_at",
+    PolicyAcceptance.user_id,
+    PolicyAcceptance.accepted_at.desc(),
+)
+
+
 class Settings(Base):
     """User settings."""
 
@@ -128,7 +136,45 @@ class FeedbackEntry(Base):
     client_ip: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
     extra_context: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
     screenshot_mime_type: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
-    screenshot_bytes: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True)
+    screenshot_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        Uuid, ForeignKey("feedback_screenshots.id"), nullable=True, index=True
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
+
+
+# Export order; incremental exports start part-way along it.
+Index(
+    "ix_feedback_entries_created_at_id",
+    FeedbackEntry.created_at,
+    FeedbackEntry.id,
+)
+
+
+class FeedbackScreenshot(Base):
+    """A feedback screenshot, stored once per distinct content (see `db.screenshots`)."""
+
+    __tablename__ = "feedback_screenshots"
+
+    id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=uuid.uuid4)
+    sha256: Mapped[str] = mapped_column(String(64), nullable=False, unique=True)
+    size: Mapped[int] = mapped_column(Integer, nullable=False)
+    chunk_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+class FeedbackScreenshotChunk(Base):
+    """One piece of a screenshot's bytes.
+
+    No foreign key to `FeedbackScreenshot`: chunks are written as they arrive, before
+    the hash that decides which screenshot they belong to is known.
+    """
+
+    __tablename__ = "feedback_screenshot_chunks"
+
+    screenshot_id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True)
+    seq: Mapped[int] = mapped_column(Integer, primary_key=True)
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
@@ -0,0 +1,103 @@
+"""The member's own state as `/api/me` needs it, in one query.
+
+`/api/me` is called on every app start and every route guard, and used to cost three
+queries — the latest policy acceptance, the settings row (inserting it if absent) and the
+onboarding pages. Here it is one read-only query, and its result is cached per member for
+a few seconds.
+
+The cache is per replica. Every write through `db/user_settings.py` and every terms
+acceptance invalidates it on the replica that made the write; another replica can serve
+the previous state for at most ``PROFILE_CACHE_TTL`` seconds, which is why that is short.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from celine.webapp.cache import TTLCache
+from celine.webapp.db.models import PolicyAcceptance, Settings, UserOnboardingView
+
+PROFILE_CACHE_TTL = 10.0
+
+
+@dataclass(frozen=True)
+class UserProfile:
+    """Everything `/api/me` reads from this service's database."""
+
+    accepted_policy_version: Optional[str]
+    simple_mode: bool
+    font_scale: float
+    webpush_enabled: bool
+    onboarding_seen_at: Optional[datetime]
+    onboarding_seen_pages: tuple[str, ...]
+
+
+_profiles: TTLCache[str, UserProfile] = TTLCache(
+    "user_profile", maxsize=4096, ttl=PROFILE_CACHE_TTL
+)
+
+
+def invalidate_user_profile(user_id: str) -> None:
+    """Drop the cached profile. Call after any write that `/api/me` would show."""
+    _profiles.pop(user_id)
+
+
+async def load_user_profile(
+    user_id: str, db: AsyncSession, accepted_policy_version: str | None = None
+) -> UserProfile:
+    """Return the member's profile, from cache or from one query.
+
+    The query starts from a one-row literal so that a member with no settings row and
+    no onboarding pages still gets a row back; absent settings read as the column
+    defaults and are not inserted. Onboarding pages are joined in, so the result has one
+    row per page, each repeating the settings columns.
+
+    A caller that already knows the member's latest accepted policy version passes it
+    as ``accepted_policy_version``, and the query does not look the acceptance up.
+    """
+    cached = _profiles.get(user_id)
+    if cached is not None:
+        return cached
+
+    me = select(literal(user_id).label("user_id")).subquery("me")
+    if accepted_policy_version is not None:
+        latest_acceptance = literal(accepted_policy_version)
+    else:
+        latest_acceptance = (
+            select(PolicyAcceptance.policy_version)
+            .where(PolicyAcceptance.user_id == me.c.user_id)
+            .order_by(PolicyAcceptance.accepted_at.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+    stmt = (
+        select(
+            latest_acceptance.label("accepted_policy_version"),
+            Settings.simple_mode,
+            Settings.font_scale,
+            Settings.webpush_enabled,
+            Settings.onboarding_seen_at,
+            UserOnboardingView.page_key,
+        )
+        .select_from(me)
+        .outerjoin(Settings, Settings.user_id == me.c.user_id)
+        .outerjoin(UserOnboardingView, UserOnboardingView.user_id == me.c.user_id)
+    )
+    rows = (await db.execute(stmt)).all()
+
+    first = rows[0]
+    profile = UserProfile(
+        accepted_policy_version=first.accepted_policy_version,
+        simple_mode=bool(first.simple_mode),
+        font_scale=first.font_scale if first.font_scale is not None else 1.0,
+        webpush_enabled=bool(first.webpush_enabled),
+        onboarding_seen_at=first.onboarding_seen_at,
+        onboarding_seen_pages=tuple(row.page_key for row in rows if row.page_key),
+    )
+    _profiles.set(user_id, profile)
+    return profile
@@ -0,0 +1,127 @@
+"""Feedback screenshots, stored apart from the feedback they belong to.
+
+A screenshot is a few hundred KB to a few MB; the feedback row around it is a few
+hundred bytes. Keeping them in one row meant every query that read feedback read
+the images too. Screenshots now live in ``feedback_screenshots``, addressed by the
+SHA-256 of their bytes, with the bytes themselves split over
+``feedback_screenshot_chunks`` in `CHUNK_SIZE` pieces. A feedback row holds only
+``screenshot_id``, so reading feedback reads no image unless `read_screenshot` is
+asked for one.
+
+The same image submitted twice — a member resending the form, or two members on
+the same empty page — is stored once. `ScreenshotWriter` takes the bytes in
+whatever pieces they arrive, writes each full chunk as it fills, and only once the
+last one is in, when the hash is known, claims that hash with ``INSERT … ON
+CONFLICT DO NOTHING``. If another screenshot already holds it, the chunks just
+written are dropped and the existing one is used. Chunks and claim share the
+caller's transaction, so nothing is left behind by a write that fails half-way.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import uuid
+from typing import AsyncIterator
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from celine.webapp.db.dialects import upsert_insert
+from celine.webapp.db.models import FeedbackScreenshot, FeedbackScreenshotChunk
+
+CHUNK_SIZE = 256 * 1024
+
+
+class ScreenshotWriter:
+    """Write one screenshot in pieces; `finish` returns the id to reference it by."""
+
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+        self.size = 0
+        self._id = uuid.uuid4()
+        self._hash = hashlib.sha256()
+        self._buffer = bytearray()
+        self._seq = 0
+
+    async def write(self, data: bytes) -> None:
+        self._hash.update(data)
+        self.size += len(data)
+        self._buffer += data
+        while len(self._buffer) >= CHUNK_SIZE:
+            await self._flush(bytes(self._buffer[:CHUNK_SIZE]))
+            del self._buffer[:CHUNK_SIZE]
+
+    async def finish(self) -> uuid.UUID:
+        if self._buffer or not self._seq:
+            await self._flush(bytes(self._buffer))
+            self._buffer.clear()
+
+        sha256 = self._hash.hexdigest()
+        stmt = (
+            upsert_insert(self.db, FeedbackScreenshot)
+            .values(id=self._id, sha256=sha256, size=self.size, chunk_count=self._seq)
+            .on_conflict_do_nothing(index_elements=[FeedbackScreenshot.sha256])
+            .returning(FeedbackScreenshot.id)
+        )
+        if (await self.db.execute(stmt)).scalar_one_or_none() is not None:
+            return self._id
+
+        await self.db.execute(
+            delete(FeedbackScreenshotChunk).where(
+                FeedbackScreenshotChunk.screenshot_id == self._id
+            )
+        )
+        return await _existing(self.db, sha256)
+
+    async def _flush(self, data: bytes) -> None:
+        await self.db.execute(
+            insert(FeedbackScreenshotChunk).values(
+                screenshot_id=self._id, seq=self._seq, data=data
+            )
+        )
+        self._seq += 1
+
+
+async def _existing(db: AsyncSession, sha256: str) -> uuid.UUID:
+    result = await db.execute(
+        select(FeedbackScreenshot.id).where(FeedbackScreenshot.sha256 == sha256)
+    )
+    return result.scalar_one()
+
+
+async def store_screenshot(db: AsyncSession, data: bytes) -> uuid.UUID:
+    """Store ``data`` (or find it already stored) and return its screenshot id.
+
+    The caller commits. With the whole image at hand the hash is known up front, so
+    an image already stored costs one lookup and no chunk writes.
+    """
+    result = await db.execute(
+        select(FeedbackScreenshot.id).where(
+            FeedbackScreenshot.sha256 == hashlib.sha256(data).hexdigest()
+        )
+    )
+    existing = result.scalar_one_or_none()
+    if existing is not None:
+        return existing
+
+    writer = ScreenshotWriter(db)
+    await writer.write(data)
+    return await writer.finish()
+
+
+async def read_screenshot(db: AsyncSession, screenshot_id: uuid.UUID) -> AsyncIterator[bytes]:
+    """The bytes of screenshot ``screenshot_id``, a chunk at a time.
+
+    One query, read from a cursor a row at a time, so only one chunk is held.
+    """
+    result = await db.stream_scalars(
+        select(FeedbackScreenshotChunk.data)
+        .where(FeedbackScreenshotChunk.screenshot_id == screenshot_id)
+        .order_by(FeedbackScreenshotChunk.seq)
+        .execution_options(yield_per=1)
+    )
+    try:
+        async for data in result:
+            yield data
+    finally:
+        await result.close()
@@ -1,20 +1,68 @@
 """Database session management with async support."""
+import asyncio
+import logging
+import uuid
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from pathlib import Path
+from typing import Any, AsyncGenerator
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy import create_engine
 
-from celine.webapp.settings import settings
+from celine.webapp.settings import Settings, settings
+from celine.webapp.db.instrumentation import InstrumentedPool
 from celine.webapp.db.models import Base
+from celine.webapp.metrics import Gauge
+
+logger = logging.getLogger(__name__)
+
+
+def _prepared_statement_name() -> str:
+    return f"__asyncpg_{uuid.uuid4()}__"
+
+
+def engine_options(config: Settings) -> dict[str, Any]:
+    """Keyword arguments for `create_async_engine`, from the pool settings.
+
+    ``DATABASE_STATEMENT_CACHE_SIZE`` sizes both statement caches: SQLAlchemy's
+    (``prepared_statement_cache_size``) and asyncpg's own beneath it
+    (``statement_cache_size``). Prepared statements get unique names, so that behind
+    a transaction-mode pooler two clients sharing a server connection never collide
+    on one.
+    """
+    return {
+        "echo": config.database_echo,
+        "poolclass": InstrumentedPool,
+        "pool_size": config.database_pool_size,
+        "max_overflow": config.database_max_overflow,
+        "pool_timeout": config.database_pool_timeout,
+        "pool_recycle": config.database_pool_recycle,
+        "pool_pre_ping": config.database_pool_pre_ping,
+        "connect_args": {
+            "prepared_statement_cache_size": config.database_statement_cache_size,
+            "statement_cache_size": config.database_statement_cache_size,
+            "prepared_statement_name_func": _prepared_statement_name,
+        },
+    }
 
 
 # Create async engine
 async_engine = create_async_engine(
-    settings.resolved_database_url,
-    echo=settings.database_echo,
-    pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10,
+    settings.resolved_database_url, **engine_options(settings)
+)
+
+Gauge(
+    "db_pool_connections_in_use",
+    "Connections currently checked out of this worker's pool.",
+    callback=lambda: async_engine.pool.checkedout(),
+)
+Gauge(
+    "db_pool_size",
+    "Configured pool size (DATABASE_POOL_SIZE).",
+    callback=lambda: async_engine.pool.size(),
+)
+Gauge(
+    "db_pool_overflow",
+    "Connections open beyond the pool size; negative while the pool is not yet full.",
+    callback=lambda: async_engine.pool.overflow(),
 )
 
 # Create async session factory
@@ -24,19 +72,39 @@ AsyncSessionLocal = async_sessionmaker(
     expire_on_commit=False,
 )
 
-# Sync engine for Alembic migrations only
-sync_engine = create_engine(
-    settings.resolved_database_url.replace("+asyncpg", ""),
-    echo=settings.database_echo,
-)
-
-
 async def init_db() -> None:
-    """Initialize database (create tables if they don't exist)."""
+    """Create any missing tables from the models. For local development and tests.
+
+    This reflects every table over the network, and cannot alter one that already
+    exists; deployed databases are managed by the Alembic migrations instead.
+    """
     async with async_engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
 
+async def run_migrations(config_path: str | Path = "alembic.ini") -> None:
+    """Apply pending Alembic migrations, off the event loop.
+
+    ``alembic/env.py`` is told it runs inside the app, so it leaves the app's logging
+    configuration alone instead of loading the one in ``alembic.ini``.
+    """
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(str(config_path))
+    config.attributes["configure_logger"] = False
+    logger.info("Applying database migrations from %s", config_path)
+    await asyncio.to_thread(command.upgrade, config, "head")
+
+
+async def prepare_database(mode: str) -> None:
+    """Run the startup step chosen by ``DATABASE_STARTUP_MODE``."""
+    if mode == "migrate":
+        await run_migrations()
+    elif mode == "create":
+        await init_db()
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
     Async dependency for FastAPI routes.
@@ -2,58 +2,95 @@
 
 Single place for all get/update operations on the Settings model.
 Always upserts - callers never need to worry about whether the row exists.
+Every write is one ``INSERT … ON CONFLICT … RETURNING`` followed by its commit.
 """
 
 from __future__ import annotations
 
 from datetime import datetime, timezone
+from typing import Any, Callable
 
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from celine.webapp.db.dialects import upsert_insert
 from celine.webapp.db.models import Settings, UserOnboardingView
+from celine.webapp.db.profile import invalidate_user_profile
+
+
+async def _upsert_settings(
+    user_id: str,
+    db: AsyncSession,
+    values: dict[str, Any],
+    on_conflict: Callable[[Any], dict[str, Any]] | None = None,
+) -> Settings:
+    """Insert ``values`` for user_id, or apply them to the existing row.
+
+    ``on_conflict`` receives the ``excluded`` row and returns overrides for how
+    individual columns are updated when the row exists; by default each column in
+    ``values`` takes the new value. One
+    statement and one commit, whether or not the row was there — and no race
+    between two first requests, which the unique ``user_id`` used to turn into
+    an IntegrityError.
+    """
+    stmt = upsert_insert(db, Settings).values(user_id=user_id, **values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Settings.user_id],
+        set_={
+            **{key: stmt.excluded[key] for key in values},
+            **(on_conflict(stmt.excluded) if on_conflict else {}),
+            # `onupdate` only fires for ORM/Core UPDATEs, not for this branch.
+            "updated_at": func.now(),
+        },
+    ).returning(Settings)
+
+    result = await db.execute(stmt, execution_options={"populate_existing": True})
+    settings = result.scalar_one()
+    await db.commit()
+    invalidate_user_profile(user_id)
+    return settings
 
 
 async def load_user_settings(user_id: str, db: AsyncSession) -> Settings:
-    """Return the Settings row for user_id, creating it with defaults if absent."""
+    """Return the Settings row for user_id, creating it with defaults if absent.
+
+    A read is a plain SELECT. Creating the row on the first visit is an upsert,
+    so two first requests racing each other both get the same row back. Reads
+    are not upserts themselves because in PostgreSQL an ``ON CONFLICT DO UPDATE``
+    writes a new row version even when nothing changes.
+    """
     result = await db.execute(select(Settings).filter(Settings.user_id == user_id))
     settings = result.scalar_one_or_none()
+    if settings is not None:
+        return settings
 
-    if settings is None:
-        settings = Settings(
-            user_id=user_id,
-            simple_mode=False,
-            font_scale=1.0,
-            email_notifications=False,
-            webpush_enabled=False,
-            onboarding_seen_at=None,
-        )
-        db.add(settings)
-        await db.commit()
-        await db.refresh(settings)
-
-    return settings
+    return await _upsert_settings(
+        user_id, db, {}, on_conflict=lambda excluded: {"user_id": excluded.user_id}
+    )
 
 
 async def set_webpush_enabled(
     user_id: str, enabled: bool, db: AsyncSession
 ) -> Settings:
     """Flip the webpush_enabled flag, creating the settings row if needed."""
-    settings = await load_user_settings(user_id, db)
-    settings.webpush_enabled = enabled
-    await db.commit()
-    await db.refresh(settings)
-    return settings
+    return await _upsert_settings(user_id, db, {"webpush_enabled": enabled})
 
 
 async def mark_onboarding_seen(user_id: str, db: AsyncSession) -> Settings:
-    """Mark the in-app onboarding as seen for the user."""
-    settings = await load_user_settings(user_id, db)
-    if settings.onboarding_seen_at is None:
-        settings.onboarding_seen_at = datetime.now(timezone.utc)
-        await db.commit()
-        await db.refresh(settings)
-    return settings
+    """Mark the in-app onboarding as seen for the user.
+
+    The first timestamp is kept: seeing it again does not move it.
+    """
+    return await _upsert_settings(
+        user_id,
+        db,
+        {"onboarding_seen_at": datetime.now(timezone.utc)},
+        on_conflict=lambda excluded: {
+            "onboarding_seen_at": func.coalesce(
+                Settings.onboarding_seen_at, excluded.onboarding_seen_at
+            )
+        },
+    )
 
 
 async def list_onboarding_seen_pages(user_id: str, db: AsyncSession) -> list[str]:
@@ -69,19 +106,22 @@ async def list_onboarding_seen_pages(user_id: str, db: AsyncSession) -> list[str
 async def mark_onboarding_page_seen(
     user_id: str, page_key: str, db: AsyncSession
 ) -> UserOnboardingView:
-    """Mark one onboarding page as completed for a user."""
-    result = await db.execute(
-        select(UserOnboardingView).filter(
-            UserOnboardingView.user_id == user_id,
-            UserOnboardingView.page_key == page_key,
-        )
-    )
-    view = result.scalar_one_or_none()
-    if view is None:
-        view = UserOnboardingView(user_id=user_id, page_key=page_key)
-        db.add(view)
-        await db.commit()
-        await db.refresh(view)
+    """Mark one onboarding page as completed for a user.
+
+    Idempotent in one statement. The conflict branch rewrites ``page_key`` with
+    itself only so that ``RETURNING`` yields the existing row; ``seen_at`` keeps
+    the first visit.
+    """
+    stmt = upsert_insert(db, UserOnboardingView).values(user_id=user_id, page_key=page_key)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserOnboardingView.user_id, UserOnboardingView.page_key],
+        set_={"page_key": stmt.excluded.page_key},
+    ).returning(UserOnboardingView)
+
+    result = await db.execute(stmt, execution_options={"populate_existing": True})
+    view = result.scalar_one()
+    await db.commit()
+    invalidate_user_profile(user_id)
     return view
 
 
@@ -94,18 +134,19 @@ async def update_user_settings(
     email_notifications: bool | None = None,
     webpush_enabled: bool | None = None,
 ) -> Settings:
-    """Partial update of any settings fields, creating the row if needed."""
-    settings = await load_user_settings(user_id, db)
-
-    if simple_mode is not None:
-        settings.simple_mode = simple_mode
-    if font_scale is not None:
-        settings.font_scale = font_scale
-    if email_notifications is not None:
-        settings.email_notifications = email_notifications
-    if webpush_enabled is not None:
-        settings.webpush_enabled = webpush_enabled
-
-    await db.commit()
-    await db.refresh(settings)
-    return settings
+    """Partial update of any settings fields, creating the row if needed.
+
+    Fields left as ``None`` keep their stored value on update and take the column
+    default on insert.
+    """
+    values = {
+        key: value
+        for key, value in {
+            "simple_mode": simple_mode,
+            "font_scale": font_scale,
+            "email_notifications": email_notifications,
+            "webpush_enabled": webpush_enabled,
+        }.items()
+        if value is not None
+    }
+    return await _upsert_settings(user_id, db, values)
@@ -0,0 +1,182 @@
+"""Reading one array out of a JSON document as it arrives.
+
+An upstream that answers with ``{"@context": ..., "@graph": [...]}`` — or with a
+bare array — can hold any number of items, and reading the whole body to get at
+them holds all of them at once. `ArrayItems` is fed the body in chunks and hands
+back each complete item of that array as soon as its closing brace has arrived,
+keeping only the unconsumed tail of the text. The other top-level members are
+decoded and kept in `members`, so a small one such as a next-page cursor is still
+available once the array is done.
+
+Items and other members are decoded with the standard library's decoder, once
+each: an object, array or string is first scanned for its end — resuming where
+the previous chunk left off — and decoded only when that has arrived, so an item
+spread over many small chunks costs time in its length, not its length squared.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Iterator
+
+_WHITESPACE = " \t\n\r"
+_NUMBER_TAIL = frozenset("0123456789.eE+-")
+_decoder = json.JSONDecoder()
+
+
+class ArrayItems:
+    """Incremental reader for the array at ``key`` (or a top-level array)."""
+
+    def __init__(self, key: str = "@graph") -> None:
+        self.key = key
+        self.members: dict[str, Any] = {}
+        self.done = False
+        self._buf = ""
+        self._state = "start"
+        self._in_object = False
+        self._member: str | None = None
+        # How far into the pending value the scan for its end has got, and what
+        # it found open there: nesting depth, inside a string, after a backslash.
+        self._scanned = 0
+        self._scan_state = (0, False, False)
+
+    def feed(self, text: str) -> Iterator[Any]:
+        """Add ``text`` and yield every item it completes."""
+        self._buf += text
+        yield from self._drain(final=False)
+
+    def close(self) -> Iterator[Any]:
+        """The body has ended: yield what is left. ValueError if it is not JSON."""
+        yield from self._drain(final=True)
+        if not self.done and (self._state != "start" or self._buf.strip()):
+            raise ValueError("JSON document ended early")
+
+    def _skip(self, pos: int) -> int:
+        buf = self._buf
+        while pos < len(buf) and buf[pos] in _WHITESPACE:
+            pos += 1
+        return pos
+
+    def _arrived(self, pos: int) -> bool:
+        """Whether the object, array or string at ``pos`` has reached its end.
+
+        Other values are short and answer True; the decoder settles those.
+        """
+        buf = self._buf
+        if buf[pos] not in '{["':
+            return True
+        depth, in_string, escaped = self._scan_state
+        i = pos + self._scanned
+        while i < len(buf):
+            char = buf[i]
+            i += 1
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char in "{[":
+                depth += 1
+            elif char in "}]":
+                depth -= 1
+            if depth == 0 and not in_string:
+                self._scanned, self._scan_state = 0, (0, False, False)
+                return True
+        self._scanned, self._scan_state = i - pos, (depth, in_string, escaped)
+        return False
+
+    def _value(self, pos: int, final: bool) -> tuple[Any, int] | None:
+        """Decode the value at ``pos``, or None if it may not have fully arrived."""
+        if not final and not self._arrived(pos):
+            return None
+        try:
+            value, end = _decoder.raw_decode(self._buf, pos)
+        except json.JSONDecodeError:
+            if final or self._buf[pos] in '{["':
+                raise ValueError("malformed JSON") from None
+            return None
+        # `12` could be the start of `123` or `12.5`: a number that runs to the end
+        # of the text so far, or is followed by more of one, is only complete once
+        # the next character shows it is.
+        if not final and type(value) in (int, float):
+            if end == len(self._buf) or self._buf[end] in _NUMBER_TAIL:
+                return None
+        return value, end
+
+    def _drain(self, final: bool) -> Iterator[Any]:
+        pos = 0
+        try:
+            while not self.done:
+                pos = self._skip(pos)
+                if pos == len(self._buf):
+                    break
+                char = self._buf[pos]
+                state = self._state
+
+                if state == "start":
+                    if char == "[":
+                        self._state = "items"
+                    elif char == "{":
+                        self._in_object = True
+                        self._state = "member"
+                    else:
+                        raise ValueError("expected a JSON object or array")
+                    pos += 1
+
+                elif state == "member":
+                    if char == ",":
+                        pos += 1
+                    elif char == "}":
+                        self.done = True
+                        pos += 1
+                    else:
+                        decoded = self._value(pos, final)
+                        if decoded is None:
+                            break
+                        name, after = decoded
+                        colon = self._skip(after)
+                        if colon == len(self._buf):
+                            break
+                        if self._buf[colon] != ":" or not isinstance(name, str):
+                            raise ValueError("malformed JSON object")
+                        self._member = name
+                        self._state = "value"
+                        pos = colon + 1
+
+                elif state == "value":
+                    if self._member == self.key and char == "[":
+                        self._state = "items"
+                        pos += 1
+                    else:
+                        decoded = self._value(pos, final)
+                        if decoded is None:
+                            break
+                        value, pos = decoded
+                        if self._member == self.key:
+                            # A single node rather than a list of them.
+                            yield value
+                        else:
+                            self.members[self._member] = value
+                        self._state = "member"
+
+                elif state == "items":
+                    if char == ",":
+                        pos += 1
+                    elif char == "]":
+                        pos += 1
+                        if self._in_object:
+                            self._state = "member"
+                        else:
+                            self.done = True
+                    else:
+                        decoded = self._value(pos, final)
+                        if decoded is None:
+                            break
+                        item, pos = decoded
+                        yield item
+        finally:
+            self._buf = self._buf[pos:]
@@ -0,0 +1,81 @@
+"""Logging for hot paths.
+
+Two shapes, for two kinds of line:
+
+* `RateLimitedLogger` — at most one line per key per interval, for a warning that
+  repeats. A misconfigured proxy or a client retrying with an expired token produces
+  the same warning on every request; one line per interval says the same thing, and
+  the count of suppressed lines on the next one says how often.
+* `SampledLogger` — one call in ``every``, for per-request diagnostics. Counts and
+  latencies are on `/metrics`; these lines are for reading an example now and then.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+
+
+class RateLimitedLogger:
+    """Wraps a logger so each ``key`` logs at most once per ``interval`` seconds."""
+
+    def __init__(self, logger: logging.Logger, interval: float = 60.0, maxkeys: int = 256) -> None:
+        self.logger = logger
+        self.interval = interval
+        self.maxkeys = maxkeys
+        self._last: dict[str, float] = {}
+        self._suppressed: dict[str, int] = {}
+
+    def log(self, level: int, key: str, msg: str, *args: object) -> bool:
+        """Log unless ``key`` logged within the interval. True if a line was written."""
+        if not self.logger.isEnabledFor(level):
+            return False
+        now = time.monotonic()
+        last = self._last.get(key)
+        if last is not None and now - last < self.interval:
+            self._suppressed[key] = self._suppressed.get(key, 0) + 1
+            return False
+
+        if key not in self._last and len(self._last) >= self.maxkeys:
+            # Bounded: forget the key that logged longest ago.
+            oldest = min(self._last, key=self._last.__getitem__)
+            del self._last[oldest]
+            self._suppressed.pop(oldest, None)
+
+        suppressed = self._suppressed.pop(key, 0)
+        self._last[key] = now
+        if suppressed:
+            msg += " (%d similar suppressed since the last)"
+            args = (*args, suppressed)
+        self.logger.log(level, msg, *args)
+        return True
+
+    def warning(self, key: str, msg: str, *args: object) -> bool:
+        return self.log(logging.WARNING, key, msg, *args)
+
+    def info(self, key: str, msg: str, *args: object) -> bool:
+        return self.log(logging.INFO, key, msg, *args)
+
+
+class SampledLogger:
+    """Wraps a logger so only one call in ``every`` is written."""
+
+    def __init__(self, logger: logging.Logger, every: int = 100) -> None:
+        self.logger = logger
+        self.every = every
+        self._calls = 0
+
+    def log(self, level: int, msg: str, *args: object) -> bool:
+        if not self.logger.isEnabledFor(level):
+            return False
+        self._calls += 1
+        if self._calls % self.every != 1 and self.every > 1:
+            return False
+        self.logger.log(level, msg, *args)
+        return True
+
+    def info(self, msg: str, *args: object) -> bool:
+        return self.log(logging.INFO, msg, *args)
+
+    def debug(self, msg: str, *args: object) -> bool:
+        return self.log(logging.DEBUG, msg, *args)
@@ -5,15 +5,39 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from celine.webapp.settings import settings
-from celine.webapp.db import init_db
+from celine.webapp.db import prepare_database
+from celine.webapp.middleware import RequestMetricsMiddleware, TracingMiddleware
+from celine.webapp.readiness import ReadinessGateMiddleware, readiness
 from celine.webapp.routes import create_api_router
+from celine.webapp.services.data_sharing import dataspace_clients
+from celine.webapp.services.jwks import jwks_refresher
+from celine.webapp.services.feedback_queue import feedback_queue
+from celine.webapp.services.nudging_outbox import outbox
+from celine.webapp.tracing import exporter_from_settings, tracer
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Application lifespan handler."""
-    await init_db()
-    yield
+    """Application lifespan handler.
+
+    Nothing here waits on the network: the schema step runs in the background
+    behind the readiness gate, so the worker answers as soon as it is up.
+    """
+    tracer.configure(exporter_from_settings(settings.tracing_exporter, settings.tracing_file))
+    outbox.start()
+    feedback_queue.start()
+    jwks_refresher.start()
+    readiness.start(lambda: prepare_database(settings.database_startup_mode))
+    try:
+        yield
+    finally:
+        # First, while the database is still there to take what is queued.
+        await feedback_queue.stop()
+        await readiness.stop()
+        await jwks_refresher.stop()
+        await outbox.stop()
+        await dataspace_clients.stop()
+        tracer.shutdown()
 
 
 def create_app() -> FastAPI:
@@ -28,6 +52,9 @@ def create_app() -> FastAPI:
         redoc_url="/api/redoc",
     )
 
+    app.add_middleware(ReadinessGateMiddleware)
+    app.add_middleware(RequestMetricsMiddleware)
+    app.add_middleware(TracingMiddleware)
     app.add_middleware(
         CORSMiddleware,
         allow_origins=settings.cors_origins,
@@ -42,7 +69,15 @@ def create_app() -> FastAPI:
     return app
 
 
-app = create_app()
+def __getattr__(name: str) -> FastAPI:
+    # `celine.webapp.main:app` (`task run`) still works, but the app is built on first
+    # access rather than at import: the container runs `create_app` as a factory, and
+    # importing this module for it used to build a second app that was never served.
+    if name == "app":
+        application = create_app()
+        globals()["app"] = application
+        return application
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,119 @@
+"""ASGI middleware.
+
+Plain ASGI rather than `BaseHTTPMiddleware`: the latter runs the endpoint in a
+separate task, so context variables set here would not reach it.
+"""
+
+from __future__ import annotations
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from celine.webapp.db.instrumentation import (
+    QueryTimer,
+    current_query_timer,
+    route_queries,
+    route_query_seconds,
+)
+from celine.webapp.metrics import Gauge, Histogram
+from celine.webapp.tracing import TRACEPARENT, tracer
+
+request_seconds = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by route template, until the response has been sent.",
+    ("method", "route", "status"),
+)
+requests_in_flight = Gauge(
+    "http_requests_in_flight",
+    "Requests this worker is currently handling.",
+)
+
+
+class RequestMetricsMiddleware:
+    """Time each request, and attribute its database time, by route template.
+
+    Requests that match no route are reported under ``route="unmatched"`` so that
+    probing random paths cannot grow the label set.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        timer = QueryTimer()
+        token = current_query_timer.set(timer)
+        started = time.perf_counter()
+        requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            requests_in_flight.dec()
+            current_query_timer.reset(token)
+            route = scope.get("route")
+            labels = {
+                "method": scope["method"],
+                "route": route.path if route is not None else "unmatched",
+            }
+            request_seconds.observe(
+                time.perf_counter() - started, status=str(status), **labels
+            )
+            if route is not None and timer.statements:
+                route_query_seconds.observe(timer.seconds, **labels)
+                route_queries.inc(timer.statements, **labels)
+
+
+class TracingMiddleware:
+    """Open the server span each request's other spans nest under.
+
+    The span is named for the route template once routing has matched one; an
+    incoming ``traceparent`` header makes it a child of the caller's span.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = None
+        for name, value in scope["headers"]:
+            if name == TRACEPARENT.encode():
+                traceparent = value.decode("latin-1")
+                break
+
+        async def send_with_status(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                span.set_attribute("http.response.status_code", message["status"])
+                if message["status"] >= 500:
+                    span.record_error(f"HTTP {message['status']}")
+            await send(message)
+
+        method = scope["method"]
+        with tracer.span(
+            method,
+            kind="SERVER",
+            attributes={"http.request.method": method, "url.path": scope["path"]},
+            traceparent=traceparent,
+        ) as span:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                route = scope.get("route")
+                if route is not None:
+                    span.name = f"{method} {route.path}"
+                    span.set_attribute("http.route", route.path)
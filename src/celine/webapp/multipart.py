@@ -0,0 +1,128 @@
+"""Reading a ``multipart/form-data`` body as it arrives.
+
+Starlette's form parsing needs ``python-multipart``, which this service does not
+install, and spools each file part before the handler sees it. `MultipartReader` is
+fed the body in chunks and yields what each chunk completes: a `Part` when a part's
+headers have arrived, then that part's bytes in pieces as they come. Only a few
+bytes short of one delimiter are held back between chunks, however large the part.
+
+Only what browsers send is understood: CRLF line endings, one level of parts, and
+``Content-Disposition: form-data`` with a ``name`` and optional ``filename``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterator
+
+# A part's header block longer than this is not from a browser.
+HEADERS_MAX = 16 * 1024
+
+
+@dataclass
+class Part:
+    """The headers of one part; its bytes follow as separate ``bytes`` items."""
+
+    name: str
+    filename: str | None
+    content_type: str | None
+
+
+def boundary(content_type: str) -> str | None:
+    """The boundary of a ``multipart/form-data`` content type, or None if it is not one."""
+    kind, _, params = content_type.partition(";")
+    if kind.strip().lower() != "multipart/form-data":
+        return None
+    value = _params(params).get("boundary")
+    return value or None
+
+
+def _params(text: str) -> dict[str, str]:
+    params = {}
+    for param in text.split(";"):
+        key, sep, value = param.strip().partition("=")
+        if sep:
+            value = value.strip()
+            if len(value) >= 2 and value[0] == value[-1] == '"':
+                value = value[1:-1]
+            params[key.strip().lower()] = value
+    return params
+
+
+def _part(block: bytes) -> Part:
+    headers = {}
+    for line in block.decode("utf-8", "replace").split("\r\n"):
+        key, sep, value = line.partition(":")
+        if not sep:
+            raise ValueError("malformed part header")
+        headers[key.strip().lower()] = value.strip()
+
+    disposition, _, params = headers.get("content-disposition", "").partition(";")
+    names = _params(params)
+    if disposition.strip().lower() != "form-data" or "name" not in names:
+        raise ValueError("part is not form-data")
+    return Part(names["name"], names.get("filename"), headers.get("content-type"))
+
+
+class MultipartReader:
+    """Incremental reader for a body delimited by ``boundary``."""
+
+    def __init__(self, boundary: str) -> None:
+        self._delimiter = b"\r\n--" + boundary.encode("latin-1")
+        # The first delimiter has no line break before it; one is supplied so that
+        # every delimiter can be looked for the same way.
+        self._buf = b"\r\n"
+        self._state = "preamble"
+        self.done = False
+
+    def feed(self, data: bytes) -> Iterator[Part | bytes]:
+        """Add ``data`` and yield every part and piece of part it completes."""
+        self._buf += data
+        yield from self._drain()
+
+    def close(self) -> None:
+        """The body has ended. ValueError if the closing delimiter never came."""
+        if not self.done:
+            raise ValueError("multipart body ended early")
+
+    def _drain(self) -> Iterator[Part | bytes]:
+        delimiter = self._delimiter
+        while not self.done:
+            if self._state in ("preamble", "body"):
+                at = self._buf.find(delimiter)
+                if at < 0:
+                    # Keep what could be the start of a delimiter split by the chunk.
+                    keep = len(delimiter) - 1
+                    if self._state == "body" and len(self._buf) > keep:
+                        yield self._buf[:-keep]
+                    self._buf = self._buf[-keep:]
+                    return
+                if self._state == "body" and at:
+                    yield self._buf[:at]
+                self._buf = self._buf[at + len(delimiter) :]
+                self._state = "delimiter"
+
+            elif self._state == "delimiter":
+                if len(self._buf) < 2:
+                    return
+                if self._buf.startswith(b"--"):
+                    self.done = True
+                    self._buf = b""
+                    return
+                if not self._buf.startswith(b"\r\n"):
+                    raise ValueError("malformed multipart delimiter")
+                self._buf = self._buf[2:]
+                self._state = "headers"
+
+            else:
+                end = self._buf.find(b"\r\n\r\n")
+                if end < 0:
+                    if len(self._buf) > HEADERS_MAX:
+                        raise ValueError("part headers too long")
+                    return
+                if end > HEADERS_MAX:
+                    raise ValueError("part headers too long")
+                part = _part(self._buf[:end])
+                self._buf = self._buf[end + 4 :]
+                self._state = "body"
+                yield part
@@ -0,0 +1,93 @@
+"""Readiness: whether this worker has finished starting up.
+
+Startup work — today only the optional schema step chosen by
+``DATABASE_STARTUP_MODE`` — runs in the background so the process starts answering
+immediately. Until it finishes, ``GET /ready`` answers 503, which keeps the pod out of
+the Service, and API requests that arrive anyway wait for it (up to ``GATE_TIMEOUT``)
+rather than meeting a schema that is not there yet.
+
+``/health`` stays a liveness check: it answers as soon as the process does, whether or
+not startup has finished.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+GATE_TIMEOUT = 30.0
+UNGATED_PATHS = frozenset({"/health", "/ready", "/metrics"})
+
+
+class Readiness:
+    """Tracks one background startup task."""
+
+    def __init__(self) -> None:
+        self._task: asyncio.Task | None = None
+        self.error: BaseException | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self._task is not None and self._task.done() and self.error is None
+
+    def start(self, step: Callable[[], Awaitable[None]]) -> None:
+        self.error = None
+        self._task = asyncio.create_task(self._run(step))
+
+    async def _run(self, step: Callable[[], Awaitable[None]]) -> None:
+        try:
+            await step()
+        except Exception as exc:
+            self.error = exc
+            logger.exception("Startup failed; this worker will not report ready")
+
+    async def wait(self, timeout: float) -> bool:
+        """Wait for startup to finish. True when it finished and succeeded."""
+        if self._task is None:
+            return False
+        try:
+            await asyncio.wait_for(asyncio.shield(self._task), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return self.ready
+
+    async def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+
+readiness = Readiness()
+
+
+class ReadinessGateMiddleware:
+    """Hold API requests until startup has finished; 503 if it does not."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or readiness.ready
+            or scope["path"] in UNGATED_PATHS
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        if not await readiness.wait(GATE_TIMEOUT):
+            response = JSONResponse(
+                {"detail": "Service is starting"},
+                status_code=503,
+                headers={"Retry-After": "5"},
+            )
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
@@ -18,7 +18,9 @@ Three things worth knowing before changing this:
   registry returns them all, and the singular `role`/`vc_jws` fields are the most
   recent one, which is the wrong one as often as not.
 * **Never cache a credential across requests**, and never put one in a response.
-  It authenticates as that person.
+  It authenticates as that person. Concurrent resolutions of one email share a
+  call, but nothing is kept once it answers. What is cached is public or this
+  service's own: the offers vocabulary, and the service account's token.
 * **Only consent-based offers get a control.** A contract-based offer is
   disclosed, not toggled: presenting a choice that does not exist is what
   invalidates consent, and the connector answers 409 if you try.
@@ -27,12 +29,19 @@ Three things worth knowing before changing this:
 from __future__ import annotations
 
 import logging
+import re
+import time
+from contextlib import aclosing
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, AsyncIterator
 
 import httpx
 
+from celine.webapp.cache import SingleFlight, TTLCache
+from celine.webapp.jsonstream import ArrayItems
 from celine.webapp.settings import settings
+from celine.webapp.tracing import inject
+from celine.webapp.upstreams import observe_upstream
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +49,41 @@ DATA_SUBJECT_ROLE = "DataSubject"
 
 _token_provider: Any | None = None
 
+# The SDK provider hands back the token it holds until fewer than 30 s are left,
+# and renews it from then on: asking inside this window is what renews it.
+TOKEN_RENEW_WINDOW = 30.0
+# Not handed out this close to expiry: it could lapse on the way.
+TOKEN_MIN_LIFETIME = 5.0
+
+_service_token: TTLCache[str, Any] = TTLCache("service_token", maxsize=1, ttl=300)
+_flights: SingleFlight[Any, Any] = SingleFlight("data_sharing")
+
+# How long a fetched vocabulary is used without asking again, unless the response
+# says otherwise in `Cache-Control: max-age`. After that it is revalidated with
+# `If-None-Match` / `If-Modified-Since`, which costs a round trip but not the body.
+OFFERS_MAX_AGE = 60.0
+
+# Keyed by URL. Entries outlive their freshness so their validators can be sent;
+# a day without a successful revalidation drops them altogether.
+_offers: TTLCache[str, "_CachedOffers"] = TTLCache("sharing_offers", maxsize=8, ttl=86_400)
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+# Events per history page when the caller does not say.
+HISTORY_PAGE_SIZE = 50
+
+# Read timeouts per endpoint: a lookup should answer quickly, a write to the
+# connector may take longer. A connection that cannot be made in 3 s is not going
+# to be made in 15.
+CONNECT_TIMEOUT = 3.0
+TIMEOUTS = {
+    "resolve": httpx.Timeout(10.0, connect=CONNECT_TIMEOUT),
+    "sharing_offers": httpx.Timeout(10.0, connect=CONNECT_TIMEOUT),
+    "list_decisions": httpx.Timeout(15.0, connect=CONNECT_TIMEOUT),
+    "set_decision": httpx.Timeout(15.0, connect=CONNECT_TIMEOUT),
+    "my_events": httpx.Timeout(15.0, connect=CONNECT_TIMEOUT),
+}
+
 
 class DataSharingUnavailable(RuntimeError):
     """The dataspace could not be reached, or is not configured."""
@@ -54,6 +98,66 @@ class NoDataspaceIdentity(RuntimeError):
     """
 
 
+class DataspaceClients:
+    """One pooled HTTP client per dataspace service, kept for the worker's lifetime.
+
+    A fresh client per call paid a TCP and TLS handshake every time — five for one
+    toggle. These keep connections alive between requests instead. Created on first
+    use and closed by `stop`, which the app lifespan calls.
+    """
+
+    LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=30)
+
+    def __init__(self) -> None:
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        # Tests route every client through a mock transport by setting this.
+        self._transport: httpx.AsyncBaseTransport | None = None
+
+    def get(self, upstream: str) -> httpx.AsyncClient:
+        client = self._clients.get(upstream)
+        if client is None or client.is_closed:
+            client = self._clients[upstream] = httpx.AsyncClient(
+                limits=self.LIMITS,
+                timeout=httpx.Timeout(15.0, connect=CONNECT_TIMEOUT),
+                transport=self._transport,
+            )
+        return client
+
+    async def stop(self) -> None:
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+
+dataspace_clients = DataspaceClients()
+
+
+@dataclass(frozen=True)
+class _CachedOffers:
+    offers: list[dict[str, Any]]
+    etag: str | None
+    last_modified: str | None
+    fresh_until: float
+
+    @property
+    def validators(self) -> dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def _fresh_until(resp: httpx.Response) -> float:
+    cache_control = resp.headers.get("cache-control", "")
+    if "no-cache" in cache_control or "no-store" in cache_control:
+        return 0.0
+    max_age = _MAX_AGE.search(cache_control)
+    lifetime = float(max_age.group(1)) if max_age else OFFERS_MAX_AGE
+    return time.monotonic() + lifetime
+
+
 @dataclass(frozen=True)
 class SubjectCredential:
     """What a member needs in order to act on their own consent."""
@@ -67,7 +171,11 @@ class SubjectCredential:
 
 
 def _resolve_token_provider():
-    """Service account used *only* to look up which credential is the member's."""
+    """Service account used *only* to look up which credential is the member's.
+
+    Needs no lock: nothing is awaited between the check and the assignment, so on
+    the one event loop no two callers can both find it missing.
+    """
     global _token_provider
     if _token_provider is None:
         from celine.sdk.auth import OidcClientCredentialsProvider
@@ -80,24 +188,73 @@ def _resolve_token_provider():
     return _token_provider
 
 
+async def _service_access_token() -> str:
+    """The service account's access token, fetched once and renewed ahead of expiry.
+
+    A request that finds the token inside its renewal window still uses it, and
+    starts the renewal for whoever comes next; only a request that finds none —
+    the first, or the first after an idle spell longer than the token lives —
+    waits for one. Concurrent fetches are one fetch, a renewal already under way
+    included; if that fails, so does every request waiting on it.
+    """
+    token = _service_token.get("resolve")
+    if token is None:
+        try:
+            token = await _flights.run("service_token", _fetch_service_token)
+        except Exception as exc:
+            raise DataSharingUnavailable(
+                f"Identity registry token could not be fetched: {exc}"
+            ) from exc
+    elif token.expires_at - time.time() < TOKEN_RENEW_WINDOW:
+        _flights.start("service_token", _renew_service_token)
+    return token.access_token
+
+
+async def _fetch_service_token() -> Any:
+    token = await _resolve_token_provider().get_token()
+    _service_token.set(
+        "resolve", token, ttl=token.expires_at - time.time() - TOKEN_MIN_LIFETIME
+    )
+    return token
+
+
+async def _renew_service_token() -> Any:
+    try:
+        return await _fetch_service_token()
+    except Exception as exc:
+        # The current token is still good for a while; the next request retries.
+        # Raised all the same, for a request that missed the cache and joined in.
+        logger.warning("Renewing the identity registry token failed: %s", exc)
+        raise
+
+
 async def resolve_subject(email: str) -> SubjectCredential:
     """Find the member's dataspace DID and their DataSubject credential.
 
     Raises :class:`NoDataspaceIdentity` when they have none — which is a normal
     state for a participant enabled before the dataspace existed.
+
+    Concurrent resolutions for the same email — a page firing several requests at
+    once — share one call. Its answer is not kept once it has landed.
     """
+    return await _flights.run(("resolve", email), lambda: _resolve_subject(email))
+
+
+async def _resolve_subject(email: str) -> SubjectCredential:
     if not settings.identity_registry_url:
         raise DataSharingUnavailable("Identity registry is not configured")
 
     base = settings.identity_registry_url.rstrip("/")
     try:
-        token = await _resolve_token_provider().get_token()
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.get(
+        token = await _service_access_token()
+        with observe_upstream("identity_registry", "resolve") as call:
+            resp = await dataspace_clients.get("identity_registry").get(
                 f"{base}/users/resolve",
                 params={"email": email},
-                headers={"Authorization": f"Bearer {token.access_token}"},
+                headers=inject({"Authorization": f"Bearer {token}"}),
+                timeout=TIMEOUTS["resolve"],
             )
+            call.status = resp.status_code
     except httpx.HTTPError as exc:
         raise DataSharingUnavailable(f"Identity registry unreachable: {exc}") from exc
 
@@ -135,43 +292,82 @@ async def list_offers() -> list[dict[str, Any]]:
     anyone has an identity. Rendered from here rather than from a local copy:
     two copies of the text a person agrees to is how the thing displayed and the
     thing recorded drift apart, invisibly.
+
+    Shared by every member, so it is cached: reused for ``max-age`` (default
+    `OFFERS_MAX_AGE`), then revalidated. A vocabulary that cannot be revalidated
+    is not served stale — the call fails as it would have without the cache.
     """
     base = (settings.ds_ns_url or settings.ds_connector_url or "").rstrip("/")
     if not base:
         raise DataSharingUnavailable("No sharing-offers vocabulary is configured")
 
+    url = f"{base}/ns/sharing-offers"
+    cached = _offers.get(url)
+    if cached is not None and cached.fresh_until > time.monotonic():
+        return list(cached.offers)
+
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.get(f"{base}/ns/sharing-offers")
+        with observe_upstream("dataspace_ns", "sharing_offers") as call:
+            resp = await dataspace_clients.get("dataspace_ns").get(
+                url,
+                headers=inject(cached.validators if cached else {}),
+                timeout=TIMEOUTS["sharing_offers"],
+            )
+            call.status = resp.status_code
+        if resp.status_code == 304 and cached is not None:
+            offers = cached.offers
+            etag = resp.headers.get("etag", cached.etag)
+            last_modified = resp.headers.get("last-modified", cached.last_modified)
+        else:
             resp.raise_for_status()
-            return resp.json()
+            offers = resp.json()
+            etag = resp.headers.get("etag")
+            last_modified = resp.headers.get("last-modified")
     except (httpx.HTTPError, ValueError) as exc:
         raise DataSharingUnavailable(
             f"Sharing offers could not be read: {exc}"
         ) from exc
 
+    _offers.set(url, _CachedOffers(offers, etag, last_modified, _fresh_until(resp)))
+    return list(offers)
+
 
 async def list_decisions(credential: SubjectCredential) -> list[dict[str, Any]]:
     """The member's current decisions, with the evidence behind each."""
     base = (settings.ds_connector_url or "").rstrip("/")
     try:
-        async with httpx.AsyncClient(timeout=15) as client:
-            resp = await client.get(
-                f"{base}/consent/my/shares", headers=credential.headers
+        with observe_upstream("connector", "list_decisions") as call:
+            resp = await dataspace_clients.get("connector").get(
+                f"{base}/consent/my/shares",
+                headers=inject(credential.headers),
+                timeout=TIMEOUTS["list_decisions"],
             )
+            call.status = resp.status_code
     except httpx.HTTPError as exc:
         raise DataSharingUnavailable(f"Connector unreachable: {exc}") from exc
 
     if resp.status_code >= 400:
         raise DataSharingUnavailable(f"Connector answered {resp.status_code}")
 
-    body = resp.json()
-    return body if isinstance(body, list) else body.get("items", [])
+    return shares_from(resp.json()) or []
+
+
+def shares_from(body: Any) -> list[dict[str, Any]] | None:
+    """The member's decisions in a connector answer, or None if it does not list them.
+
+    The connector answers a read with the list, bare or under ``items``; it may
+    answer a change with the same, or with only the record that changed.
+    """
+    if isinstance(body, list):
+        return body
+    if isinstance(body, dict) and isinstance(body.get("items"), list):
+        return body["items"]
+    return None
 
 
 async def set_decision(
     credential: SubjectCredential, offer_id: str, *, enabled: bool
-) -> dict[str, Any]:
+) -> Any:
     """Grant or withdraw one offer, as the member.
 
     No evidence record is sent. The connector derives it from the resolved offer
@@ -181,12 +377,14 @@ async def set_decision(
     """
     base = (settings.ds_connector_url or "").rstrip("/")
     try:
-        async with httpx.AsyncClient(timeout=15) as client:
-            resp = await client.post(
+        with observe_upstream("connector", "set_decision") as call:
+            resp = await dataspace_clients.get("connector").post(
                 f"{base}/consent/my/shares",
                 json={"offer_id": offer_id, "enabled": enabled},
-                headers=credential.headers,
+                headers=inject(credential.headers),
+                timeout=TIMEOUTS["set_decision"],
             )
+            call.status = resp.status_code
     except httpx.HTTPError as exc:
         raise DataSharingUnavailable(f"Connector unreachable: {exc}") from exc
 
@@ -199,33 +397,167 @@ async def set_decision(
         raise DataSharingUnavailable(
             f"Connector refused the change ({resp.status_code})"
         )
-    return resp.json()
+    try:
+        return resp.json()
+    except ValueError:
+        # Recorded, with nothing to say about it. Not a reason to report failure,
+        # and a ValueError here would read as the contract-offer refusal above.
+        return {}
 
 
-async def list_history(credential: SubjectCredential) -> list[dict[str, Any]]:
-    """What has happened with this member's data, from their own record.
+@dataclass(frozen=True)
+class HistoryPage:
+    """Up to one page of a member's history, and where the next page starts."""
 
-    Served by provenance and authenticated by the same credential, so it is the
-    member's history rather than a view this app assembles. Absent provenance is
-    not an error — the decisions still stand without it.
+    events: list[dict[str, Any]]
+    next_cursor: str | None = None
+
+
+class InvalidCursor(ValueError):
+    """A history cursor this service did not hand out."""
+
+
+def _parse_cursor(cursor: str | None) -> tuple[str | None, int]:
+    """``(provenance cursor, events to skip)`` for a cursor from `list_history`.
+
+    ``p:...`` carries provenance's own cursor. ``o:N`` is for a provenance that
+    does not paginate: the next page is the one after the first N events.
+    """
+    if not cursor:
+        return None, 0
+    kind, _, value = cursor.partition(":")
+    if kind == "p" and value:
+        return value, 0
+    if kind == "o" and value.isdigit():
+        return None, int(value)
+    raise InvalidCursor(cursor)
+
+
+async def _history_events(
+    credential: SubjectCredential, params: dict[str, str], trailer: dict[str, Any]
+) -> AsyncIterator[dict[str, Any]]:
+    """The events of one provenance response, each as soon as it has arrived.
+
+    The body is parsed as it streams in, so only the event being read is held,
+    however long the history. Its other top-level members — a next-page cursor
+    among them — are put in ``trailer`` once the events are done.
     """
     base = (settings.ds_provenance_url or "").rstrip("/")
-    if not base:
-        return []
-
+    client = dataspace_clients.get("provenance")
     try:
-        async with httpx.AsyncClient(timeout=15) as client:
-            resp = await client.get(
-                f"{base}/prov/my/events", headers=credential.headers
+        # Timed to the response headers: the body is read at the caller's pace.
+        with observe_upstream("provenance", "my_events") as call:
+            request = client.build_request(
+                "GET",
+                f"{base}/prov/my/events",
+                params=params,
+                headers=inject(credential.headers),
+                timeout=TIMEOUTS["my_events"],
             )
+            resp = await client.send(request, stream=True)
+            call.status = resp.status_code
     except httpx.HTTPError as exc:
-        logger.warning("Provenance unreachable: %s", exc)
-        return []
+        raise DataSharingUnavailable(f"Provenance unreachable: {exc}") from exc
 
-    if resp.status_code >= 400:
-        logger.warning("Provenance answered %s", resp.status_code)
-        return []
+    try:
+        if resp.status_code >= 400:
+            raise DataSharingUnavailable(f"Provenance answered {resp.status_code}")
+        reader = ArrayItems("@graph")
+        async for chunk in resp.aiter_text():
+            for event in reader.feed(chunk):
+                if isinstance(event, dict):
+                    yield event
+        for event in reader.close():
+            if isinstance(event, dict):
+                yield event
+        trailer.update(reader.members)
+    except (httpx.HTTPError, ValueError) as exc:
+        raise DataSharingUnavailable(f"Provenance history could not be read: {exc}") from exc
+    finally:
+        await resp.aclose()
 
-    body = resp.json()
-    events = body.get("@graph", body) if isinstance(body, dict) else body
-    return events if isinstance(events, list) else []
+
+def _provenance_cursor(trailer: dict[str, Any]) -> str | None:
+    cursor = trailer.get("next_cursor") or trailer.get("next")
+    return f"p:{cursor}" if isinstance(cursor, str) and cursor else None
+
+
+async def list_history(
+    credential: SubjectCredential,
+    *,
+    cursor: str | None = None,
+    limit: int = HISTORY_PAGE_SIZE,
+) -> HistoryPage:
+    """One page of what has happened with this member's data, from their own record.
+
+    Served by provenance and authenticated by the same credential, so it is the
+    member's history rather than a view this app assembles. Absent provenance is
+    not an error — the decisions still stand without it.
+
+    ``limit`` and provenance's cursor are passed through. A provenance that ignores
+    them and answers with everything is read only as far as this page and one
+    event past it; the cursor returned then counts events instead.
+
+    Raises `InvalidCursor` for a cursor not handed out here.
+    """
+    provenance_cursor, offset = _parse_cursor(cursor)
+    if not settings.ds_provenance_url:
+        return HistoryPage(events=[])
+
+    params = {"limit": str(limit)}
+    if provenance_cursor:
+        params["cursor"] = provenance_cursor
+
+    events: list[dict[str, Any]] = []
+    trailer: dict[str, Any] = {}
+    skipped = 0
+    more = False
+    try:
+        async with aclosing(_history_events(credential, params, trailer)) as stream:
+            async for event in stream:
+                if skipped < offset:
+                    skipped += 1
+                elif len(events) < limit:
+                    events.append(event)
+                else:
+                    more = True
+                    break
+    except DataSharingUnavailable as exc:
+        logger.warning("%s", exc)
+        return HistoryPage(events=[])
+
+    if more:
+        return HistoryPage(events=events, next_cursor=f"o:{offset + limit}")
+    return HistoryPage(events=events, next_cursor=_provenance_cursor(trailer))
+
+
+async def stream_history(
+    credential: SubjectCredential, *, cursor: str | None = None
+) -> AsyncIterator[dict[str, Any]]:
+    """Every event from ``cursor`` on, following provenance's pages, one at a time.
+
+    Raises `InvalidCursor` before the first event for a cursor not handed out here.
+    A provenance failure part-way ends the stream early, as it would have ended a
+    page with nothing in it.
+    """
+    provenance_cursor, offset = _parse_cursor(cursor)
+    if not settings.ds_provenance_url:
+        return
+
+    while True:
+        params = {"cursor": provenance_cursor} if provenance_cursor else {}
+        trailer: dict[str, Any] = {}
+        try:
+            async with aclosing(_history_events(credential, params, trailer)) as stream:
+                async for event in stream:
+                    if offset:
+                        offset -= 1
+                        continue
+                    yield event
+        except DataSharingUnavailable as exc:
+            logger.warning("%s", exc)
+            return
+        next_cursor = _provenance_cursor(trailer)
+        if next_cursor is None or next_cursor[2:] == provenance_cursor:
+            return
+        provenance_cursor = next_cursor[2:]
@@ -0,0 +1,205 @@
+"""Feedback rows written in batches, behind the request that submitted them.
+
+Feedback arrives in bursts — a rollout campaign puts the same form in front of
+every member at once — and each submission used to take a pooled connection for
+its own INSERT, COMMIT and re-read. During a burst those requests took the small
+pool away from the dashboard. `POST /api/feedback` now builds the row, gives it
+its id, hands it to this queue and answers; one background
+writer inserts whatever has queued up as a single multi-row INSERT and commits it,
+holding one connection however many members are submitting.
+
+Five things worth knowing before changing this:
+
+* **A full or stopped queue is the old path.** `submit` returns False when the
+  queue is at `MAX_PENDING` or not running, and the route then writes the row
+  itself, so a burst larger than the queue slows down rather than failing.
+* **A row is not given up while the process runs.** Any failure other than the
+  row's own data — the database away — is retried, whole batch, after each of
+  `RETRY_DELAYS` and then every last delay, for as long as it takes. Rows keep
+  queueing behind it until the queue is full, and from then on requests write
+  their own rows and fail the way they did before the queue.
+* **Shutdown writes what is queued.** `stop` stops taking rows and waits up to
+  `STOP_TIMEOUT` for the writer to drain; only what is still unwritten after that,
+  the batch being retried included, is dropped, with a log line.
+* **One bad row does not sink its batch.** A batch the database rejects as data
+  (an integrity or data error) is written again row by row, and only the rows
+  rejected on their own are dropped.
+* **``created_at`` is the database's.** Rows are queued without it and the INSERT
+  takes the column default, so a row is stamped in the transaction that commits
+  it, however long it waited here. The incremental export relies on that: a row
+  never appears behind a watermark already recorded past its stamp.
+
+Screenshots are not queued: their bytes are stored, and committed, by the request,
+which then queues a row that references them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Callable
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from celine.webapp.db.models import FeedbackEntry
+from celine.webapp.metrics import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+MAX_PENDING = 1000
+BATCH_SIZE = 100
+# How long the writer waits for more rows once it has one: a little latency on a
+# write nobody is waiting for, in exchange for fuller batches.
+LINGER = 0.05
+# Seconds before each retry of a failed batch; the last is repeated until it succeeds.
+RETRY_DELAYS: tuple[float, ...] = (0.5, 2.0, 5.0, 15.0, 30.0)
+STOP_TIMEOUT = 10.0
+
+feedback_rows = Counter(
+    "feedback_queue_rows_total",
+    "Feedback rows taken by the write queue, by outcome.",
+    ("outcome",),
+)
+
+
+class FeedbackQueue:
+    """A bounded queue of feedback rows and the task that writes them."""
+
+    def __init__(
+        self,
+        max_pending: int = MAX_PENDING,
+        batch_size: int = BATCH_SIZE,
+        linger: float = LINGER,
+        retry_delays: tuple[float, ...] = RETRY_DELAYS,
+    ) -> None:
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.linger = linger
+        self.retry_delays = retry_delays
+        self.sessionmaker: Callable[[], AsyncSession] | None = None
+        self._queue: asyncio.Queue[dict[str, Any]] | None = None
+        self._writer: asyncio.Task | None = None
+        self._running = False
+        # Rows the writer held when it was cancelled, counted by `stop`.
+        self._abandoned = 0
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self) -> None:
+        if self.sessionmaker is None:
+            from celine.webapp.db.session import AsyncSessionLocal
+
+            self.sessionmaker = AsyncSessionLocal
+        self._queue = asyncio.Queue(self.max_pending)
+        self._writer = asyncio.create_task(self._write_forever())
+        self._running = True
+
+    async def stop(self) -> None:
+        self._running = False
+        if self._writer is None:
+            return
+        try:
+            await asyncio.wait_for(self.flush(), STOP_TIMEOUT)
+        except asyncio.TimeoutError:
+            pass
+        self._writer.cancel()
+        await asyncio.gather(self._writer, return_exceptions=True)
+        dropped = self._abandoned + self.pending
+        if dropped:
+            logger.error("Dropping %d unwritten feedback row(s) at shutdown", dropped)
+            feedback_rows.inc(dropped, outcome="dropped")
+        self._abandoned = 0
+        self._queue = None
+        self._writer = None
+
+    def submit(self, values: dict[str, Any]) -> bool:
+        """Queue the `FeedbackEntry` column ``values`` for writing.
+
+        ``values`` must carry every column the batch writes, ``id`` included, and
+        leave ``created_at`` to the database. Returns False when the queue is not running or is
+        full, in which case the caller writes the row.
+        """
+        if not self._running or self._queue is None:
+            return False
+        try:
+            self._queue.put_nowait(values)
+        except asyncio.QueueFull:
+            feedback_rows.inc(outcome="overflow")
+            return False
+        return True
+
+    async def flush(self) -> None:
+        """Wait until every row queued so far has been written (or dropped)."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def _write_forever(self) -> None:
+        queue = self._queue
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            try:
+                deadline = loop.time() + self.linger
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(queue.get_nowait())
+                        continue
+                    except asyncio.QueueEmpty:
+                        pass
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+                await self._write(batch)
+            except asyncio.CancelledError:
+                self._abandoned = len(batch)
+                raise
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def _write(self, rows: list[dict[str, Any]]) -> None:
+        attempt = 0
+        while True:
+            try:
+                async with self.sessionmaker() as db:
+                    await db.execute(insert(FeedbackEntry).values(rows))
+                    await db.commit()
+            except (IntegrityError, DataError) as exc:
+                if len(rows) > 1:
+                    for row in rows:
+                        await self._write([row])
+                    return
+                logger.error("Dropping feedback %s rejected by the database: %s", rows[0]["id"], exc)
+                feedback_rows.inc(outcome="rejected")
+                return
+            except Exception as exc:
+                delay = self.retry_delays[min(attempt, len(self.retry_delays) - 1)]
+                attempt += 1
+                logger.warning(
+                    "Feedback batch of %d failed (attempt %d), retrying in %gs: %s",
+                    len(rows),
+                    attempt,
+                    delay,
+                    exc,
+                )
+                await asyncio.sleep(delay)
+                continue
+            feedback_rows.inc(len(rows), outcome="written")
+            return
+
+
+feedback_queue = FeedbackQueue()
+
+Gauge(
+    "feedback_queue_pending",
+    "Feedback rows queued and not yet written.",
+    callback=lambda: feedback_queue.pending,
+)
@@ -0,0 +1,95 @@
+"""Keep Keycloak's signing keys loaded, so verifying a token never waits on the network.
+
+`celine-sdk` verifies tokens through a `PyJWKClient` of its own, cached per JWKS URI,
+which fetches the JWKS on first use and again whenever its cached copy expires —
+synchronously, inside whichever request happened to arrive at that moment. The SDK
+offers no way to reach that client, so it is warmed through `JwtUser.from_token`
+itself: the refresher verifies a probe token whose ``kid`` no realm publishes, when the
+app starts and again every ``REFRESH_INTERVAL`` seconds. Looking up a ``kid`` that is
+not in the cached set makes the client fetch the set again, which is the refresh; the
+probe itself is always rejected.
+
+Verification and claim mapping stay entirely in the SDK. Should a future SDK stop
+caching its client, the probe warms nothing and verification carries on as before, one
+fetch per token.
+
+The SDK client still fetches on its own for a token whose ``kid`` it has never seen, at
+most once per its cooldown. That is how a key Keycloak has just rotated in is picked up
+before the next scheduled refresh.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+import jwt
+from celine.sdk.auth import JwtUser
+
+from celine.webapp.settings import settings
+
+logger = logging.getLogger(__name__)
+
+REFRESH_INTERVAL = 300.0
+RETRY_INTERVAL = 15.0
+
+# Unsigned, and naming a key no JWKS holds: it can only ever be rejected.
+PROBE_KID = "celine-webapp-jwks-probe"
+_PROBE_TOKEN = jwt.encode({}, None, algorithm="none", headers={"kid": PROBE_KID})
+
+
+class _ProbeFilter(logging.Filter):
+    """Drops the warning the SDK logs each time it rejects the probe."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return PROBE_KID not in record.getMessage()
+
+
+logging.getLogger("celine.sdk.auth.jwt").addFilter(_ProbeFilter())
+
+
+class JwksRefresher:
+    """Loads the JWKS at startup and refreshes it in the background."""
+
+    def __init__(
+        self,
+        refresh_interval: float = REFRESH_INTERVAL,
+        retry_interval: float = RETRY_INTERVAL,
+    ) -> None:
+        self.refresh_interval = refresh_interval
+        self.retry_interval = retry_interval
+        self.loaded = False
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def refresh(self) -> bool:
+        """Have the SDK's client fetch the key set. False if it could not be fetched."""
+        try:
+            await asyncio.to_thread(JwtUser.from_token, _PROBE_TOKEN, oidc=settings.oidc)
+        except jwt.PyJWKClientConnectionError as exc:
+            logger.warning("JWKS refresh from %s failed: %s", settings.oidc.jwks_uri, exc)
+            return False
+        except jwt.PyJWKClientError:
+            # The set was fetched and, as intended, holds no probe key.
+            pass
+        except Exception as exc:
+            logger.warning("JWKS refresh from %s failed: %s", settings.oidc.jwks_uri, exc)
+            return False
+        self.loaded = True
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            ok = await self.refresh()
+            await asyncio.sleep(self.refresh_interval if ok else self.retry_interval)
+
+
+jwks_refresher = JwksRefresher()
@@ -0,0 +1,125 @@
+"""Deferred delivery of notification preferences to the nudging tool.
+
+`PUT /api/settings` writes this service's own row and then pushes the notification
+half upstream. When that push fails the local write has already committed, so
+answering 502 would tell the member their change was lost when half of it was not.
+Instead the push is handed to this outbox, which retries it in the background and
+the route answers 202.
+
+Two things worth knowing before changing this:
+
+* **Latest wins, per member.** A newer submission replaces a pending one rather
+  than queueing behind it; delivering a stale preference after a fresh one would
+  silently undo the member's last change.
+* **It is in-process and carries the member's own token.** Preferences are
+  written as the member, so a retry can only succeed while their token is valid.
+  The retry schedule is short for that reason, and anything still pending at
+  shutdown is dropped with a log line rather than persisted: storing a member's
+  token to replay it later is not something this service does.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+RETRY_DELAYS: tuple[float, ...] = (1.0, 5.0, 15.0, 60.0)
+MAX_PENDING = 1000
+
+
+@dataclass
+class _PendingSync:
+    client: Any
+    payload: dict[str, Any] = field(default_factory=dict)
+
+
+class NudgingOutbox:
+    """Retries failed preference pushes, one worker per member with pending work."""
+
+    def __init__(
+        self,
+        retry_delays: tuple[float, ...] = RETRY_DELAYS,
+        max_pending: int = MAX_PENDING,
+    ) -> None:
+        self.retry_delays = retry_delays
+        self.max_pending = max_pending
+        self._pending: dict[str, _PendingSync] = {}
+        self._workers: dict[str, asyncio.Task] = {}
+        self._running = False
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def start(self) -> None:
+        self._running = True
+
+    async def stop(self) -> None:
+        self._running = False
+        workers = list(self._workers.values())
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        if self._pending:
+            logger.warning(
+                "Dropping %d undelivered nudging preference update(s) at shutdown",
+                len(self._pending),
+            )
+        self._pending.clear()
+        self._workers.clear()
+
+    def submit(self, user_id: str, client: Any, payload: dict[str, Any]) -> bool:
+        """Queue ``client.update_preferences(**payload)`` for retry.
+
+        Returns False when the outbox is not running or is full, in which case the
+        caller still owns the failure.
+        """
+        if not self._running:
+            return False
+        if user_id not in self._pending and len(self._pending) >= self.max_pending:
+            return False
+
+        self._pending[user_id] = _PendingSync(client=client, payload=payload)
+        if user_id not in self._workers:
+            self._workers[user_id] = asyncio.create_task(self._deliver(user_id))
+        return True
+
+    async def _deliver(self, user_id: str) -> None:
+        try:
+            for attempt, delay in enumerate(self.retry_delays, start=1):
+                await asyncio.sleep(delay)
+                item = self._pending.get(user_id)
+                if item is None:
+                    return
+                try:
+                    await item.client.update_preferences(**item.payload)
+                except Exception as exc:
+                    logger.warning(
+                        "Nudging preference retry %d/%d failed for %s: %s",
+                        attempt,
+                        len(self.retry_delays),
+                        user_id,
+                        exc,
+                    )
+                    continue
+                # A newer submission that arrived mid-flight stays pending and is
+                # delivered on the next pass.
+                if self._pending.get(user_id) is item:
+                    del self._pending[user_id]
+                    return
+
+            if self._pending.pop(user_id, None) is not None:
+                logger.error(
+                    "Giving up on nudging preference update for %s after %d attempts",
+                    user_id,
+                    len(self.retry_delays),
+                )
+        finally:
+            self._workers.pop(user_id, None)
+
+
+outbox = NudgingOutbox()
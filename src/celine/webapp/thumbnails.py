@@ -0,0 +1,38 @@
+"""Downscaled previews of feedback screenshots, for the export.
+
+Decoding and resizing an image is the one CPU-bound step of the export, so the
+exporter runs `make_thumbnail` in worker processes; this module imports nothing
+from the application, to keep starting those workers cheap.
+
+Needs Pillow, which is optional (the ``thumbnails`` extra). `available` says whether
+it is installed; the exporter checks before offering thumbnails.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import io
+
+THUMBNAIL_MAX_SIDE = 480
+THUMBNAIL_QUALITY = 80
+
+
+def available() -> bool:
+    return importlib.util.find_spec("PIL") is not None
+
+
+def make_thumbnail(data: bytes, max_side: int = THUMBNAIL_MAX_SIDE) -> bytes | None:
+    """A JPEG of ``data`` no larger than ``max_side`` either way, or None if it is not
+    an image Pillow can read."""
+    from PIL import Image
+
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image.thumbnail((max_side, max_side))
+            if image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            out = io.BytesIO()
+            image.save(out, "JPEG", quality=THUMBNAIL_QUALITY, optimize=True)
+            return out.getvalue()
+    except (OSError, Image.DecompressionBombError):
+        return None
@@ -0,0 +1,203 @@
+"""Timestamps as the Digital Twin returns them, normalised.
+
+DT rows carry ``ts`` as an ISO 8601 string — naive (UTC by convention), with ``Z``, or
+with an explicit offset, with ``T`` or a space between date and time — and the routes
+mostly want one thing from it: which day the row belongs to. Parsing a full datetime
+for each of a year's 35,000 rows to read the first ten characters back is where the
+trend builders spent their time.
+
+`day_key` therefore slices when it can. A string in one of the shapes above whose
+offset is zero (or absent) names its UTC day in its first ten characters; those are
+checked once per distinct day, memoised, and returned. Anything else — a non-zero
+offset, a target zone other than UTC, an unfamiliar shape — is parsed in full and
+converted, so a row stamped ``00:30+02:00`` is binned on the previous UTC day rather
+than on the date written in it.
+
+Binning in a member's own zone keeps the slice. For each UTC day a zone has a rule
+worked out once from its transitions: rows before a cutoff time of day fall on one
+local day, the rest on the next (``Europe/Rome`` in summer: before 22:00 UTC is the
+same day, from 22:00 the following one). A year of rules costs 366 conversions, once
+per zone, instead of one per row. The days on which the zone changes offset have no
+rule, and their rows take the full path.
+"""
+
+from __future__ import annotations
+
+from datetime import MAXYEAR, MINYEAR, date, datetime, timedelta, timezone, tzinfo
+from functools import lru_cache
+from typing import Any, Iterable
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+UTC = timezone.utc
+
+_ZERO_OFFSETS = frozenset({"", "Z", "+00:00", "-00:00", "+0000", "+00"})
+
+# Day prefix -> itself if it is a valid date, else None. A year of rows has 366
+# distinct prefixes; the bound only matters for a caller feeding arbitrary input.
+_checked_days: dict[str, str | None] = {}
+_CHECKED_DAYS_MAX = 4096
+
+
+# Zone -> UTC day -> (cutoff, before, after): a row of that UTC day falls on local
+# day ``before`` if its "HH:MM" sorts before ``cutoff``, else on ``after``. Filled
+# a year at a time, as rows from that year turn up.
+_DayRule = tuple[str, str, str]
+_day_rules: dict[tzinfo, dict[str, _DayRule]] = {}
+_built_years: set[tuple[tzinfo, str]] = set()
+_DAY_RULE_ZONES_MAX = 64
+
+_MINUTE = timedelta(minutes=1)
+
+
+@lru_cache(maxsize=256)
+def zone(name: str) -> tzinfo:
+    """The zone called ``name``, an IANA key such as ``Europe/Rome``.
+
+    Raises ValueError if there is no such zone.
+    """
+    if name in ("UTC", "Etc/UTC"):
+        return UTC
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError) as exc:
+        raise ValueError(f"unknown time zone: {name!r}") from exc
+
+
+def _hhmm(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def _year_rules(tz: tzinfo, year: int) -> dict[str, _DayRule]:
+    """The rule of each UTC day of ``year`` in ``tz``, leaving out transition days."""
+    rules: dict[str, _DayRule] = {}
+    midnight = datetime(year, 1, 1, tzinfo=UTC)
+    offset = midnight.astimezone(tz).utcoffset()
+    while midnight.year == year:
+        following = midnight + timedelta(days=1)
+        next_offset = following.astimezone(tz).utcoffset()
+        if offset == next_offset and offset is not None and not offset % _MINUTE:
+            day = midnight.date()
+            minutes = offset // _MINUTE
+            if minutes >= 0:
+                rule = (_hhmm(1440 - minutes), day.isoformat(), following.date().isoformat())
+            else:
+                rule = (_hhmm(-minutes), (day - timedelta(days=1)).isoformat(), day.isoformat())
+            rules[day.isoformat()] = rule
+        midnight, offset = following, next_offset
+    return rules
+
+
+def _rules_for(tz: tzinfo) -> dict[str, _DayRule]:
+    rules = _day_rules.get(tz)
+    if rules is None:
+        if len(_day_rules) >= _DAY_RULE_ZONES_MAX:
+            _day_rules.clear()
+            _built_years.clear()
+        rules = _day_rules[tz] = {}
+    return rules
+
+
+def _rule(tz: tzinfo, rules: dict[str, _DayRule], prefix: str) -> _DayRule | None:
+    """The rule for UTC day ``prefix``, building its year first if it has not been."""
+    year = prefix[:4]
+    if (tz, year) in _built_years or not (year.isascii() and year.isdigit()):
+        return None
+    if not MINYEAR < int(year) < MAXYEAR:
+        return None
+    _built_years.add((tz, year))
+    rules.update(_year_rules(tz, int(year)))
+    return rules.get(prefix)
+
+
+def _checked_day(prefix: str) -> str | None:
+    try:
+        date.fromisoformat(prefix)
+        day = prefix if len(prefix) == 10 else None
+    except ValueError:
+        day = None
+    if len(_checked_days) >= _CHECKED_DAYS_MAX:
+        _checked_days.clear()
+    _checked_days[prefix] = day
+    return day
+
+
+def parse(ts: Any) -> datetime | None:
+    """``ts`` as an aware datetime; naive values are taken as UTC. None if unparseable."""
+    if isinstance(ts, datetime):
+        parsed = ts
+    elif isinstance(ts, str) and ts:
+        try:
+            parsed = datetime.fromisoformat(ts.replace(" ", "T", 1))
+        except ValueError:
+            return None
+    else:
+        return None
+    return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=UTC)
+
+
+def _parsed_day_key(ts: Any, tz: tzinfo) -> str | None:
+    parsed = parse(ts)
+    if parsed is None:
+        return None
+    return parsed.astimezone(tz).date().isoformat()
+
+
+def day_key(ts: Any, tz: tzinfo = UTC) -> str | None:
+    """The ``YYYY-MM-DD`` day ``ts`` falls on in ``tz``. None if it is not a timestamp."""
+    if tz is not UTC:
+        return day_keys((ts,), tz)[0]
+    if type(ts) is str and len(ts) >= 19 and ts[10] in "T " and ts[13] == ":":
+        tail = ts[19:]
+        if tail[:1] == ".":
+            tail = tail[1:].lstrip("0123456789")
+        if tail in _ZERO_OFFSETS:
+            prefix = ts[:10]
+            day = _checked_days.get(prefix, False)
+            return _checked_day(prefix) if day is False else day
+    return _parsed_day_key(ts, UTC)
+
+
+def day_keys(stamps: Iterable[Any], tz: tzinfo = UTC) -> list[str | None]:
+    """`day_key` of each of ``stamps``, for a whole series at once.
+
+    The same answers, with the fast path inlined: for a year of rows the per-call
+    overhead of `day_key` is a large part of what is left to save.
+    """
+    if tz is not UTC:
+        return _local_day_keys(stamps, tz)
+    checked = _checked_days
+    zero = _ZERO_OFFSETS
+    keys: list[str | None] = []
+    append = keys.append
+    for ts in stamps:
+        if type(ts) is str and len(ts) >= 19 and ts[10] in "T " and ts[13] == ":":
+            tail = ts[19:]
+            if tail in zero or (
+                tail[:1] == "." and tail[1:].lstrip("0123456789") in zero
+            ):
+                day = checked.get(ts[:10], False)
+                append(_checked_day(ts[:10]) if day is False else day)
+                continue
+        append(day_key(ts))
+    return keys
+
+
+def _local_day_keys(stamps: Iterable[Any], tz: tzinfo) -> list[str | None]:
+    """`day_keys` for a zone other than UTC, reading each day off its rule."""
+    rules = _rules_for(tz)
+    zero = _ZERO_OFFSETS
+    keys: list[str | None] = []
+    append = keys.append
+    for ts in stamps:
+        if type(ts) is str and len(ts) >= 19 and ts[10] in "T " and ts[13] == ":":
+            tail = ts[19:]
+            if tail in zero or (
+                tail[:1] == "." and tail[1:].lstrip("0123456789") in zero
+            ):
+                rule = rules.get(ts[:10]) or _rule(tz, rules, ts[:10])
+                if rule is not None:
+                    cutoff, before, after = rule
+                    append(before if ts[11:16] < cutoff else after)
+                    continue
+        append(_parsed_day_key(ts, tz))
+    return keys
@@ -0,0 +1,325 @@
+"""Request tracing, in the OpenTelemetry data model.
+
+One trace per request: a server span for the route, and under it a span for every
+upstream call (Digital Twin fetches carry their fetcher id and row count), every SQL
+statement and every cache lookup. With the spans of one slow ``/api/overview`` laid
+out on a timeline, which of its fetches held the response up is read off rather than
+guessed.
+
+Like `metrics`, this is dependency-free: span ids, the W3C ``traceparent`` header and
+the OTLP/JSON span shape are the whole of what is needed to interoperate. An incoming
+``traceparent`` continues the caller's trace; `inject` adds one to the headers of an
+outbound call, naming the span that made it.
+
+Spans are recorded only when an exporter is configured (``TRACING_EXPORTER``), and
+database and cache spans only inside a trace that is already being recorded, so with
+tracing off each instrumentation point costs one context variable read. A finished
+span is only appended to a buffer on the way out of a request; the console and file
+exporters serialise and write it from a thread of their own.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator, Protocol
+
+from celine.webapp.metrics import Counter
+
+TRACEPARENT = "traceparent"
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+_current_span: ContextVar["Span | None"] = ContextVar("current_span", default=None)
+
+
+def _new_id(nbytes: int) -> str:
+    return os.urandom(nbytes).hex()
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None = None
+    kind: str = "INTERNAL"
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: int | None = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_error(self, message: str) -> None:
+        self.error = message
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_otlp(self) -> dict[str, Any]:
+        """This span as one element of OTLP/JSON ``scopeSpans[].spans``."""
+        otlp: dict[str, Any] = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": f"SPAN_KIND_{self.kind}",
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)}
+                for key, value in self.attributes.items()
+            ],
+            "status": (
+                {"code": "STATUS_CODE_ERROR", "message": self.error}
+                if self.error is not None
+                else {"code": "STATUS_CODE_UNSET"}
+            ),
+        }
+        if self.parent_id is not None:
+            otlp["parentSpanId"] = self.parent_id
+        return otlp
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class _NoopSpan:
+    """Handed out when nothing is being recorded, so callers need no branches."""
+
+    traceparent = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def record_error(self, message: str) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+# ─── Exporters ───────────────────────────────────────────────────────────────
+
+
+class SpanExporter(Protocol):
+    def export(self, span: Span) -> None: ...
+
+    def shutdown(self) -> None: ...
+
+
+# How often buffered spans are written out, and how many may wait for it: past
+# that, spans are dropped rather than held, and counted.
+FLUSH_INTERVAL = 1.0
+MAX_BUFFERED = 10_000
+
+spans_dropped = Counter(
+    "tracing_spans_dropped_total",
+    "Finished spans dropped because the exporter's buffer was full.",
+)
+
+
+class _LineExporter:
+    """One OTLP/JSON span per line, written every ``FLUSH_INTERVAL`` by a thread.
+
+    `export` runs on the event loop at the end of every span, so it only appends to
+    a buffer; serialising and writing happen on the exporter's own thread.
+    """
+
+    def __init__(self, stream) -> None:
+        self._stream = stream
+        self._buffer: list[Span] = []
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(
+            target=self._flush_forever, name="span-exporter", daemon=True
+        )
+        self._thread.start()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            if len(self._buffer) >= MAX_BUFFERED:
+                spans_dropped.inc()
+                return
+            self._buffer.append(span)
+
+    def shutdown(self) -> None:
+        self._stopping.set()
+        self._thread.join()
+        self._flush()
+        self._stream.flush()
+
+    def _flush_forever(self) -> None:
+        while not self._stopping.wait(FLUSH_INTERVAL):
+            self._flush()
+
+    def _flush(self) -> None:
+        with self._lock:
+            spans, self._buffer = self._buffer, []
+        if spans:
+            self._stream.write(
+                "".join(
+                    json.dumps(span.to_otlp(), separators=(",", ":")) + "\n"
+                    for span in spans
+                )
+            )
+            self._stream.flush()
+
+
+class ConsoleSpanExporter(_LineExporter):
+    def __init__(self) -> None:
+        super().__init__(sys.stderr)
+
+
+class FileSpanExporter(_LineExporter):
+    """Appends to ``path``; read it back with `read_spans`."""
+
+    def __init__(self, path: str) -> None:
+        super().__init__(open(path, "a", encoding="utf-8"))
+
+    def shutdown(self) -> None:
+        super().shutdown()
+        self._stream.close()
+
+
+class InMemorySpanExporter:
+    """Keeps finished spans in ``spans``. For tests."""
+
+    def __init__(self) -> None:
+        self.spans: list[Span] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def shutdown(self) -> None:
+        pass
+
+
+def read_spans(path: str) -> list[dict[str, Any]]:
+    """The spans a `FileSpanExporter` wrote, as OTLP/JSON dicts."""
+    with open(path, encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+# ─── Tracer ──────────────────────────────────────────────────────────────────
+
+
+class Tracer:
+    def __init__(self) -> None:
+        self.exporter: SpanExporter | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def configure(self, exporter: SpanExporter | None) -> None:
+        self.shutdown()
+        self.exporter = exporter
+
+    def shutdown(self) -> None:
+        if self.exporter is not None:
+            self.exporter.shutdown()
+            self.exporter = None
+
+    def start_span(
+        self,
+        name: str,
+        kind: str = "INTERNAL",
+        attributes: dict[str, Any] | None = None,
+        traceparent: str | None = None,
+        nested_only: bool = False,
+    ) -> Span | None:
+        """Start a span under the current one, or under ``traceparent`` if given.
+
+        Returns None when nothing is recorded: tracing is off, or ``nested_only`` is
+        set and there is no trace to nest under.
+        """
+        if self.exporter is None:
+            return None
+        parent = _current_span.get()
+        if parent is not None:
+            trace_id, parent_id = parent.trace_id, parent.span_id
+        elif nested_only:
+            return None
+        else:
+            match = _TRACEPARENT.match(traceparent or "")
+            if match:
+                trace_id, parent_id = match.groups()
+            else:
+                trace_id, parent_id = _new_id(16), None
+        return Span(
+            name=name,
+            trace_id=trace_id,
+            span_id=_new_id(8),
+            parent_id=parent_id,
+            kind=kind,
+            attributes=dict(attributes or {}),
+        )
+
+    def end_span(self, span: Span) -> None:
+        span.end_ns = time.time_ns()
+        if self.exporter is not None:
+            self.exporter.export(span)
+
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        kind: str = "INTERNAL",
+        attributes: dict[str, Any] | None = None,
+        traceparent: str | None = None,
+        nested_only: bool = False,
+    ) -> Iterator[Span | _NoopSpan]:
+        """Record the enclosed block as a span, current for its duration."""
+        span = self.start_span(name, kind, attributes, traceparent, nested_only)
+        if span is None:
+            yield NOOP_SPAN
+            return
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.record_error(f"{type(exc).__name__}: {exc}")
+            raise
+        finally:
+            _current_span.reset(token)
+            self.end_span(span)
+
+
+tracer = Tracer()
+
+
+def current_span() -> Span | None:
+    return _current_span.get()
+
+
+def inject(headers: dict[str, str]) -> dict[str, str]:
+    """Add the current span's ``traceparent`` to outbound ``headers``; returns them."""
+    span = _current_span.get()
+    if span is not None:
+        headers[TRACEPARENT] = span.traceparent
+    return headers
+
+
+def exporter_from_settings(mode: str, path: str) -> SpanExporter | None:
+    if mode == "console":
+        return ConsoleSpanExporter()
+    if mode == "file":
+        return FileSpanExporter(path)
+    return None
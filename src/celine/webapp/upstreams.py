@@ -0,0 +1,143 @@
+"""Latency and error metrics for every call this service makes upstream.
+
+Two ways in:
+
+* The four `celine-sdk` clients are wrapped by `InstrumentedClient` where the
+  dependencies in `api/deps.py` hand them to routes, so route code calls them exactly
+  as before. Every coroutine method is timed; DT ``fetch_values`` calls are also
+  timed per fetcher id, the unit the dashboard actually waits on.
+* Direct HTTP calls (the dataspace, the nudging ingest) wrap themselves in
+  `observe_upstream`.
+
+A call counts as an error when it raises, or when it is marked with a 5xx status. A
+4xx is the upstream answering, not failing, and is not counted.
+
+Each call is also a client span when tracing is on (see `tracing`). A direct HTTP call
+passes its headers through `tracing.inject` inside the block, so the upstream continues
+the trace; the SDK clients build their own HTTP clients and do not carry it.
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from celine.webapp.metrics import Counter, Histogram
+from celine.webapp.tracing import NOOP_SPAN, tracer
+
+upstream_seconds = Histogram(
+    "upstream_request_seconds",
+    "Latency of calls to upstream services.",
+    ("upstream", "operation"),
+)
+upstream_errors = Counter(
+    "upstream_errors_total",
+    "Upstream calls that raised or answered 5xx.",
+    ("upstream", "operation"),
+)
+fetcher_seconds = Histogram(
+    "dt_fetcher_seconds",
+    "Latency of Digital Twin value fetches, by fetcher id.",
+    ("fetcher_id",),
+)
+fetcher_errors = Counter(
+    "dt_fetcher_errors_total",
+    "Digital Twin value fetches that failed, by fetcher id.",
+    ("fetcher_id",),
+)
+
+
+class UpstreamCall:
+    """Handed out by `observe_upstream`; set ``status`` to classify the answer."""
+
+    __slots__ = ("status", "span")
+
+    def __init__(self, span: Any = NOOP_SPAN) -> None:
+        self.status: int | None = None
+        self.span = span
+
+
+@contextmanager
+def observe_upstream(upstream: str, operation: str) -> Iterator[UpstreamCall]:
+    """Time the enclosed upstream call and count it as an error if it fails."""
+    started = time.perf_counter()
+    failed = True
+    with tracer.span(
+        f"{upstream} {operation}",
+        kind="CLIENT",
+        attributes={"celine.upstream": upstream, "celine.operation": operation},
+    ) as span:
+        call = UpstreamCall(span)
+        try:
+            yield call
+            failed = call.status is not None and call.status >= 500
+        finally:
+            upstream_seconds.observe(
+                time.perf_counter() - started, upstream=upstream, operation=operation
+            )
+            if call.status is not None:
+                span.set_attribute("http.response.status_code", call.status)
+            if failed:
+                upstream_errors.inc(upstream=upstream, operation=operation)
+                if call.status is not None:
+                    span.record_error(f"HTTP {call.status}")
+
+
+class InstrumentedClient:
+    """A transparent proxy timing every coroutine method of an SDK client.
+
+    ``children`` names attributes that are themselves clients — ``dt.participants``
+    and ``dt.communities`` — and are wrapped in turn, their methods reported as
+    ``participants.fetch_values`` and so on.
+    """
+
+    def __init__(
+        self,
+        target: Any,
+        upstream: str,
+        children: tuple[str, ...] = (),
+        prefix: str = "",
+    ) -> None:
+        self._target = target
+        self._upstream = upstream
+        self._children = children
+        self._prefix = prefix
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._target, name)
+        if name in self._children:
+            return InstrumentedClient(attr, self._upstream, prefix=f"{self._prefix}{name}.")
+        if inspect.iscoroutinefunction(attr):
+            return self._wrap(attr, f"{self._prefix}{name}")
+        return attr
+
+    def _wrap(self, method: Any, operation: str) -> Any:
+        upstream = self._upstream
+
+        @functools.wraps(method)
+        async def timed(*args: Any, **kwargs: Any) -> Any:
+            fetcher_id = kwargs.get("fetcher_id") if operation.endswith("fetch_values") else None
+            started = time.perf_counter()
+            try:
+                with observe_upstream(upstream, operation) as call:
+                    if fetcher_id:
+                        call.span.set_attribute("celine.dt.fetcher_id", fetcher_id)
+                    result = await method(*args, **kwargs)
+                    rows = getattr(result, "count", None) if fetcher_id else None
+                    if isinstance(rows, int):
+                        call.span.set_attribute("celine.dt.row_count", rows)
+                    return result
+            except Exception:
+                if fetcher_id:
+                    fetcher_errors.inc(fetcher_id=fetcher_id)
+                raise
+            finally:
+                if fetcher_id:
+                    fetcher_seconds.observe(
+                        time.perf_counter() - started, fetcher_id=fetcher_id
+                    )
+
+        return timed
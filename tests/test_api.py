@@ -177,6 +177,132 @@ def test_overview_window_rejects_ranges_longer_than_one_year():
     assert exc.value.status_code == 400
 
 
+def test_overview_counts_days_in_the_members_zone(
+    client: TestClient, auth_headers: dict, fake_dt
+):
+    """Test a row late in the UTC evening lands on the next day in Rome."""
+    from zoneinfo import ZoneInfo
+
+    rome = ZoneInfo("Europe/Rome")
+    end = datetime.now(rome).date() - timedelta(days=10)
+    start = end - timedelta(days=1)
+    # 23:30 UTC is past midnight in Rome all year round.
+    fake_dt.participants.values["meters_data"] = [
+        {"ts": f"{start.isoformat()}T23:30:00", "consumption_kwh": 1.0, "production_kwh": 0.0}
+    ]
+
+    response = client.get(
+        "/api/overview",
+        params={"start_date": start.isoformat(), "end_date": end.isoformat(), "tz": "Europe/Rome"},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 200
+    assert [(d["date"], d["consumption_kwh"]) for d in response.json()["user_trend"]] == [
+        (start.isoformat(), None),
+        (end.isoformat(), 1.0),
+    ]
+    [meters] = [c for c in fake_dt.participants.calls if c.get("fetcher_id") == "meters_data"]
+    local_midnight = datetime.combine(start, datetime.min.time(), tzinfo=rome)
+    assert meters["payload"]["start"] == local_midnight.astimezone(timezone.utc).isoformat()
+
+
+def test_overview_keeps_daily_rec_rows_on_their_own_date(
+    client: TestClient, auth_headers: dict, fake_dt
+):
+    """Test rows already per UTC day are not moved a day back west of UTC."""
+    from zoneinfo import ZoneInfo
+
+    new_york = ZoneInfo("America/New_York")
+    end = datetime.now(new_york).date() - timedelta(days=10)
+    start = end - timedelta(days=39)
+    fake_dt.communities.values["rec_self_consumption_daily"] = [
+        {
+            "ts": f"{day.isoformat()}T00:00:00",
+            "total_consumption_kwh": 10.0,
+            "total_production_kwh": 4.0,
+            "self_consumption_kwh": 2.0,
+        }
+        for day in (start, end)
+    ]
+
+    response = client.get(
+        "/api/overview",
+        params={
+            "start_date": start.isoformat(),
+            "end_date": end.isoformat(),
+            "tz": "America/New_York",
+        },
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 200
+    trend = response.json()["trend"]
+    assert len(trend) == 40
+    assert (trend[0]["date"], trend[0]["consumption_kwh"]) == (start.isoformat(), 10.0)
+    assert (trend[-1]["date"], trend[-1]["consumption_kwh"]) == (end.isoformat(), 10.0)
+    [call] = fake_dt.communities.calls
+    assert call["payload"] == {
+        "start": f"{start.isoformat()}T00:00:00+00:00",
+        "end": f"{(end + timedelta(days=1)).isoformat()}T00:00:00+00:00",
+    }
+
+
+def test_overview_falls_back_to_the_community_zone(
+    client: TestClient, auth_headers: dict, fake_dt, monkeypatch
+):
+    """Test the configured zone of the member's community applies when none is sent."""
+    from zoneinfo import ZoneInfo
+
+    from celine.webapp.settings import settings
+
+    monkeypatch.setattr(settings, "community_timezones", {"community-1": "Asia/Kolkata"})
+    day = datetime.now(timezone.utc).date() - timedelta(days=3)
+
+    response = client.get(
+        "/api/overview",
+        params={"start_date": day.isoformat(), "end_date": day.isoformat()},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 200
+    [meters] = [c for c in fake_dt.participants.calls if c.get("fetcher_id") == "meters_data"]
+    kolkata = ZoneInfo("Asia/Kolkata")
+    local_midnight = datetime.combine(day, datetime.min.time(), tzinfo=kolkata)
+    assert meters["payload"]["start"] == local_midnight.astimezone(timezone.utc).isoformat()
+
+
+def test_an_unknown_zone_is_rejected(client: TestClient, auth_headers: dict):
+    """Test a zone name that does not exist is a client error, not a UTC chart."""
+    headers = {**auth_headers, "X-Timezone": "Mars/Olympus_Mons"}
+
+    assert client.get("/api/overview", headers=headers).status_code == 400
+    assert client.get("/api/forecast", headers=headers).status_code == 400
+
+
+def test_forecast_window_starts_at_five_local_time(
+    client: TestClient, auth_headers: dict, fake_dt
+):
+    """Test the forecast window opens at 05:00 on the member's wall clock."""
+    from zoneinfo import ZoneInfo
+
+    rome = ZoneInfo("Europe/Rome")
+
+    response = client.get(
+        "/api/forecast", headers={**auth_headers, "X-Timezone": "Europe/Rome"}
+    )
+
+    assert response.status_code == 200
+    [call] = [
+        c for c in fake_dt.participants.calls if c.get("fetcher_id") == "total_meters_forecast"
+    ]
+    start = datetime.fromisoformat(call["payload"]["start"]).astimezone(rome)
+    end = datetime.fromisoformat(call["payload"]["end"]).astimezone(rome)
+    assert (start.hour, start.minute) == (5, 0)
+    assert start.date() == datetime.now(rome).date()
+    assert (end.hour, end.date()) == (0, start.date() + timedelta(days=1))
+
+
 def test_overview_uses_daily_rec_fetcher_only_for_large_ranges():
     """Test REC self-consumption fetcher selection keeps short ranges unchanged."""
     from celine.webapp.api.overview import _rec_self_consumption_fetcher_id
@@ -330,3 +456,18 @@ def test_ranking_info_accepts_season_period() -> None:
 
     info = RankingInfo(position=1, total_members=2, percentile=50, period="season")
     assert info.period == "season"
+
+
+def test_accepting_terms_twice_records_one_acceptance(
+    client: TestClient, auth_headers: dict
+):
+    """A second acceptance of the same version is a no-op, and `/api/me` still answers."""
+    for _ in range(2):
+        response = client.post(
+            "/api/terms/accept", headers=auth_headers, json={"accept": True}
+        )
+        assert response.status_code == 200
+
+    me_response = client.get("/api/me", headers=auth_headers)
+    assert me_response.status_code == 200
+    assert me_response.json()["terms_required"] is False
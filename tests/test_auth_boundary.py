@@ -127,3 +127,131 @@ def test_identity_comes_from_the_token_not_a_header(
     assert response.status_code == 200
     assert response.json()["user"]["sub"] == "the-real-subject"
     assert response.json()["user"]["email"] == "real@example.com"
+
+
+# ─── Verified-token cache and JWKS refresh ───────────────────────────────────
+
+
+def test_a_token_is_verified_once_across_requests(
+    client: TestClient, auth_headers: dict, monkeypatch
+) -> None:
+    """A screen fires several requests with one token; only the first verifies it."""
+    from celine.webapp.api import deps
+
+    verify = deps.JwtUser.from_token
+    calls: list[str] = []
+
+    def counting(token, oidc):
+        calls.append(token)
+        return verify(token, oidc=oidc)
+
+    monkeypatch.setattr(deps.JwtUser, "from_token", counting)
+
+    for _ in range(3):
+        assert client.get("/api/me", headers=auth_headers).status_code == 200
+
+    assert len(calls) == 1
+
+
+def test_a_rejected_token_is_rejected_every_time(client: TestClient, make_token) -> None:
+    expired = make_token(expires_in=-600)
+    for _ in range(2):
+        assert client.get("/api/me", headers={HEADER: expired}).status_code == 401
+
+
+def test_a_verified_token_is_cached_no_longer_than_it_is_valid() -> None:
+    from celine.webapp.api.deps import VERIFIED_TOKEN_TTL, _verified_lifetime
+    from celine.sdk.auth import JwtUser
+
+    now = 1_000_000.0
+    assert _verified_lifetime(JwtUser(sub="u", exp=int(now) + 20), now=now) == 20
+    assert _verified_lifetime(JwtUser(sub="u", exp=int(now) + 86400), now=now) == (
+        VERIFIED_TOKEN_TTL
+    )
+    assert _verified_lifetime(JwtUser(sub="u", exp=int(now) - 5), now=now) == 0
+
+
+async def test_the_jwks_refresher_warms_the_sdk_client(
+    monkeypatch, signing_key: rsa.RSAPrivateKey, make_token
+) -> None:
+    """The probe loads the SDK's real client, and a real token then verifies off it."""
+    from celine.sdk.auth import JwtUser
+    from celine.sdk.auth import jwt as sdk_jwt
+    from celine.webapp.services.jwks import JwksRefresher
+    from tests.conftest import TEST_KEY_ID
+
+    jwk = jwt.algorithms.RSAAlgorithm.to_jwk(signing_key.public_key(), as_dict=True)
+    jwks = {"keys": [{**jwk, "kid": TEST_KEY_ID, "alg": "RS256", "use": "sig"}]}
+    client = jwt.PyJWKClient("https://keycloak.invalid/certs", cache_jwk_set=True)
+    fetches: list[int] = []
+
+    def fetch_data():
+        fetches.append(1)
+        client.jwk_set_cache.put(jwks)
+        return jwks
+
+    monkeypatch.setattr(client, "fetch_data", fetch_data)
+    monkeypatch.setattr(sdk_jwt, "_get_jwks_client", lambda uri: client)
+
+    refresher = JwksRefresher()
+    assert await refresher.refresh() is True
+    assert refresher.loaded is True
+    assert fetches
+
+    fetched = len(fetches)
+    user = JwtUser.from_token(make_token(), oidc=app_settings.oidc)
+    assert user.sub == "test-user-123"
+    assert len(fetches) == fetched
+
+    def unreachable():
+        raise jwt.PyJWKClientConnectionError("keycloak is down")
+
+    down = jwt.PyJWKClient("https://keycloak.invalid/certs", cache_jwk_set=True)
+    monkeypatch.setattr(down, "fetch_data", unreachable)
+    monkeypatch.setattr(sdk_jwt, "_get_jwks_client", lambda uri: down)
+    assert await JwksRefresher().refresh() is False
+
+
+# ─── Request-scoped auth context ─────────────────────────────────────────────
+
+
+def test_the_token_is_read_once_per_request(
+    client: TestClient, auth_headers: dict, monkeypatch
+) -> None:
+    """`/api/community` needs the token twice: for the user, and for the registry."""
+    from celine.webapp.api import deps
+
+    extract = deps._extract_token
+    calls: list[str] = []
+
+    def counting(request):
+        calls.append(request.url.path)
+        return extract(request)
+
+    monkeypatch.setattr(deps, "_extract_token", counting)
+    # No registry configured, so the route answers without leaving the process.
+    monkeypatch.setattr(app_settings, "rec_registry_url", None)
+
+    assert client.get("/api/community", headers=auth_headers).status_code == 200
+    assert calls == ["/api/community"]
+
+
+def test_auth_failures_are_logged_at_most_once_per_interval(caplog) -> None:
+    import logging
+
+    from celine.webapp.logsampling import RateLimitedLogger
+
+    limited = RateLimitedLogger(logging.getLogger("test.auth"), interval=60.0)
+    with caplog.at_level(logging.WARNING, logger="test.auth"):
+        for _ in range(5):
+            limited.warning("missing", "Missing auth headers on %s", "/api/me")
+        limited.warning("expired", "Rejected token: %s", "expired")
+
+        limited._last["missing"] -= 61  # the interval has passed
+        limited.warning("missing", "Missing auth headers on %s", "/api/me")
+
+    assert [record.getMessage() for record in caplog.records] == [
+        "Missing auth headers on /api/me",
+        "Rejected token: expired",
+        "Missing auth headers on /api/me (4 similar suppressed since the last)",
+    ]
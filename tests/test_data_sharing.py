@@ -15,6 +15,8 @@ Two properties the tests below pin, because both are easy to lose:
 
 from __future__ import annotations
 
+import time
+
 import pytest
 from fastapi.testclient import TestClient
 
@@ -103,8 +105,10 @@ def stub_service(monkeypatch):
         calls.append((credential.subject_id, offer_id, enabled))
         return {}
 
-    async def _history(credential):
-        return [{"event_type": "ConsentGranted", "offer_id": "household-energy-flexibility"}]
+    async def _history(credential, *, cursor=None, limit=50):
+        return service.HistoryPage(
+            events=[{"event_type": "ConsentGranted", "offer_id": "household-energy-flexibility"}]
+        )
 
     monkeypatch.setattr(service, "resolve_subject", _resolve)
     monkeypatch.setattr(service, "list_offers", _offers)
@@ -213,6 +217,135 @@ class TestReadDecisions:
         assert client.get("/api/data-sharing", headers=auth_headers).status_code == 503
 
 
+    def test_offers_and_decisions_are_read_together(
+        self, client: TestClient, auth_headers: dict, enabled, stub_service, monkeypatch
+    ):
+        """Each waits for the other to have started, so run one after the other they
+        would time out."""
+        import asyncio
+
+        started = {"offers": asyncio.Event(), "decisions": asyncio.Event()}
+
+        async def _meet(mine: str, theirs: str):
+            started[mine].set()
+            await asyncio.wait_for(started[theirs].wait(), timeout=1)
+
+        async def _offers():
+            await _meet("offers", "decisions")
+            return list(OFFERS)
+
+        async def _decisions(credential):
+            await _meet("decisions", "offers")
+            return []
+
+        monkeypatch.setattr(service, "list_offers", _offers)
+        monkeypatch.setattr(service, "list_decisions", _decisions)
+
+        response = client.get("/api/data-sharing", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert len(response.json()["offers"]) == 2
+
+
+# ── the offers vocabulary ─────────────────────────────────────────────────────
+
+
+class TestOffersVocabulary:
+    """Public and the same for every member, so one copy is shared — but never one
+    the vocabulary could no longer vouch for."""
+
+    async def test_is_revalidated_rather_than_refetched(self, enabled, monkeypatch):
+        import httpx
+
+        seen: list[dict] = []
+
+        def handler(request):
+            seen.append(dict(request.headers))
+            if request.headers.get("if-none-match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, json=OFFERS, headers={"ETag": '"v1"'})
+
+        monkeypatch.setattr(service, "OFFERS_MAX_AGE", 0)
+        _serve(monkeypatch, httpx, handler)
+
+        assert await service.list_offers() == OFFERS
+        assert await service.list_offers() == OFFERS
+        assert "if-none-match" not in seen[0]
+        assert seen[1]["if-none-match"] == '"v1"'
+
+    async def test_a_fresh_copy_is_used_without_asking(self, enabled, monkeypatch):
+        import httpx
+
+        seen: list = []
+
+        def handler(request):
+            seen.append(request)
+            return httpx.Response(200, json=OFFERS, headers={"Cache-Control": "max-age=300"})
+
+        _serve(monkeypatch, httpx, handler)
+
+        await service.list_offers()
+        await service.list_offers()
+
+        assert len(seen) == 1
+
+    async def test_is_not_served_stale_when_it_cannot_be_revalidated(
+        self, enabled, monkeypatch
+    ):
+        import httpx
+
+        responses = [httpx.Response(200, json=OFFERS, headers={"ETag": '"v1"'})]
+
+        def handler(request):
+            if responses:
+                return responses.pop()
+            raise httpx.ConnectError("vocabulary down")
+
+        monkeypatch.setattr(service, "OFFERS_MAX_AGE", 0)
+        _serve(monkeypatch, httpx, handler)
+
+        await service.list_offers()
+        with pytest.raises(service.DataSharingUnavailable):
+            await service.list_offers()
+
+
+# ── connections ───────────────────────────────────────────────────────────────
+
+
+class TestConnections:
+    async def test_calls_to_one_service_share_its_pool(self, enabled, monkeypatch):
+        """A client per call paid a TLS handshake each time; one per service keeps
+        connections alive between them."""
+        import httpx
+
+        timeouts: dict[str, float] = {}
+
+        def handler(request):
+            timeouts[request.method] = request.extensions["timeout"]["read"]
+            return httpx.Response(200, json=[])
+
+        _serve(monkeypatch, httpx, handler)
+
+        await service.list_decisions(CREDENTIAL)
+        connector = service.dataspace_clients.get("connector")
+        await service.set_decision(CREDENTIAL, "household-energy-flexibility", enabled=False)
+
+        assert service.dataspace_clients.get("connector") is connector
+        assert service.dataspace_clients.get("provenance") is not connector
+        assert timeouts == {"GET": 15.0, "POST": 15.0}
+
+    async def test_stopping_closes_every_pool(self, enabled, monkeypatch):
+        import httpx
+
+        _serve(monkeypatch, httpx, lambda request: httpx.Response(200, json=OFFERS))
+        await service.list_offers()
+        ns = service.dataspace_clients.get("dataspace_ns")
+
+        await service.dataspace_clients.stop()
+
+        assert ns.is_closed
+
+
 # ── changing them ─────────────────────────────────────────────────────────────
 
 
@@ -241,6 +374,50 @@ class TestChangeDecisions:
 
         assert stub_service[0][2] is True
 
+    def test_the_answer_is_built_from_the_change(
+        self, client: TestClient, auth_headers: dict, enabled, stub_service, monkeypatch
+    ):
+        """One resolve and one change: the connector's answer lists the member's
+        decisions, and the offers are the shared copy."""
+        resolved: list[str] = []
+
+        async def _resolve(email):
+            resolved.append(email)
+            return CREDENTIAL
+
+        async def _set(credential, offer_id, *, enabled):
+            return {"items": [{"offer_id": offer_id, "status": "withdrawn"}]}
+
+        async def _no_reread(credential):
+            raise AssertionError("decisions were read again")
+
+        monkeypatch.setattr(service, "resolve_subject", _resolve)
+        monkeypatch.setattr(service, "set_decision", _set)
+        monkeypatch.setattr(service, "list_decisions", _no_reread)
+
+        response = client.post(
+            "/api/data-sharing/household-energy-flexibility",
+            json={"enabled": False},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 200
+        assert resolved == ["test@example.com"]
+        assert not any(o["granted"] for o in response.json()["offers"])
+
+    def test_a_change_answered_with_one_record_reads_the_rest(
+        self, client: TestClient, auth_headers: dict, enabled, stub_service
+    ):
+        """The stub connector answers `{}`; the other decisions still show."""
+        response = client.post(
+            "/api/data-sharing/grid-operations-planning",
+            json={"enabled": False},
+            headers=auth_headers,
+        )
+
+        by_id = {o["id"]: o for o in response.json()["offers"]}
+        assert by_id["household-energy-flexibility"]["granted"] is True
+
     def test_a_contract_offer_cannot_be_toggled(
         self, client: TestClient, auth_headers: dict, enabled, stub_service, monkeypatch
     ):
@@ -295,8 +472,8 @@ class TestHistory:
         """The decisions stand without it; failing here would make the whole
         surface unusable for a detail."""
 
-        async def _empty(credential):
-            return []
+        async def _empty(credential, *, cursor=None, limit=50):
+            return service.HistoryPage(events=[])
 
         monkeypatch.setattr(service, "list_history", _empty)
 
@@ -306,6 +483,88 @@ class TestHistory:
         assert response.json()["events"] == []
 
 
+    async def test_pages_are_passed_through_to_provenance(self, enabled, monkeypatch):
+        import httpx
+
+        asked: list[dict] = []
+
+        def handler(request):
+            asked.append(dict(request.url.params))
+            if request.url.params.get("cursor") == "abc":
+                return httpx.Response(200, json={"@graph": [{"n": 3}]})
+            return httpx.Response(
+                200, json={"@context": {}, "@graph": [{"n": 1}, {"n": 2}], "next_cursor": "abc"}
+            )
+
+        monkeypatch.setattr(settings, "ds_provenance_url", "http://prov:30000")
+        _serve(monkeypatch, httpx, handler)
+
+        first = await service.list_history(CREDENTIAL, limit=2)
+        last = await service.list_history(CREDENTIAL, cursor=first.next_cursor, limit=2)
+
+        assert [e["n"] for e in first.events + last.events] == [1, 2, 3]
+        assert last.next_cursor is None
+        assert asked == [{"limit": "2"}, {"limit": "2", "cursor": "abc"}]
+
+    async def test_a_provenance_that_ignores_pages_is_read_a_page_at_a_time(
+        self, enabled, monkeypatch
+    ):
+        """Everything comes back every time; each page reads only as far as it needs."""
+        import httpx
+
+        monkeypatch.setattr(settings, "ds_provenance_url", "http://prov:30000")
+        _serve(
+            monkeypatch,
+            httpx,
+            lambda request: httpx.Response(200, json=[{"n": n} for n in range(5)]),
+        )
+
+        pages, cursor = [], None
+        while True:
+            page = await service.list_history(CREDENTIAL, cursor=cursor, limit=2)
+            pages.append([e["n"] for e in page.events])
+            if page.next_cursor is None:
+                break
+            cursor = page.next_cursor
+
+        assert pages == [[0, 1], [2, 3], [4]]
+
+    def test_the_whole_history_can_be_streamed(
+        self, client: TestClient, enabled, stub_service, monkeypatch
+    ):
+        import httpx
+
+        def handler(request):
+            if request.url.params.get("cursor") == "abc":
+                return httpx.Response(200, json={"@graph": [{"n": 3}]})
+            return httpx.Response(200, json={"@graph": [{"n": 1}, {"n": 2}], "next": "abc"})
+
+        monkeypatch.setattr(settings, "ds_provenance_url", "http://prov:30000")
+        _serve(monkeypatch, httpx, handler)
+
+        response = client.get(
+            "/api/data-sharing/history", headers={"Accept": "application/x-ndjson"}
+        )
+
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert response.text.splitlines() == ['{"n": 1}', '{"n": 2}', '{"n": 3}']
+
+    @pytest.mark.parametrize("accept", ["application/json", "application/x-ndjson"])
+    def test_an_unknown_cursor_is_a_400(
+        self, client: TestClient, enabled, stub_service, monkeypatch, accept: str
+    ):
+        monkeypatch.setattr(service, "list_history", _real_list_history)
+
+        response = client.get(
+            "/api/data-sharing/history", params={"cursor": "x:1"}, headers={"Accept": accept}
+        )
+
+        assert response.status_code == 400
+
+
+_real_list_history = service.list_history
+
+
 # ── credential selection ──────────────────────────────────────────────────────
 
 
@@ -351,25 +610,113 @@ class TestCredentialSelection:
             await service.resolve_subject("a@example.com")
 
 
+class TestCredentialResolution:
+    """One round trip per resolution, and never a credential kept past one."""
+
+    PAYLOAD = {
+        "did": "did:web:users.example:email-abc",
+        "credentials": [{"role": "DataSubject", "vc_jws": "subject-jws"}],
+    }
+
+    @pytest.fixture
+    def registry(self, monkeypatch):
+        import asyncio
+
+        import httpx
+
+        seen: dict = {"resolve": [], "tokens": 0, "expires_in": 300}
+
+        class _Provider:
+            async def get_token(self):
+                seen["tokens"] += 1
+                return _Token(f"svc-token-{seen['tokens']}", seen["expires_in"])
+
+        async def handler(request):
+            seen["resolve"].append(request.url.params["email"])
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, json=self.PAYLOAD)
+
+        monkeypatch.setattr(settings, "identity_registry_url", "http://ir:30005")
+        monkeypatch.setattr(service, "_resolve_token_provider", lambda: _Provider())
+        _serve(monkeypatch, httpx, handler)
+        return seen
+
+    async def test_concurrent_resolutions_of_one_email_share_a_call(self, registry):
+        import asyncio
+
+        credentials = await asyncio.gather(
+            service.resolve_subject("a@example.com"),
+            service.resolve_subject("a@example.com"),
+            service.resolve_subject("b@example.com"),
+        )
+
+        assert sorted(registry["resolve"]) == ["a@example.com", "b@example.com"]
+        assert credentials[0] == credentials[1]
+        assert registry["tokens"] == 1
+
+    async def test_a_credential_is_not_kept_once_resolved(self, registry):
+        await service.resolve_subject("a@example.com")
+        await service.resolve_subject("a@example.com")
+
+        assert registry["resolve"] == ["a@example.com", "a@example.com"]
+        assert registry["tokens"] == 1
+
+    async def test_the_service_token_is_renewed_before_it_expires(self, registry):
+        import asyncio
+
+        registry["expires_in"] = service.TOKEN_RENEW_WINDOW - 1
+        await service.resolve_subject("a@example.com")
+
+        registry["expires_in"] = 300
+        await service.resolve_subject("a@example.com")
+        await asyncio.sleep(0)
+
+        assert registry["tokens"] == 2
+        assert service._service_token.get("resolve").access_token == "svc-token-2"
+
+    async def test_a_miss_joining_a_failed_renewal_is_unavailable(
+        self, registry, monkeypatch
+    ):
+        import asyncio
+
+        registry["expires_in"] = service.TOKEN_RENEW_WINDOW - 1
+        await service.resolve_subject("a@example.com")
+
+        class _Down:
+            async def get_token(self):
+                await asyncio.sleep(0.01)
+                raise RuntimeError("keycloak is down")
+
+        monkeypatch.setattr(service, "_resolve_token_provider", lambda: _Down())
+        await service.resolve_subject("a@example.com")
+        service._service_token.pop("resolve")
+
+        with pytest.raises(service.DataSharingUnavailable):
+            await service.resolve_subject("a@example.com")
+
+
+class _Token:
+    def __init__(self, access_token: str, expires_in: float) -> None:
+        self.access_token = access_token
+        self.expires_at = time.time() + expires_in
+
+
 def _patch_resolve(monkeypatch, httpx, payload):
     """Serve one canned /users/resolve response, with a stubbed service token."""
 
     class _Token:
         access_token = "svc-token"
+        expires_at = time.time() + 300
 
     class _Provider:
         async def get_token(self):
             return _Token()
 
     monkeypatch.setattr(service, "_resolve_token_provider", lambda: _Provider())
+    _serve(monkeypatch, httpx, lambda request: httpx.Response(200, json=payload))
 
-    transport = httpx.MockTransport(
-        lambda request: httpx.Response(200, json=payload)
-    )
-    original = httpx.AsyncClient
-
-    def factory(**kwargs):
-        kwargs.pop("transport", None)
-        return original(transport=transport, **kwargs)
 
-    monkeypatch.setattr(httpx, "AsyncClient", factory)
+def _serve(monkeypatch, httpx, handler):
+    """Answer every request the service makes with ``handler``."""
+    monkeypatch.setattr(service.dataspace_clients, "_transport", httpx.MockTransport(handler))
+    monkeypatch.setattr(service.dataspace_clients, "_clients", {})
@@ -0,0 +1,785 @@
+"""Feedback, and where its screenshots are kept.
+
+Screenshots live in their own content-addressed store (`db/screenshots.py`), split
+into chunks, and a feedback row only references one. These tests pin that the bytes
+come back exactly as sent, that identical images are stored once, and that the
+export reads images only when asked to.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import io
+import json
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
+
+import pytest
+from sqlalchemy import event, func, select
+from sqlalchemy.exc import OperationalError
+from typer.testing import CliRunner
+
+from celine.webapp import cli, thumbnails
+from celine.webapp.db import (
+    Base,
+    FeedbackEntry,
+    FeedbackScreenshot,
+    FeedbackScreenshotChunk,
+)
+from celine.webapp.db import screenshots
+from celine.webapp.db.screenshots import ScreenshotWriter, read_screenshot, store_screenshot
+from celine.webapp.services.feedback_queue import FeedbackQueue, feedback_queue, feedback_rows
+from celine.webapp.settings import settings
+
+IMAGE = bytes(range(256)) * 40
+
+
+def _body(image: bytes | None = IMAGE, **overrides) -> dict:
+    body = {
+        "rating": 4,
+        "comment": "  The chart is upside down  ",
+        "context": {"page_url": "https://app.example/overview", "page_path": "/overview"},
+    }
+    if image is not None:
+        body["screenshot"] = {
+            "mime_type": "image/png",
+            "data_base64": base64.b64encode(image).decode(),
+        }
+    return body | overrides
+
+
+def _run(db_sessionmaker, query):
+    async def run():
+        async with db_sessionmaker() as db:
+            return (await db.execute(query)).all()
+
+    return asyncio.run(run())
+
+
+def _read(db_sessionmaker, screenshot_id) -> bytes:
+    async def run():
+        async with db_sessionmaker() as db:
+            return b"".join([chunk async for chunk in read_screenshot(db, screenshot_id)])
+
+    return asyncio.run(run())
+
+
+@pytest.fixture
+def client(client, monkeypatch: pytest.MonkeyPatch):
+    """The app's client, whose POSTs return once the feedback they queued is written."""
+    post = client.post
+
+    def post_and_flush(*args, **kwargs):
+        response = post(*args, **kwargs)
+        client.portal.call(feedback_queue.flush)
+        return response
+
+    monkeypatch.setattr(client, "post", post_and_flush)
+    return client
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Chunks small enough that the test image spans several, with a partial last one."""
+    monkeypatch.setattr(screenshots, "CHUNK_SIZE", 3000)
+
+
+def test_a_screenshot_is_stored_apart_and_comes_back_intact(
+    client, auth_headers, db_sessionmaker
+) -> None:
+    response = client.post("/api/feedback", json=_body(), headers=auth_headers)
+
+    assert response.status_code == 201
+    [(entry,)] = _run(db_sessionmaker, select(FeedbackEntry))
+    assert str(entry.id) == response.json()["id"]
+    assert entry.comment == "The chart is upside down"
+    assert entry.screenshot_mime_type == "image/png"
+
+    [(stored,)] = _run(db_sessionmaker, select(FeedbackScreenshot))
+    assert entry.screenshot_id == stored.id
+    assert stored.size == len(IMAGE)
+    assert stored.chunk_count == 4
+    assert _read(db_sessionmaker, entry.screenshot_id) == IMAGE
+
+
+def test_the_same_image_is_stored_once(client, auth_headers, db_sessionmaker) -> None:
+    for _ in range(2):
+        assert client.post("/api/feedback", json=_body(), headers=auth_headers).status_code == 201
+    other = IMAGE[::-1]
+    assert client.post("/api/feedback", json=_body(other), headers=auth_headers).status_code == 201
+
+    entries = [row for (row,) in _run(db_sessionmaker, select(FeedbackEntry))]
+    [(screenshots_stored,)] = _run(
+        db_sessionmaker, select(func.count()).select_from(FeedbackScreenshot)
+    )
+    assert screenshots_stored == 2
+    assert len({entry.screenshot_id for entry in entries}) == 2
+    assert sorted(_read(db_sessionmaker, e.screenshot_id) for e in entries) == sorted(
+        [IMAGE, IMAGE, other]
+    )
+
+
+def test_feedback_without_a_screenshot_references_none(
+    client, auth_headers, db_sessionmaker
+) -> None:
+    assert client.post("/api/feedback", json=_body(None), headers=auth_headers).status_code == 201
+
+    [(entry,)] = _run(db_sessionmaker, select(FeedbackEntry))
+    assert entry.screenshot_id is None
+    assert _run(db_sessionmaker, select(FeedbackScreenshot)) == []
+
+
+def test_an_invalid_screenshot_is_rejected(client, auth_headers, db_sessionmaker) -> None:
+    body = _body()
+    body["screenshot"]["data_base64"] = "not base64!"
+
+    response = client.post("/api/feedback", json=body, headers=auth_headers)
+
+    assert response.status_code == 400
+    assert _run(db_sessionmaker, select(FeedbackScreenshotChunk)) == []
+
+
+async def test_a_writer_that_meets_a_stored_image_drops_its_chunks(db_sessionmaker) -> None:
+    engine = db_sessionmaker.kw["bind"]
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with db_sessionmaker() as db:
+        first = await store_screenshot(db, IMAGE)
+        await db.commit()
+    async with db_sessionmaker() as db:
+        writer = ScreenshotWriter(db)
+        for start in range(0, len(IMAGE), 1000):
+            await writer.write(IMAGE[start : start + 1000])
+        second = await writer.finish()
+        await db.commit()
+    async with db_sessionmaker() as db:
+        chunks = await db.scalar(select(func.count()).select_from(FeedbackScreenshotChunk))
+    await engine.dispose()
+
+    assert first == second
+    assert chunks == 4
+
+
+async def test_a_screenshot_is_read_in_one_query(db_sessionmaker) -> None:
+    engine = db_sessionmaker.kw["bind"]
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with db_sessionmaker() as db:
+        screenshot_id = await store_screenshot(db, IMAGE)
+        await db.commit()
+
+    queries = []
+    event.listen(
+        engine.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: queries.append(statement),
+    )
+    async with db_sessionmaker() as db:
+        chunks = [chunk async for chunk in read_screenshot(db, screenshot_id)]
+    await engine.dispose()
+
+    assert b"".join(chunks) == IMAGE
+    assert len(chunks) == 4
+    assert len([q for q in queries if "feedback_screenshot_chunks" in q]) == 1
+
+
+@pytest.mark.parametrize("with_screenshots", [True, False])
+def test_export_reads_screenshots_only_when_asked(
+    client, auth_headers, db_sessionmaker, monkeypatch, tmp_path, with_screenshots
+) -> None:
+    client.post("/api/feedback", json=_body(), headers=auth_headers)
+    client.post("/api/feedback", json=_body(None, rating=2), headers=auth_headers)
+
+    reads = []
+
+    async def counting_read(db, screenshot_id):
+        reads.append(screenshot_id)
+        async for chunk in read_screenshot(db, screenshot_id):
+            yield chunk
+
+    @asynccontextmanager
+    async def db_context():
+        async with db_sessionmaker() as db:
+            yield db
+
+    monkeypatch.setattr(cli, "get_db_context", db_context)
+    monkeypatch.setattr(cli, "read_screenshot", counting_read)
+    output = tmp_path / "feedback.zip"
+
+    assert asyncio.run(cli._export_feedback(output, screenshots=with_screenshots)) == 2
+
+    with ZipFile(output) as archive:
+        manifest = json.loads(archive.read("manifest.json"))
+        [with_image] = [item for item in manifest["items"] if item["rating"] == 4]
+        metadata = json.loads(archive.read(f"{with_image['folder']}/metadata.json"))
+        assert metadata["has_screenshot"] is True
+        if with_screenshots:
+            assert with_image["screenshot"] == "screenshot.png"
+            assert archive.read(f"{with_image['folder']}/screenshot.png") == IMAGE
+        else:
+            assert with_image["screenshot"] is None
+    assert len(reads) == (1 if with_screenshots else 0)
+
+
+# ─── Export ──────────────────────────────────────────────────────────────────
+
+
+@pytest.fixture
+async def sessionmaker(db_sessionmaker, monkeypatch):
+    """The test database with its schema, wired in as the export's database."""
+    engine = db_sessionmaker.kw["bind"]
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    @asynccontextmanager
+    async def db_context():
+        async with db_sessionmaker() as db:
+            yield db
+
+    monkeypatch.setattr(cli, "get_db_context", db_context)
+    yield db_sessionmaker
+    await engine.dispose()
+
+
+async def _add(sessionmaker, *hours: int, image: bytes | None = None) -> list[FeedbackEntry]:
+    """Feedback created at each of ``hours`` on 1 October 2026."""
+    async with sessionmaker() as db:
+        screenshot_id = await store_screenshot(db, image) if image else None
+        entries = [
+            FeedbackEntry(
+                user_id="test-user-123",
+                rating=hour % 6,
+                comment=f"at {hour}",
+                page_url="https://app.example/overview",
+                created_at=datetime(2026, 10, 1, hour, tzinfo=timezone.utc),
+                screenshot_id=screenshot_id,
+                screenshot_mime_type="image/webp" if image else None,
+            )
+            for hour in hours
+        ]
+        db.add_all(entries)
+        await db.commit()
+    return entries
+
+
+def _exported(output) -> list[str]:
+    with ZipFile(output) as archive:
+        text = archive.read("manifest.json").decode()
+        manifest = json.loads(text)
+        assert text == json.dumps(manifest, indent=2, ensure_ascii=True)
+        assert manifest["count"] == len(manifest["items"])
+        return [
+            json.loads(archive.read(f"{item['folder']}/metadata.json"))["comment"]
+            for item in manifest["items"]
+        ]
+
+
+async def test_export_streams_in_batches_in_creation_order(
+    sessionmaker, monkeypatch, tmp_path
+) -> None:
+    monkeypatch.setattr(cli, "EXPORT_BATCH_SIZE", 2)
+    await _add(sessionmaker, 5, 1, 3)
+    await _add(sessionmaker, 2, 4, image=IMAGE)
+    output = tmp_path / "feedback.zip"
+
+    assert await cli._export_feedback(output) == 5
+
+    assert _exported(output) == [f"at {hour}" for hour in (1, 2, 3, 4, 5)]
+    with ZipFile(output) as archive:
+        images = [name for name in archive.namelist() if name.endswith("screenshot.webp")]
+        assert [archive.read(name) for name in images] == [IMAGE, IMAGE]
+    assert not (tmp_path / "feedback.zip.partial").exists()
+
+
+async def test_an_empty_export_still_writes_a_manifest(sessionmaker, tmp_path) -> None:
+    output = tmp_path / "feedback.zip"
+
+    assert await cli._export_feedback(output) == 0
+
+    assert _exported(output) == []
+
+
+async def test_export_between_since_and_until(sessionmaker, tmp_path) -> None:
+    await _add(sessionmaker, 1, 2, 3, 4)
+    output = tmp_path / "feedback.zip"
+
+    count = await cli._export_feedback(
+        output,
+        since=datetime(2026, 10, 1, 2),
+        until=datetime(2026, 10, 1, 6, tzinfo=timezone(timedelta(hours=2))),
+    )
+
+    assert count == 2
+    assert _exported(output) == ["at 2", "at 3"]
+
+
+async def test_a_watermark_resumes_after_the_last_exported_row(sessionmaker, tmp_path) -> None:
+    first = await _add(sessionmaker, 1, 2)
+    watermark = tmp_path / "state" / "feedback.watermark"
+
+    assert await cli._export_feedback(tmp_path / "a.zip", watermark=watermark) == 2
+    mark = json.loads(watermark.read_text())
+    assert mark["id"] == str(first[-1].id)
+
+    # Same instant as the watermark: ordered by id, so the later one is still new.
+    tied = await _add(sessionmaker, 2, 3)
+    expected = (["at 2"] if tied[0].id > first[-1].id else []) + ["at 3"]
+
+    await cli._export_feedback(tmp_path / "b.zip", watermark=watermark)
+
+    assert _exported(tmp_path / "b.zip") == expected
+    assert json.loads(watermark.read_text())["id"] == str(tied[-1].id)
+    assert await cli._export_feedback(tmp_path / "c.zip", watermark=watermark) == 0
+    assert json.loads(watermark.read_text())["id"] == str(tied[-1].id)
+
+
+async def test_a_watermark_stays_behind_rows_that_may_still_be_committing(
+    sessionmaker, monkeypatch, tmp_path
+) -> None:
+    await _add(sessionmaker, 1)
+    async with sessionmaker() as db:
+        db.add(FeedbackEntry(user_id="u", rating=3, comment="just now", page_url="/"))
+        await db.commit()
+    watermark = tmp_path / "feedback.watermark"
+
+    await cli._export_feedback(tmp_path / "a.zip", watermark=watermark)
+    assert _exported(tmp_path / "a.zip") == ["at 1"]
+
+    monkeypatch.setattr(cli, "WATERMARK_LAG", timedelta(0))
+    await cli._export_feedback(tmp_path / "b.zip", watermark=watermark)
+    assert _exported(tmp_path / "b.zip") == ["just now"]
+
+
+async def test_a_failed_export_leaves_the_watermark_and_no_archive(
+    sessionmaker, monkeypatch, tmp_path
+) -> None:
+    await _add(sessionmaker, 1)
+    watermark = tmp_path / "feedback.watermark"
+    await cli._export_feedback(tmp_path / "a.zip", watermark=watermark)
+    before = watermark.read_text()
+    await _add(sessionmaker, 2, image=IMAGE)
+
+    async def broken_read(db, screenshot_id):
+        raise OSError("disk full")
+        yield b""
+
+    monkeypatch.setattr(cli, "read_screenshot", broken_read)
+
+    with pytest.raises(OSError):
+        await cli._export_feedback(tmp_path / "b.zip", watermark=watermark)
+
+    assert watermark.read_text() == before
+    assert not (tmp_path / "b.zip").exists()
+    assert not (tmp_path / "b.zip.partial").exists()
+
+
+def _compression(output) -> dict[str, int]:
+    with ZipFile(output) as archive:
+        return {info.filename.split("/")[-1]: info.compress_type for info in archive.infolist()}
+
+
+async def test_compressed_images_are_stored_not_deflated(sessionmaker, tmp_path) -> None:
+    await _add(sessionmaker, 1, image=IMAGE)
+    async with sessionmaker() as db:
+        [entry] = (await db.scalars(select(FeedbackEntry))).all()
+        entry.screenshot_mime_type = "image/bmp"
+        await db.commit()
+    await _add(sessionmaker, 2, image=IMAGE[::-1])
+
+    await cli._export_feedback(tmp_path / "feedback.zip")
+
+    assert _compression(tmp_path / "feedback.zip") == {
+        "comment.txt": ZIP_DEFLATED,
+        "metadata.json": ZIP_DEFLATED,
+        "screenshot.bin": ZIP_DEFLATED,
+        "screenshot.webp": ZIP_STORED,
+        "manifest.json": ZIP_DEFLATED,
+    }
+
+
+async def test_thumbnails_keep_the_archive_in_row_order(
+    sessionmaker, monkeypatch, tmp_path
+) -> None:
+    """Whatever order the pool finishes in, the archive is the one a single worker writes."""
+
+    def slow_thumbnail(data: bytes) -> bytes | None:
+        # Later rows finish first; an unreadable image gets no thumbnail.
+        time.sleep(0.02 * (data[0] % 3))
+        return None if data[0] == 5 else b"thumb" + data[:1]
+
+    monkeypatch.setattr(cli, "_thumbnail_pool", lambda workers: ThreadPoolExecutor(workers))
+    monkeypatch.setattr(cli, "make_thumbnail", slow_thumbnail)
+    for hour in range(7):
+        await _add(sessionmaker, hour, image=bytes([hour]) + IMAGE)
+    await _add(sessionmaker, 7)
+
+    layouts = []
+    for workers in (1, 4):
+        output = tmp_path / f"{workers}.zip"
+        assert await cli._export_feedback(output, thumbnails=True, workers=workers) == 8
+        with ZipFile(output) as archive:
+            layouts.append([name.split("_", 1)[-1] for name in archive.namelist()])
+            manifest = json.loads(archive.read("manifest.json"))
+            for hour, item in enumerate(manifest["items"]):
+                if hour == 7:
+                    assert "thumbnail" not in item
+                elif hour == 5:
+                    assert item["thumbnail"] is None
+                else:
+                    assert item["thumbnail"] == "thumbnail.jpg"
+                    thumbnail = archive.read(f"{item['folder']}/thumbnail.jpg")
+                    assert thumbnail == b"thumb" + bytes([hour])
+
+    assert layouts[0] == layouts[1]
+    assert _compression(tmp_path / "4.zip")["thumbnail.jpg"] == ZIP_STORED
+
+
+def test_thumbnails_need_pillow(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(cli, "thumbnails_available", lambda: False)
+
+    result = CliRunner().invoke(
+        cli.app, [str(tmp_path / "feedback.zip"), "--thumbnails"]
+    )
+
+    assert result.exit_code != 0
+    assert "Pillow" in result.output
+    assert not (tmp_path / "feedback.zip").exists()
+
+
+def test_a_thumbnail_is_a_small_jpeg() -> None:
+    Image = pytest.importorskip("PIL.Image")
+    source = io.BytesIO()
+    Image.new("RGBA", (1920, 1080), (10, 120, 200, 255)).save(source, "PNG")
+
+    thumbnail = thumbnails.make_thumbnail(source.getvalue())
+
+    with Image.open(io.BytesIO(thumbnail)) as image:
+        assert image.format == "JPEG"
+        assert image.size == (480, 270)
+    assert thumbnails.make_thumbnail(b"not an image") is None
+
+
+# ─── Upload ──────────────────────────────────────────────────────────────────
+
+PNG = b"\x89PNG\r\n\x1a\n" + IMAGE
+BOUNDARY = "feedback-boundary"
+
+
+def _multipart(feedback: dict | None = None, screenshot: bytes | None = PNG, mime="image/png"):
+    out = b""
+    if feedback is not None:
+        out += (
+            f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="feedback"\r\n'
+            f"Content-Type: application/json\r\n\r\n{json.dumps(feedback)}\r\n"
+        ).encode()
+    if screenshot is not None:
+        out += (
+            f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="screenshot"; '
+            f'filename="shot"\r\nContent-Type: {mime}\r\n\r\n'
+        ).encode() + screenshot + b"\r\n"
+    return out + f"--{BOUNDARY}--\r\n".encode()
+
+
+def _upload(client, headers, content, **extra):
+    return client.post(
+        "/api/feedback/upload",
+        content=content,
+        headers={**headers, "Content-Type": f"multipart/form-data; boundary={BOUNDARY}", **extra},
+    )
+
+
+def _chunked(data: bytes, size: int = 1000):
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+def test_an_upload_streams_the_screenshot_into_the_store(
+    client, auth_headers, db_sessionmaker
+) -> None:
+    response = _upload(client, auth_headers, _chunked(_multipart(_body(None))))
+
+    assert response.status_code == 201
+    [(entry,)] = _run(db_sessionmaker, select(FeedbackEntry))
+    assert str(entry.id) == response.json()["id"]
+    assert entry.rating == 4
+    assert entry.screenshot_mime_type == "image/png"
+    assert _read(db_sessionmaker, entry.screenshot_id) == PNG
+
+
+def test_an_upload_and_a_json_post_of_one_image_share_it(
+    client, auth_headers, db_sessionmaker
+) -> None:
+    assert client.post("/api/feedback", json=_body(PNG), headers=auth_headers).status_code == 201
+    assert _upload(client, auth_headers, _multipart(_body(None))).status_code == 201
+    assert _upload(client, auth_headers, _multipart(_body(None), None)).status_code == 201
+
+    entries = [row for (row,) in _run(db_sessionmaker, select(FeedbackEntry))]
+    assert len(entries) == 3
+    assert len({entry.screenshot_id for entry in entries}) == 2
+    assert None in {entry.screenshot_id for entry in entries}
+    [(stored,)] = _run(db_sessionmaker, select(func.count()).select_from(FeedbackScreenshot))
+    assert stored == 1
+
+
+@pytest.mark.parametrize(
+    "content, status",
+    [
+        pytest.param(_multipart(_body(None), PNG + b"x" * 5000), 413, id="too-large"),
+        pytest.param(_multipart(_body(None), PNG, mime="image/gif"), 415, id="type"),
+        pytest.param(_multipart(_body(None), b"\xff\xd8\xff\xe0" + IMAGE), 415, id="not-png"),
+        pytest.param(_multipart(_body(None), b"\x89PN"), 415, id="short"),
+        pytest.param(_multipart(_body(None), b""), 400, id="empty"),
+        pytest.param(_multipart(None), 400, id="no-feedback"),
+        pytest.param(_multipart(_body(None))[:-30], 400, id="truncated"),
+        pytest.param(_multipart(_body(None, rating=9)), 422, id="invalid"),
+        pytest.param(_multipart(_body(PNG)), 400, id="base64-too"),
+        pytest.param(
+            _multipart(_body(None), None)[: -len(BOUNDARY) - 6] + _multipart(_body(None)),
+            400,
+            id="duplicate",
+        ),
+    ],
+)
+def test_an_upload_that_breaks_a_limit_is_refused_and_leaves_nothing(
+    client, auth_headers, db_sessionmaker, monkeypatch, content, status
+) -> None:
+    monkeypatch.setattr(settings, "feedback_screenshot_max_bytes", len(PNG) + 100)
+
+    response = _upload(client, auth_headers, _chunked(content, 700))
+
+    assert response.status_code == status
+    assert _run(db_sessionmaker, select(FeedbackEntry)) == []
+    assert _run(db_sessionmaker, select(FeedbackScreenshotChunk)) == []
+
+
+def test_an_upload_declared_too_large_is_refused_before_it_is_read(
+    client, auth_headers, monkeypatch
+) -> None:
+    monkeypatch.setattr(settings, "feedback_screenshot_max_bytes", 1000)
+    content = _multipart(_body(None), PNG + b"x" * 200_000)
+
+    response = _upload(client, auth_headers, content)
+
+    assert response.status_code == 413
+    assert response.json()["detail"] == "Feedback upload too large"
+
+
+def test_an_undeclared_upload_is_cut_off_past_the_largest_it_could_be(
+    client, auth_headers, db_sessionmaker, monkeypatch
+) -> None:
+    monkeypatch.setattr(settings, "feedback_screenshot_max_bytes", 1000)
+    padding = (
+        f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="padding"\r\n\r\n'
+    ).encode() + b"x" * 200_000 + b"\r\n"
+
+    response = _upload(client, auth_headers, _chunked(padding + _multipart(_body(None), None)))
+
+    assert response.status_code == 413
+    assert response.json()["detail"] == "Feedback upload too large"
+    assert _run(db_sessionmaker, select(FeedbackEntry)) == []
+
+
+def test_an_upload_must_be_multipart(client, auth_headers) -> None:
+    response = client.post(
+        "/api/feedback/upload",
+        content=json.dumps(_body()),
+        headers={**auth_headers, "Content-Type": "application/json"},
+    )
+
+    assert response.status_code == 415
+
+
+# ─── Write queue ─────────────────────────────────────────────────────────────
+
+
+def _row(hour: int = 0, **overrides) -> dict:
+    return {
+        "id": uuid.uuid4(),
+        "user_id": "test-user-123",
+        "rating": 3,
+        "comment": f"at {hour}",
+        "page_url": "https://app.example/overview",
+        "page_title": None,
+        "page_path": None,
+        "locale": None,
+        "timezone": None,
+        "user_agent": None,
+        "viewport_width": None,
+        "viewport_height": None,
+        "screen_width": None,
+        "screen_height": None,
+        "color_scheme": None,
+        "client_timestamp": None,
+        "client_ip": None,
+        "extra_context": None,
+        "screenshot_mime_type": None,
+        "screenshot_id": None,
+    } | overrides
+
+
+def _inserts(sessionmaker) -> list[int]:
+    """Rows per INSERT into feedback_entries, as the statements run."""
+    counts: list[int] = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO feedback_entries"):
+            counts.append(statement.count("(?"))
+
+    event.listen(sessionmaker.kw["bind"].sync_engine, "before_cursor_execute", count)
+    return counts
+
+
+async def _comments(sessionmaker) -> list[str]:
+    async with sessionmaker() as db:
+        return list(await db.scalars(select(FeedbackEntry.comment).order_by(FeedbackEntry.comment)))
+
+
+async def test_a_burst_is_written_in_a_few_multi_row_inserts(sessionmaker) -> None:
+    queue = FeedbackQueue(batch_size=100)
+    queue.sessionmaker = sessionmaker
+    inserts = _inserts(sessionmaker)
+    queue.start()
+
+    assert all(queue.submit(_row(comment=f"{n:03d}")) for n in range(250))
+    await queue.flush()
+    await queue.stop()
+
+    assert inserts == [100, 100, 50]
+    assert await _comments(sessionmaker) == [f"{n:03d}" for n in range(250)]
+
+
+async def test_a_full_or_stopped_queue_refuses_rows(sessionmaker) -> None:
+    queue = FeedbackQueue(max_pending=3)
+    queue.sessionmaker = sessionmaker
+
+    assert queue.submit(_row()) is False
+    queue.start()
+    assert [queue.submit(_row(n)) for n in range(5)] == [True, True, True, False, False]
+    await queue.stop()
+    assert queue.submit(_row()) is False
+    assert len(await _comments(sessionmaker)) == 3
+
+
+async def test_stopping_writes_what_is_queued(sessionmaker) -> None:
+    queue = FeedbackQueue(linger=1.0)
+    queue.sessionmaker = sessionmaker
+    queue.start()
+    for hour in range(3):
+        queue.submit(_row(hour))
+
+    await queue.stop()
+
+    assert await _comments(sessionmaker) == ["at 0", "at 1", "at 2"]
+
+
+async def test_a_rejected_row_does_not_sink_its_batch(sessionmaker) -> None:
+    queue = FeedbackQueue()
+    queue.sessionmaker = sessionmaker
+    taken = _row(0)
+    async with sessionmaker() as db:
+        db.add(FeedbackEntry(**taken))
+        await db.commit()
+    rejected = feedback_rows.value(outcome="rejected")
+    queue.start()
+
+    queue.submit(_row(1))
+    queue.submit(_row(2, id=taken["id"]))
+    queue.submit(_row(3))
+    await queue.stop()
+
+    assert await _comments(sessionmaker) == ["at 0", "at 1", "at 3"]
+    assert feedback_rows.value(outcome="rejected") == rejected + 1
+
+
+async def test_a_failed_batch_is_retried(sessionmaker) -> None:
+    calls = 0
+
+    def flaky():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise OperationalError("INSERT", {}, ConnectionError("database away"))
+        return sessionmaker()
+
+    queue = FeedbackQueue(retry_delays=(0.01,))
+    queue.sessionmaker = flaky
+    queue.start()
+    queue.submit(_row(1))
+    await queue.stop()
+
+    assert calls == 2
+    assert await _comments(sessionmaker) == ["at 1"]
+
+
+async def test_a_batch_outlasts_every_retry_delay(sessionmaker) -> None:
+    calls = 0
+
+    def away_for_a_while():
+        nonlocal calls
+        calls += 1
+        if calls <= 5:
+            raise OperationalError("INSERT", {}, ConnectionError("database away"))
+        return sessionmaker()
+
+    queue = FeedbackQueue(retry_delays=(0.01, 0.02))
+    queue.sessionmaker = away_for_a_while
+    queue.start()
+    queue.submit(_row(1))
+    await queue.stop()
+
+    assert calls == 6
+    assert await _comments(sessionmaker) == ["at 1"]
+
+
+async def test_a_batch_still_failing_at_shutdown_is_dropped(
+    sessionmaker, monkeypatch, caplog
+) -> None:
+    from celine.webapp.services import feedback_queue as queue_module
+
+    def away():
+        raise OperationalError("INSERT", {}, ConnectionError("database away"))
+
+    monkeypatch.setattr(queue_module, "STOP_TIMEOUT", 0.1)
+    # One row in the batch being retried, one still queued behind it.
+    queue = FeedbackQueue(batch_size=1, retry_delays=(0.01,))
+    queue.sessionmaker = away
+    dropped = feedback_rows.value(outcome="dropped")
+    queue.start()
+    queue.submit(_row(1))
+    queue.submit(_row(2))
+
+    await queue.stop()
+
+    assert feedback_rows.value(outcome="dropped") == dropped + 2
+    assert [r.getMessage() for r in caplog.records if "Dropping" in r.getMessage()] == [
+        "Dropping 2 unwritten feedback row(s) at shutdown"
+    ]
+    assert await _comments(sessionmaker) == []
+
+
+def test_the_database_stamps_created_at_when_the_row_is_written(
+    client, auth_headers, db_sessionmaker
+) -> None:
+    response = client.post("/api/feedback", json=_body(None), headers=auth_headers)
+
+    [(entry,)] = _run(db_sessionmaker, select(FeedbackEntry))
+    accepted_at = datetime.fromisoformat(response.json()["created_at"])
+    assert abs(cli._utc(entry.created_at) - accepted_at) < timedelta(minutes=1)
+
+
+def test_the_route_writes_the_row_itself_when_the_queue_is_full(
+    client, auth_headers, db_sessionmaker, monkeypatch
+) -> None:
+    monkeypatch.setattr(feedback_queue, "submit", lambda values: False)
+
+    response = client.post("/api/feedback", json=_body(None), headers=auth_headers)
+
+    assert response.status_code == 201
+    [(entry,)] = _run(db_sessionmaker, select(FeedbackEntry))
+    assert str(entry.id) == response.json()["id"]
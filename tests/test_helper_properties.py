@@ -0,0 +1,279 @@
+"""Equivalence properties for the pure helpers `benchmarks/helpers.py` times.
+
+Each helper is checked against a reference implementation kept here — written for
+clarity, not speed, and frozen at the behaviour the routes rely on, quirks included —
+over generated inputs at every range size a member can pick. A faster version of a
+helper can be swapped in once these pass; they are what makes the swap safe, since
+the fan-out tests only ever exercise a handful of rows.
+
+The inputs come from the benchmark generators, then are roughened: missing and
+malformed timestamps, `datetime` objects where a string is usual, non-numeric values,
+and rows from outside the requested window.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone, tzinfo
+from zoneinfo import ZoneInfo
+from typing import Any, Iterator
+
+import pytest
+
+from benchmarks import helpers as gen
+from celine.webapp.api.forecast import _sort_dedup
+from celine.webapp.api.gamification import _season_summary_from_row
+from celine.webapp.api.overview import _build_daily_trend, _build_user_daily_trend_merged
+from celine.webapp.timestamps import day_key, day_keys
+
+EXAMPLES_PER_SIZE = {1: 20, 7: 20, 30: 5, 366: 1}
+ROME = ZoneInfo("Europe/Rome")
+
+
+def examples() -> Iterator[tuple[int, random.Random]]:
+    for days, count in EXAMPLES_PER_SIZE.items():
+        for seed in range(count):
+            yield days, random.Random(f"{days}-{seed}")
+
+
+def roughen(rows: list[dict[str, Any]], rng: random.Random) -> list[dict[str, Any]]:
+    """Copy ``rows`` with one in ten damaged the ways upstream rows have been."""
+    out = []
+    for row in rows:
+        row = dict(row)
+        if rng.random() < 0.1:
+            damage = rng.randrange(5)
+            if damage == 0:
+                row["ts"] = rng.choice([None, "", "not a timestamp", "2026-13-01T00:00:00"])
+            elif damage == 1:
+                row["ts"] = datetime.fromisoformat(str(row["ts"]).replace("Z", "+00:00"))
+            elif damage == 2:
+                row.pop("ts")
+            else:
+                key = rng.choice([k for k in row if k != "ts"] or ["ts"])
+                row[key] = rng.choice([None, "n/a", "1.5", 2])
+        out.append(row)
+    return out
+
+
+def generated(kind, days: int, rng: random.Random) -> list[dict[str, Any]]:
+    """Rows for ``days`` plus a day either side of the window, roughened and shuffled."""
+    rows = kind(days + 2, rng, gen.END + timedelta(days=1))
+    rows = roughen(rows, rng)
+    rng.shuffle(rows)
+    return rows
+
+
+# ─── References ──────────────────────────────────────────────────────────────
+
+
+def ref_day_key(ts: Any, tz: tzinfo = timezone.utc) -> str | None:
+    """The day of ``ts`` in ``tz``; naive timestamps are UTC."""
+    if isinstance(ts, str) and ts:
+        try:
+            ts = datetime.fromisoformat(ts.replace(" ", "T"))
+        except ValueError:
+            return None
+    if not isinstance(ts, datetime):
+        return None
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.astimezone(tz).date().isoformat()
+
+
+def ref_number(value: Any) -> float:
+    try:
+        return 0.0 if value is None else float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def ref_days(start: datetime, end: datetime) -> list[str]:
+    count = max(1, (end.date() - start.date()).days + 1)
+    return [(end.date() - timedelta(days=count - 1 - i)).isoformat() for i in range(count)]
+
+
+def ref_by_day(rows: list[dict[str, Any]]) -> dict[str, list[dict[str, Any]]]:
+    by_day: dict[str, list[dict[str, Any]]] = defaultdict(list)
+    for row in rows:
+        key = ref_day_key(row.get("ts"))
+        if key:
+            by_day[key].append(row)
+    return by_day
+
+
+def ref_total(rows: list[dict[str, Any]], field: str) -> float:
+    return sum(ref_number(row.get(field)) for row in rows)
+
+
+def ref_daily_trend(rows, start, end) -> list[dict[str, Any]]:
+    by_day = ref_by_day(rows)
+    trend = []
+    for day in ref_days(start, end):
+        if day not in by_day:
+            trend.append(
+                dict.fromkeys(
+                    ("production_kwh", "consumption_kwh", "self_consumption_kwh", "surplus_kwh")
+                )
+                | {"date": day}
+            )
+            continue
+        production = ref_total(by_day[day], "total_production_kwh")
+        consumption = ref_total(by_day[day], "total_consumption_kwh")
+        trend.append(
+            {
+                "date": day,
+                "production_kwh": production,
+                "consumption_kwh": consumption,
+                "self_consumption_kwh": ref_total(by_day[day], "self_consumption_kwh"),
+                "surplus_kwh": max(0.0, production - consumption),
+            }
+        )
+    return trend
+
+
+def ref_user_trend(meters, virtual, start, end) -> list[dict[str, Any]]:
+    meter_days = ref_by_day(meters)
+    virtual_days = ref_by_day(virtual)
+    trend = []
+    for day in ref_days(start, end):
+        metered = meter_days.get(day)
+        shared = virtual_days.get(day)
+        trend.append(
+            {
+                "date": day,
+                "consumption_kwh": ref_total(metered, "consumption_kwh") if metered else None,
+                "production_kwh": ref_total(metered, "production_kwh") if metered else None,
+                "self_consumption_kwh": (
+                    ref_total(shared, "virtual_consumption_kwh") if shared else None
+                ),
+            }
+        )
+    return trend
+
+
+def ref_instant(ts: str) -> datetime:
+    try:
+        parsed = datetime.fromisoformat(ts)
+    except ValueError:
+        return datetime.max.replace(tzinfo=timezone.utc)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def ref_sort_dedup(items):
+    first: dict[datetime, Any] = {}
+    for item in items:
+        first.setdefault(ref_instant(item.ts), item)
+    return [first[instant] for instant in sorted(first)]
+
+
+def ref_season_summary(row: dict[str, Any]) -> dict[str, Any] | None:
+    try:
+        position = int(row["season_rank"])
+        total = max(int(row["total_members"]), 1)
+        return {
+            "total_points": int(row["season_points"]),
+            "season_base_points": int(row["season_base_points"]),
+            "season_bonus_points": int(row["season_bonus_points"]),
+            "season_start": str(row["season_start"]),
+            "season_end": str(row["season_end"]),
+            "ranking": {
+                "position": position,
+                "total_members": total,
+                "percentile": math.ceil(position / total * 100),
+                "period": "season",
+            },
+        }
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def assert_trends_equal(actual: list[dict], expected: list[dict]) -> None:
+    assert [row["date"] for row in actual] == [row["date"] for row in expected]
+    for got, want in zip(actual, expected):
+        assert got.keys() == want.keys()
+        for key, value in want.items():
+            if isinstance(value, float):
+                assert got[key] == pytest.approx(value, rel=1e-9, abs=1e-12), (want["date"], key)
+            else:
+                assert got[key] == value, (want["date"], key)
+
+
+# ─── Properties ──────────────────────────────────────────────────────────────
+
+
+def test_day_key_matches_the_reference() -> None:
+    for days, rng in examples():
+        stamps = [row.get("ts") for row in generated(gen.meter_rows, days, rng)]
+        expected = [ref_day_key(ts) for ts in stamps]
+
+        assert [day_key(ts) for ts in stamps] == expected
+        assert day_keys(stamps) == expected
+        assert day_keys(stamps, ROME) == [ref_day_key(ts, ROME) for ts in stamps]
+
+    odd = [
+        date(2026, 8, 1),
+        0,
+        "2026-08-01",
+        "2026-08-01T10:00:00.250Z",
+        "2026-08-01T23:30:00-02:00",
+        "2026-08-01T00:30:00+02:00",
+        "2026-02-30T10:00:00",
+    ]
+    assert day_keys(odd) == [ref_day_key(ts) for ts in odd]
+    assert day_keys(odd, ROME) == [ref_day_key(ts, ROME) for ts in odd]
+
+
+def test_daily_trend_matches_the_reference() -> None:
+    for days, rng in examples():
+        start, end = gen.window(days)
+        rows = generated(gen.rec_rows, days, rng)
+
+        trend = _build_daily_trend(rows, start, end)
+
+        assert_trends_equal(trend, ref_daily_trend(rows, start, end))
+        assert len(trend) == days
+        assert trend[-1]["date"] == end.date().isoformat()
+
+
+def test_user_daily_trend_matches_the_reference() -> None:
+    for days, rng in examples():
+        start, end = gen.window(days)
+        meters = generated(gen.meter_rows, days, rng)
+        virtual = generated(gen.virtual_rows, days, rng)
+
+        trend = _build_user_daily_trend_merged(meters, virtual, start, end)
+
+        assert_trends_equal(trend, ref_user_trend(meters, virtual, start, end))
+        assert len(trend) == days
+
+
+def test_sort_dedup_matches_the_reference() -> None:
+    for days, rng in examples():
+        items = gen.forecast_items(days, rng)
+        for item in rng.sample(items, len(items) // 20):
+            item.ts = rng.choice(["not a timestamp", item.ts.replace("+00:00", "")])
+
+        result = _sort_dedup(items)
+
+        assert [id(i) for i in result] == [id(i) for i in ref_sort_dedup(items)]
+        assert _sort_dedup(result) == result
+
+
+def test_season_summary_matches_the_reference() -> None:
+    for _, rng in examples():
+        for _ in range(20):
+            row = gen.leaderboard_row(rng)
+            if rng.random() < 0.3:
+                key = rng.choice(list(row))
+                if rng.random() < 0.5:
+                    row.pop(key)
+                else:
+                    row[key] = rng.choice([None, "x", "7", 3.9])
+
+            summary = _season_summary_from_row(row)
+            expected = ref_season_summary(row)
+
+            assert (summary.model_dump() if summary else None) == expected, row
@@ -0,0 +1,75 @@
+"""Reading an array out of a JSON body as it arrives."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from celine.webapp.jsonstream import ArrayItems
+
+BODY = {
+    "@context": {"prov": "http://www.w3.org/ns/prov#", "tricky": "], } \"@graph\": ["},
+    "@graph": [{"n": 1, "at": "2026-08-01T10:00:00Z"}, {"n": 2.5e3, "tags": ["a", "]"]}, 30],
+    "next_cursor": "abc",
+}
+
+
+def read(text: str, size: int) -> tuple[list, ArrayItems]:
+    reader = ArrayItems()
+    items = []
+    for start in range(0, len(text), size):
+        items += reader.feed(text[start : start + size])
+    items += reader.close()
+    return items, reader
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 10_000])
+def test_items_come_out_whatever_the_chunking(size: int) -> None:
+    items, reader = read(json.dumps(BODY), size)
+
+    assert items == BODY["@graph"]
+    assert reader.members == {"@context": BODY["@context"], "next_cursor": "abc"}
+
+
+def test_a_bare_array_is_read_too() -> None:
+    assert read("[1, 22, {\"a\": []}]", 1)[0] == [1, 22, {"a": []}]
+
+
+def test_an_item_is_handed_over_before_the_body_ends() -> None:
+    reader = ArrayItems()
+
+    assert list(reader.feed('{"@graph": [{"n": 1}, {"n"')) == [{"n": 1}]
+    assert list(reader.feed(": 2}]}")) == [{"n": 2}]
+
+
+def test_only_the_unread_tail_is_kept() -> None:
+    reader = ArrayItems()
+    list(reader.feed('{"@graph": [' + ", ".join(['{"pad": "' + "x" * 100 + '"}'] * 1000)))
+
+    assert len(reader._buf) < 200
+
+
+@pytest.mark.parametrize("text", ['{"@graph": [1, 2', "[1,", '{"a": tru}', "nope"])
+def test_a_truncated_or_malformed_body_is_an_error(text: str) -> None:
+    with pytest.raises(ValueError):
+        read(text, 4)
+
+
+def test_an_item_in_many_small_chunks_is_decoded_once(monkeypatch) -> None:
+    from celine.webapp import jsonstream
+
+    decodes: list[int] = []
+    raw_decode = jsonstream._decoder.raw_decode
+
+    def counting(text: str, pos: int = 0):
+        decodes.append(pos)
+        return raw_decode(text, pos)
+
+    monkeypatch.setattr(jsonstream._decoder, "raw_decode", counting)
+    item = {"activity": "x" * 5000, "used": [{"entity": 'e"]}\\'}] * 50}
+
+    items, _ = read(json.dumps({"@graph": [item]}), 3)
+
+    assert items == [item]
+    assert len(decodes) < 5
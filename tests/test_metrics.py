@@ -0,0 +1,174 @@
+"""`GET /metrics` and what feeds it."""
+
+from __future__ import annotations
+
+import logging
+
+import pytest
+from fastapi.testclient import TestClient
+
+from celine.webapp.cache import SingleFlight, TTLCache, cache_lookups, coalesced_calls
+from celine.webapp.db.instrumentation import InstrumentedPool, route_queries
+from celine.webapp.db.session import engine_options
+from celine.webapp.logsampling import SampledLogger
+from celine.webapp.metrics import Counter, Histogram, render_latest
+from celine.webapp.settings import Settings
+from celine.webapp.upstreams import (
+    InstrumentedClient,
+    fetcher_errors,
+    fetcher_seconds,
+    observe_upstream,
+    upstream_errors,
+    upstream_seconds,
+)
+
+
+def test_pool_options_come_from_settings() -> None:
+    options = engine_options(
+        Settings(
+            database_pool_size=3,
+            database_max_overflow=0,
+            database_pool_pre_ping=True,
+            database_statement_cache_size=0,
+        )
+    )
+
+    assert options["poolclass"] is InstrumentedPool
+    assert options["pool_size"] == 3
+    assert options["max_overflow"] == 0
+    assert options["pool_pre_ping"] is True
+    connect_args = options["connect_args"]
+    assert connect_args["prepared_statement_cache_size"] == 0
+    assert connect_args["statement_cache_size"] == 0
+    name = connect_args["prepared_statement_name_func"]
+    assert name() != name()
+
+
+def test_connections_are_pinged_on_checkout_by_default() -> None:
+    assert engine_options(Settings())["pool_pre_ping"] is True
+
+
+def test_histograms_render_cumulative_buckets() -> None:
+    histogram = Histogram("test_render_seconds", "Test.", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, route="/a")
+    histogram.observe(0.5, route="/a")
+    histogram.observe(5.0, route="/a")
+
+    text = render_latest()
+
+    assert 'test_render_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'test_render_seconds_bucket{route="/a",le="1"} 2' in text
+    assert 'test_render_seconds_bucket{route="/a",le="+Inf"} 3' in text
+    assert 'test_render_seconds_count{route="/a"} 3' in text
+
+
+def test_labels_must_match_the_declaration() -> None:
+    counter = Counter("test_labels_total", "Test.", ("route",))
+    with pytest.raises(ValueError):
+        counter.inc(path="/a")
+
+
+def test_query_time_is_attributed_to_the_route_template(
+    client: TestClient, auth_headers: dict
+) -> None:
+    before = route_queries.value(method="GET", route="/api/me")
+
+    assert client.get("/api/me", headers=auth_headers).status_code == 200
+
+    assert route_queries.value(method="GET", route="/api/me") > before
+    body = client.get("/metrics").text
+    assert 'db_route_query_seconds_count{method="GET",route="/api/me"}' in body
+    assert "db_pool_connections_in_use" in body
+
+
+def test_request_latency_is_labelled_by_route_and_status(
+    client: TestClient, auth_headers: dict
+) -> None:
+    assert client.get("/api/me", headers=auth_headers).status_code == 200
+    assert client.get("/no/such/path").status_code == 404
+
+    body = client.get("/metrics").text
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/me",status="200"}' in body
+    assert 'http_request_duration_seconds_count{method="GET",route="unmatched",status="404"}' in body
+    assert "http_requests_in_flight" in body
+
+
+class _Fetcher:
+    async def fetch_values(self, participant_id: str, fetcher_id: str) -> list:
+        if fetcher_id == "broken":
+            raise RuntimeError("upstream down")
+        return []
+
+
+class _Twin:
+    participants = _Fetcher()
+
+
+async def test_instrumented_client_times_calls_per_fetcher() -> None:
+    dt = InstrumentedClient(_Twin(), "digital_twin", children=("participants",))
+    labels = {"upstream": "digital_twin", "operation": "participants.fetch_values"}
+    errors_before = upstream_errors.value(**labels)
+
+    assert await dt.participants.fetch_values("p1", fetcher_id="test-ok") == []
+    with pytest.raises(RuntimeError):
+        await dt.participants.fetch_values("p1", fetcher_id="broken")
+
+    assert upstream_seconds.count(**labels) >= 2
+    assert upstream_errors.value(**labels) == errors_before + 1
+    assert fetcher_seconds.count(fetcher_id="test-ok") == 1
+    assert fetcher_errors.value(fetcher_id="broken") == 1
+    assert fetcher_errors.value(fetcher_id="test-ok") == 0
+
+
+def test_observe_upstream_counts_5xx_but_not_4xx() -> None:
+    labels = {"upstream": "test", "operation": "status"}
+    with observe_upstream(**labels) as call:
+        call.status = 404
+    with observe_upstream(**labels) as call:
+        call.status = 503
+
+    assert upstream_errors.value(**labels) == 1
+    assert upstream_seconds.count(**labels) == 2
+
+
+def test_cache_lookups_are_counted_by_result() -> None:
+    cache: TTLCache[str, int] = TTLCache("test_lookups", maxsize=4, ttl=60)
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("b")
+
+    assert cache_lookups.value(cache="test_lookups", result="hit") == 1
+    assert cache_lookups.value(cache="test_lookups", result="miss") == 1
+
+
+async def test_single_flight_coalesces_and_outlives_a_cancelled_caller() -> None:
+    import asyncio
+
+    flights: SingleFlight[str, int] = SingleFlight("test_flight")
+    calls = 0
+    release = asyncio.Event()
+
+    async def call() -> int:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return 7
+
+    first = asyncio.ensure_future(flights.run("k", call))
+    second = asyncio.ensure_future(flights.run("k", call))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    assert await second == 7
+    assert calls == 1 and len(flights) == 0
+    assert coalesced_calls.value(flight="test_flight") == 1
+
+
+def test_sampled_logger_writes_one_call_in_n(caplog: pytest.LogCaptureFixture) -> None:
+    sampled = SampledLogger(logging.getLogger("test.sampled"), every=10)
+    with caplog.at_level(logging.INFO, logger="test.sampled"):
+        written = sum(sampled.info("line %d", i) for i in range(25))
+
+    assert written == 3
+    assert [r.getMessage() for r in caplog.records] == ["line 0", "line 10", "line 20"]
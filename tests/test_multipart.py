@@ -0,0 +1,95 @@
+"""Reading a multipart/form-data body as it arrives."""
+
+from __future__ import annotations
+
+import pytest
+
+from celine.webapp.multipart import MultipartReader, Part, boundary
+
+BOUNDARY = "----form7MA4YWxk"
+# Binary content that contains the boundary's text without the line break before it,
+# and a line break followed by part of the delimiter.
+IMAGE = b"\x89PNG\r\n\x1a\n" + b"--" + BOUNDARY.encode() + b"\r\n--" + BOUNDARY[:5].encode() + bytes(range(256))
+
+
+def body(*parts: tuple[str, str | None, str | None, bytes]) -> bytes:
+    out = b"preamble to ignore\r\n"
+    for name, filename, content_type, data in parts:
+        disposition = f'form-data; name="{name}"'
+        if filename:
+            disposition += f'; filename="{filename}"'
+        out += f"--{BOUNDARY}\r\nContent-Disposition: {disposition}\r\n".encode()
+        if content_type:
+            out += f"Content-Type: {content_type}\r\n".encode()
+        out += b"\r\n" + data + b"\r\n"
+    return out + f"--{BOUNDARY}--\r\nepilogue".encode()
+
+
+def read(data: bytes, size: int) -> list[tuple[Part, bytes]]:
+    reader = MultipartReader(BOUNDARY)
+    parts: list[tuple[Part, bytes]] = []
+    for start in range(0, len(data), size):
+        for item in reader.feed(data[start : start + size]):
+            if isinstance(item, Part):
+                parts.append((item, b""))
+            else:
+                parts[-1] = (parts[-1][0], parts[-1][1] + item)
+    reader.close()
+    return parts
+
+
+@pytest.mark.parametrize("size", [1, 2, 5, 17, 64, 100_000])
+def test_parts_come_out_whatever_the_chunking(size: int) -> None:
+    data = body(
+        ("feedback", None, None, b'{"rating": 4}'),
+        ("screenshot", "shot.png", "image/png", IMAGE),
+        ("empty", None, None, b""),
+    )
+
+    parts = read(data, size)
+
+    assert parts == [
+        (Part("feedback", None, None), b'{"rating": 4}'),
+        (Part("screenshot", "shot.png", "image/png"), IMAGE),
+        (Part("empty", None, None), b""),
+    ]
+
+
+def test_part_bytes_are_handed_over_before_the_part_ends() -> None:
+    reader = MultipartReader(BOUNDARY)
+    head = f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="a"\r\n\r\n'.encode()
+
+    items = list(reader.feed(head + b"x" * 1000))
+
+    assert items[0] == Part("a", None, None)
+    assert b"".join(items[1:]) == b"x" * (1000 - len(BOUNDARY) - 3)
+    assert len(reader._buf) < len(BOUNDARY) + 4
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        body(("a", None, None, b"1"))[:-20],
+        f"--{BOUNDARY}\r\nno colon here\r\n\r\nx\r\n--{BOUNDARY}--".encode(),
+        f"--{BOUNDARY}\r\nContent-Disposition: attachment\r\n\r\nx\r\n--{BOUNDARY}--".encode(),
+        f"--{BOUNDARY}XX".encode(),
+        f"--{BOUNDARY}\r\n".encode() + b"X-Pad: " + b"x" * 20_000,
+    ],
+)
+def test_a_truncated_or_malformed_body_is_an_error(data: bytes) -> None:
+    with pytest.raises(ValueError):
+        read(data, 7)
+
+
+@pytest.mark.parametrize(
+    "content_type, expected",
+    [
+        (f"multipart/form-data; boundary={BOUNDARY}", BOUNDARY),
+        ('Multipart/Form-Data; charset=utf-8; boundary="a b"', "a b"),
+        ("multipart/form-data", None),
+        ("application/json", None),
+        ("", None),
+    ],
+)
+def test_boundary(content_type: str, expected: str | None) -> None:
+    assert boundary(content_type) == expected
@@ -12,6 +12,8 @@ that fail to load. Both behaviours are deliberate and neither was covered.
 
 from __future__ import annotations
 
+import time
+
 import pytest
 from fastapi.testclient import TestClient
 
@@ -270,19 +272,103 @@ def test_an_unreachable_catalogue_degrades_quietly_instead(
     assert response.json()["notifications"]["kinds"] == []
 
 
-def test_a_failed_upstream_update_is_a_502(
+def test_a_failed_upstream_update_is_queued_and_delivered_later(
     client: TestClient, auth_headers: dict, fake_nudging, monkeypatch
 ) -> None:
+    """Answered 502 until the outbox existed, after the local half had already committed.
+
+    The push is retried in the background instead, and the route says so with a 202.
+    """
+    from celine.webapp.services.nudging_outbox import outbox
+
+    monkeypatch.setattr(outbox, "retry_delays", (0.01, 0.01, 0.01))
+    real_update = fake_nudging.update_preferences
+    failures = iter([RuntimeError("nudging down")])
+
+    async def flaky(*args, **kwargs):
+        error = next(failures, None)
+        if error is not None:
+            raise error
+        return await real_update(*args, **kwargs)
+
+    monkeypatch.setattr(fake_nudging, "update_preferences", flaky)
+
+    response = client.put(
+        "/api/settings", headers=auth_headers, json=_settings_payload()
+    )
+
+    assert response.status_code == 202
+    deadline = time.monotonic() + 2
+    while not fake_nudging.updates and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert fake_nudging.updates[-1]["max_per_day"] == 8
+    # The local half did not wait for it.
+    assert client.get("/api/settings", headers=auth_headers).json()["simple_mode"] is True
+
+
+def test_a_failed_upstream_update_is_a_502_when_it_cannot_be_queued(
+    client: TestClient, auth_headers: dict, fake_nudging, monkeypatch
+) -> None:
+    from celine.webapp.services.nudging_outbox import outbox
+
     async def boom(*args, **kwargs):
         raise RuntimeError("nudging down")
 
     monkeypatch.setattr(fake_nudging, "update_preferences", boom)
+    monkeypatch.setattr(outbox, "max_pending", 0)
 
     assert client.put(
         "/api/settings", headers=auth_headers, json=_settings_payload()
     ).status_code == 502
 
 
+def test_unchanged_preferences_are_not_pushed_again(
+    client: TestClient, auth_headers: dict, fake_nudging
+) -> None:
+    """A PUT of what this replica last pushed, still held upstream, is a no-op upstream."""
+    payload = _settings_payload()
+    client.put("/api/settings", headers=auth_headers, json=payload)
+    pushes = len(fake_nudging.updates)
+
+    client.get("/api/settings", headers=auth_headers)
+    assert client.put(
+        "/api/settings", headers=auth_headers, json=payload
+    ).status_code == 200
+
+    assert len(fake_nudging.updates) == pushes
+
+
+def test_a_change_made_elsewhere_is_not_diffed_away(
+    client: TestClient, auth_headers: dict, fake_nudging
+) -> None:
+    """Another replica or device changed the limit; putting back this one's is pushed."""
+    payload = _settings_payload()
+    client.put("/api/settings", headers=auth_headers, json=payload)
+    fake_nudging.max_per_day = 2
+
+    client.get("/api/settings", headers=auth_headers)
+    client.put("/api/settings", headers=auth_headers, json=payload)
+
+    assert fake_nudging.updates[-1]["max_per_day"] == 8
+    assert fake_nudging.updates[-1]["channel_email"] is True
+
+
+def test_only_changed_preferences_are_pushed(
+    client: TestClient, auth_headers: dict, fake_nudging
+) -> None:
+    payload = _settings_payload()
+    client.put("/api/settings", headers=auth_headers, json=payload)
+
+    payload["notifications"]["limit"] = 4
+    client.put("/api/settings", headers=auth_headers, json=payload)
+
+    sent = fake_nudging.updates[-1]
+    assert sent["max_per_day"] == 4
+    assert sent["channel_email"] is None
+    assert sent["email"] is None
+    assert sent["enabled_notification_kinds"] is None
+
+
 # ─── Notifications ───────────────────────────────────────────────────────────
 
 
@@ -0,0 +1,100 @@
+"""Startup: nothing blocks the first answer, and the readiness gate covers the rest."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from celine.webapp import main as main_module
+from celine.webapp.db import session as session_module
+
+
+async def test_mode_none_touches_no_database(monkeypatch) -> None:
+    async def forbidden(*args, **kwargs):
+        raise AssertionError("nothing should run in startup mode none")
+
+    monkeypatch.setattr(session_module, "init_db", forbidden)
+    monkeypatch.setattr(session_module, "run_migrations", forbidden)
+
+    await session_module.prepare_database("none")
+
+
+async def test_migrations_leave_the_app_logging_alone(monkeypatch) -> None:
+    from alembic import command
+
+    upgrades = []
+    monkeypatch.setattr(command, "upgrade", lambda config, revision: upgrades.append(config))
+
+    await session_module.run_migrations()
+
+    [config] = upgrades
+    assert config.attributes["configure_logger"] is False
+
+
+def test_ready_once_startup_has_finished(client: TestClient) -> None:
+    assert client.get("/health").status_code == 200
+
+    deadline = time.monotonic() + 5
+    while (response := client.get("/ready")).status_code != 200:
+        assert response.json() == {"status": "starting"}
+        assert time.monotonic() < deadline, "startup never finished"
+        time.sleep(0.01)
+
+    assert response.json() == {"status": "ok"}
+
+
+def test_requests_wait_for_a_slow_startup(app, monkeypatch, auth_headers) -> None:
+    create_schema = main_module.prepare_database
+
+    async def slow_startup(mode: str) -> None:
+        await asyncio.sleep(0.2)
+        await create_schema(mode)
+
+    monkeypatch.setattr(main_module, "prepare_database", slow_startup)
+
+    with TestClient(app) as client:
+        assert client.get("/api/me", headers=auth_headers).status_code == 200
+
+
+@pytest.mark.parametrize("path", ["/ready", "/api/me"])
+def test_a_failed_startup_is_never_ready(app, monkeypatch, auth_headers, path) -> None:
+    async def broken(mode: str) -> None:
+        raise RuntimeError("migration failed")
+
+    monkeypatch.setattr(main_module, "prepare_database", broken)
+
+    with TestClient(app) as client:
+        response = client.get(path, headers=auth_headers)
+
+    assert response.status_code == 503
+
+
+def test_importing_the_app_defers_the_sdk_clients() -> None:
+    """The four generated clients load on first use, not on every cold start.
+
+    Run in a fresh interpreter: this process has long since imported them.
+    """
+    probe = (
+        "import sys, celine.webapp.main\n"
+        "print(sorted(m for m in sys.modules if m.startswith(("
+        "'celine.sdk.openapi', 'celine.sdk.dt', 'celine.sdk.nudging', "
+        "'celine.sdk.flexibility', 'celine.sdk.rec_registry'))))"
+    )
+    src = Path(main_module.__file__).resolve().parents[2]
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(src), os.environ.get("PYTHONPATH")])),
+    }
+
+    result = subprocess.run(
+        [sys.executable, "-c", probe], env=env, capture_output=True, text=True, check=True
+    )
+
+    assert result.stdout.strip() == "[]"
@@ -0,0 +1,90 @@
+"""Day keys for Digital Twin timestamps."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from celine.webapp.timestamps import UTC, day_key, day_keys, parse, zone
+
+ROME = ZoneInfo("Europe/Rome")
+
+
+@pytest.mark.parametrize(
+    "ts",
+    [
+        "2026-08-01T10:00:00",
+        "2026-08-01 10:00:00",
+        "2026-08-01T10:00:00Z",
+        "2026-08-01T10:00:00+00:00",
+        "2026-08-01T10:00:00.123456",
+        "2026-08-01T10:00:00.5Z",
+        "2026-08-01",
+    ],
+)
+def test_the_shapes_the_twin_returns_share_one_key(ts: str) -> None:
+    assert day_key(ts) == "2026-08-01"
+    assert day_keys([ts]) == ["2026-08-01"]
+
+
+def test_an_offset_is_honoured_rather_than_dropped() -> None:
+    """00:30 at +02:00 is 22:30 UTC the day before, which is where it belongs."""
+    assert day_key("2026-08-01T00:30:00+02:00") == "2026-07-31"
+    assert day_key("2026-08-01T23:30:00-02:00") == "2026-08-02"
+
+
+def test_days_can_be_taken_in_another_zone() -> None:
+    # 22:30 UTC in summer is 00:30 in Rome, the next local day.
+    assert day_key("2026-07-31T22:30:00Z", ROME) == "2026-08-01"
+    assert day_keys(["2026-07-31T22:30:00"], ROME) == ["2026-08-01"]
+    assert day_key(datetime(2026, 1, 31, 23, 30), ROME) == "2026-02-01"
+
+
+@pytest.mark.parametrize(
+    "name", ["Europe/Rome", "America/New_York", "Asia/Kolkata", "Australia/Lord_Howe"]
+)
+def test_local_days_agree_with_converting_each_row(name: str) -> None:
+    """Every 10 minutes across a year, so each DST change and the hours around it."""
+    tz = ZoneInfo(name)
+    start = datetime(2025, 12, 31, tzinfo=timezone.utc)
+    instants = [start + timedelta(minutes=10 * i) for i in range(6 * 24 * 368)]
+    stamps = [
+        ts.replace(tzinfo=None).isoformat(sep=" " if i % 2 else "T")
+        for i, ts in enumerate(instants)
+    ]
+
+    assert day_keys(stamps, tz) == [ts.astimezone(tz).date().isoformat() for ts in instants]
+
+
+def test_the_hour_either_side_of_a_dst_change() -> None:
+    # Rome leaves summer time at 01:00 UTC on 2026-10-25: 21:59 UTC the night before is
+    # 23:59 local, 22:00 is midnight; a day later midnight is at 23:00 UTC.
+    assert day_keys(["2026-10-24T21:59:00", "2026-10-24T22:00:00"], ROME) == [
+        "2026-10-24",
+        "2026-10-25",
+    ]
+    assert day_keys(["2026-10-25T22:59:59Z", "2026-10-25T23:00:00Z"], ROME) == [
+        "2026-10-25",
+        "2026-10-26",
+    ]
+
+
+def test_zones_are_looked_up_by_name() -> None:
+    assert zone("UTC") is UTC
+    assert zone("Europe/Rome") == ROME
+    with pytest.raises(ValueError):
+        zone("Europe/Atlantis")
+
+
+@pytest.mark.parametrize("ts", [None, "", "garbage", "2026-02-30T10:00:00", 0, 1.5])
+def test_anything_else_has_no_key(ts) -> None:
+    assert day_key(ts) is None
+    assert day_keys([ts]) == [None]
+    assert day_keys([ts], ROME) == [None]
+
+
+def test_naive_values_parse_as_utc() -> None:
+    assert parse("2026-08-01 10:00:00") == datetime(2026, 8, 1, 10, tzinfo=timezone.utc)
+    assert parse("nope") is None
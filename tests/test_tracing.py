@@ -0,0 +1,168 @@
+"""Tracing: what a traced request records, and how the trace leaves the process."""
+
+from __future__ import annotations
+
+from typing import Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+
+from benchmarks.traces import critical_path
+from celine.webapp.tracing import (
+    FileSpanExporter,
+    InMemorySpanExporter,
+    Span,
+    inject,
+    read_spans,
+    tracer,
+)
+from celine.webapp.upstreams import observe_upstream
+
+CALLER_TRACE = "4bf92f3577b34da6a3ce929d0e0e4736"
+CALLER_SPAN = "00f067aa0ba902b7"
+
+
+@pytest.fixture
+def spans(client: TestClient) -> Iterator[list[Span]]:
+    """Spans recorded while the test runs. Configured after the lifespan has started."""
+    exporter = InMemorySpanExporter()
+    tracer.configure(exporter)
+    yield exporter.spans
+    tracer.configure(None)
+
+
+def test_a_request_continues_the_callers_trace(
+    client: TestClient, auth_headers: dict, fake_dt, spans: list[Span]
+) -> None:
+    fake_dt.participants.values["meters_data"] = [
+        {"ts": "2024-06-01T06:00:00", "consumption_kwh": 1.0, "production_kwh": 0.5}
+    ]
+    headers = {**auth_headers, "traceparent": f"00-{CALLER_TRACE}-{CALLER_SPAN}-01"}
+
+    assert client.get("/api/overview", headers=headers).status_code == 200
+
+    [server] = [s for s in spans if s.kind == "SERVER"]
+    assert server.name == "GET /api/overview"
+    assert server.parent_id == CALLER_SPAN
+    assert server.attributes["http.response.status_code"] == 200
+    assert {s.trace_id for s in spans} == {CALLER_TRACE}
+
+    fetches = {
+        s.attributes["celine.dt.fetcher_id"]: s
+        for s in spans
+        if "celine.dt.fetcher_id" in s.attributes
+    }
+    assert fetches["meters_data"].attributes["celine.dt.row_count"] == 1
+    assert fetches["meters_data"].parent_id == server.span_id
+    assert fetches["meters_data"].kind == "CLIENT"
+
+
+def test_database_and_cache_spans_nest_under_the_request(
+    client: TestClient, auth_headers: dict, spans: list[Span]
+) -> None:
+    assert client.get("/api/me", headers=auth_headers).status_code == 200
+
+    [server] = [s for s in spans if s.kind == "SERVER"]
+    queries = [s for s in spans if "db.query.text" in s.attributes]
+    lookups = [s for s in spans if s.name == "cache verified_tokens"]
+    assert queries and all(s.parent_id == server.span_id for s in queries)
+    assert lookups and lookups[0].attributes["celine.cache.hit"] is False
+
+
+async def test_outbound_headers_name_the_client_span() -> None:
+    exporter = InMemorySpanExporter()
+    tracer.configure(exporter)
+    try:
+        with tracer.span("request", kind="SERVER"):
+            with observe_upstream("connector", "list_decisions"):
+                headers = inject({"X-Subject-Id": "did:example:1"})
+    finally:
+        tracer.configure(None)
+
+    client_span, server_span = exporter.spans
+    assert headers["traceparent"] == f"00-{server_span.trace_id}-{client_span.span_id}-01"
+    assert client_span.parent_id == server_span.span_id
+
+
+def test_nothing_is_recorded_or_propagated_when_tracing_is_off() -> None:
+    with observe_upstream("connector", "list_decisions") as call:
+        call.span.set_attribute("ignored", True)
+        assert inject({}) == {}
+
+
+def test_the_file_exporter_writes_otlp_json(tmp_path) -> None:
+    path = str(tmp_path / "traces.jsonl")
+    tracer.configure(FileSpanExporter(path))
+    try:
+        with tracer.span("work", attributes={"rows": 3, "fetcher": "meters_data"}):
+            pass
+    finally:
+        tracer.configure(None)
+
+    [span] = read_spans(path)
+    assert span["kind"] == "SPAN_KIND_INTERNAL"
+    assert len(span["traceId"]) == 32 and len(span["spanId"]) == 16
+    assert {"key": "rows", "value": {"intValue": "3"}} in span["attributes"]
+    assert int(span["endTimeUnixNano"]) >= int(span["startTimeUnixNano"])
+
+
+def test_a_finished_span_is_written_off_the_calling_thread(monkeypatch) -> None:
+    import threading
+    import time
+
+    from celine.webapp import tracing
+
+    class _Stream:
+        def __init__(self) -> None:
+            self.writers: list[int] = []
+
+        def write(self, text: str) -> None:
+            self.writers.append(threading.get_ident())
+
+        def flush(self) -> None:
+            pass
+
+    monkeypatch.setattr(tracing, "FLUSH_INTERVAL", 0.01)
+    stream = _Stream()
+    exporter = tracing._LineExporter(stream)
+    tracer.configure(exporter)
+    try:
+        with tracer.span("work"):
+            pass
+        assert stream.writers == []
+        deadline = time.monotonic() + 2
+        while not stream.writers and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        tracer.configure(None)
+
+    assert stream.writers and threading.get_ident() not in stream.writers
+
+
+def _span(span_id: str, parent: str | None, start: int, end: int) -> dict:
+    span = {
+        "traceId": CALLER_TRACE,
+        "spanId": span_id,
+        "name": span_id,
+        "kind": "SPAN_KIND_SERVER" if parent is None else "SPAN_KIND_CLIENT",
+        "startTimeUnixNano": str(start),
+        "endTimeUnixNano": str(end),
+    }
+    if parent is not None:
+        span["parentSpanId"] = parent
+    return span
+
+
+def test_the_critical_path_follows_the_fetch_that_finished_last() -> None:
+    root = _span("request", None, 0, 100)
+    spans = [
+        root,
+        _span("profile", "request", 0, 10),
+        _span("meters", "request", 10, 90),
+        _span("weather", "request", 10, 40),
+        _span("sql", "meters", 20, 30),
+    ]
+
+    path = [(depth, span["name"]) for depth, span in critical_path(spans, root)]
+
+    assert path == [(0, "request"), (1, "profile"), (1, "meters"), (2, "sql")]
@@ -0,0 +1,224 @@
+"""`db/user_settings.py` — this repository's own small amount of state.
+
+Every helper here used to SELECT, then INSERT, COMMIT and REFRESH when the row was
+missing. Two first requests from the same member raced that sequence into the unique
+constraint on `user_id`. The helpers are now single upserts, and the tests below pin the
+two properties that replaced the race: repeating a write converges on one row, and a
+write that should keep the first value does.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import event, func, select
+
+from celine.webapp.db import Base, PolicyAcceptance, Settings, UserOnboardingView
+from celine.webapp.db.profile import load_user_profile
+from celine.webapp.db.user_settings import (
+    list_onboarding_seen_pages,
+    load_user_settings,
+    mark_onboarding_page_seen,
+    mark_onboarding_seen,
+    set_webpush_enabled,
+    update_user_settings,
+)
+
+
+USER = "test-user-123"
+
+
+@pytest.fixture
+async def sessionmaker(db_sessionmaker):
+    engine = db_sessionmaker.kw["bind"]
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield db_sessionmaker
+    await engine.dispose()
+
+
+async def _count(sessionmaker, model) -> int:
+    async with sessionmaker() as db:
+        return (await db.execute(select(func.count()).select_from(model))).scalar_one()
+
+
+async def test_loading_creates_the_row_with_defaults(sessionmaker) -> None:
+    async with sessionmaker() as db:
+        settings = await load_user_settings(USER, db)
+
+    assert settings.simple_mode is False
+    assert settings.font_scale == 1.0
+    assert settings.webpush_enabled is False
+    assert settings.onboarding_seen_at is None
+
+
+async def test_concurrent_first_requests_converge_on_one_row(sessionmaker) -> None:
+    async def first_visit() -> Settings:
+        async with sessionmaker() as db:
+            return await load_user_settings(USER, db)
+
+    rows = await asyncio.gather(*(first_visit() for _ in range(5)))
+
+    assert len({row.id for row in rows}) == 1
+    assert await _count(sessionmaker, Settings) == 1
+
+
+async def test_a_partial_update_keeps_the_other_fields(sessionmaker) -> None:
+    async with sessionmaker() as db:
+        await update_user_settings(USER, db, simple_mode=True, font_scale=1.2)
+    async with sessionmaker() as db:
+        settings = await update_user_settings(USER, db, webpush_enabled=True)
+
+    assert settings.simple_mode is True
+    assert settings.font_scale == 1.2
+    assert settings.webpush_enabled is True
+
+
+async def test_webpush_can_be_set_before_the_row_exists(sessionmaker) -> None:
+    async with sessionmaker() as db:
+        settings = await set_webpush_enabled(USER, True, db)
+
+    assert settings.webpush_enabled is True
+    assert settings.font_scale == 1.0
+
+
+async def test_onboarding_keeps_the_first_timestamp(sessionmaker) -> None:
+    async with sessionmaker() as db:
+        first = (await mark_onboarding_seen(USER, db)).onboarding_seen_at
+    async with sessionmaker() as db:
+        again = (await mark_onboarding_seen(USER, db)).onboarding_seen_at
+
+    assert first is not None
+    assert again == first
+
+
+async def test_marking_a_page_twice_is_one_row(sessionmaker) -> None:
+    async with sessionmaker() as db:
+        first = await mark_onboarding_page_seen(USER, "/notifications", db)
+    async with sessionmaker() as db:
+        again = await mark_onboarding_page_seen(USER, "/notifications", db)
+        pages = await list_onboarding_seen_pages(USER, db)
+
+    assert again.id == first.id
+    assert pages == ["/notifications"]
+    assert await _count(sessionmaker, UserOnboardingView) == 1
+
+
+# ─── The /api/me bootstrap ───────────────────────────────────────────────────
+
+
+async def test_a_new_member_reads_defaults_without_a_write(sessionmaker) -> None:
+    """`/api/me` used to insert the settings row. Reading it is now read-only."""
+    async with sessionmaker() as db:
+        profile = await load_user_profile(USER, db)
+
+    assert profile.accepted_policy_version is None
+    assert profile.simple_mode is False
+    assert profile.font_scale == 1.0
+    assert profile.onboarding_seen_pages == ()
+    assert await _count(sessionmaker, Settings) == 0
+
+
+async def test_the_profile_combines_all_three_sources(sessionmaker) -> None:
+    now = datetime.now(timezone.utc)
+    async with sessionmaker() as db:
+        db.add_all(
+            [
+                PolicyAcceptance(
+                    user_id=USER, policy_version="old", accepted_at=now - timedelta(days=30)
+                ),
+                PolicyAcceptance(user_id=USER, policy_version="new", accepted_at=now),
+            ]
+        )
+        await db.commit()
+        await update_user_settings(USER, db, simple_mode=True)
+        await mark_onboarding_page_seen(USER, "/", db)
+        await mark_onboarding_page_seen(USER, "/notifications", db)
+
+    async with sessionmaker() as db:
+        profile = await load_user_profile(USER, db)
+
+    assert profile.accepted_policy_version == "new"
+    assert profile.simple_mode is True
+    assert sorted(profile.onboarding_seen_pages) == ["/", "/notifications"]
+
+
+async def test_a_settings_write_invalidates_the_cached_profile(sessionmaker) -> None:
+    async with sessionmaker() as db:
+        assert (await load_user_profile(USER, db)).simple_mode is False
+        await update_user_settings(USER, db, simple_mode=True)
+        assert (await load_user_profile(USER, db)).simple_mode is True
+
+
+# ─── Policy acceptance ───────────────────────────────────────────────────────
+
+
+async def test_the_latest_of_several_acceptances_wins(sessionmaker) -> None:
+    """Raised `MultipleResultsFound` until the lookup became a LIMIT 1."""
+    from celine.webapp.api.user import get_accepted_policy_version
+
+    now = datetime.now(timezone.utc)
+    async with sessionmaker() as db:
+        db.add_all(
+            [
+                PolicyAcceptance(user_id=USER, policy_version="v2", accepted_at=now),
+                PolicyAcceptance(
+                    user_id=USER, policy_version="v1", accepted_at=now - timedelta(days=1)
+                ),
+            ]
+        )
+        await db.commit()
+        assert await get_accepted_policy_version(USER, db) == "v2"
+
+
+async def test_an_accepted_current_policy_is_not_queried_again(
+    sessionmaker, monkeypatch
+) -> None:
+    from celine.webapp.api import user as user_module
+    from celine.webapp.settings import settings as app_settings
+
+    async with sessionmaker() as db:
+        db.add(
+            PolicyAcceptance(
+                user_id=USER,
+                policy_version=app_settings.policy_version,
+                accepted_at=datetime.now(timezone.utc),
+            )
+        )
+        await db.commit()
+        assert await user_module.terms_required_for(USER, db) == (
+            False,
+            app_settings.policy_version,
+        )
+
+        async def no_query(*args, **kwargs):
+            raise AssertionError("the gate should have answered")
+
+        monkeypatch.setattr(user_module, "get_accepted_policy_version", no_query)
+        required, _ = await user_module.terms_required_for(USER, db)
+
+    assert required is False
+
+
+def test_me_does_not_look_up_an_acceptance_the_gate_knows(
+    client, auth_headers, db_sessionmaker
+) -> None:
+    from celine.webapp.db.profile import invalidate_user_profile
+
+    response = client.post("/api/terms/accept", json={"accept": True}, headers=auth_headers)
+    assert response.status_code == 200
+    statements: list[str] = []
+    event.listen(
+        db_sessionmaker.kw["bind"].sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+    invalidate_user_profile(USER)
+
+    body = client.get("/api/me", headers=auth_headers).json()
+
+    assert body["terms_required"] is False
+    assert statements
+    assert not [s for s in statements if "policy_acceptance" in s]